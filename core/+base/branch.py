@@ -6,6 +6,13 @@ class Branch(ABC):
     This is the base class for all branches in different domains, such as matter or energy.
     """
 
+    # Branches are created in large numbers, so their attributes are stored
+    # in slots instead of an instance dictionary
+    __slots__ = (
+        'oContainer', 'sCustomName', 'sType', 'bSealed', 'bOutdated', 'csNames', 'abIf', 'coExmes',
+        'coBranches', 'oHandler', 'sName', 'oMT', 'oTimer', 'oRoot', '__weakref__',
+    )
+
     def __init__(self, oContainer, xLeft, csProcs, xRight, sCustomName=None, sType=None):
         """
         Initializes a branch with the given container, left port, components, and right port.
@@ -1,21 +1,56 @@
+import itertools
+
+
+class Event:
+    """
+    Payload that is passed to the callbacks of an event. Each source reuses
+    one payload object for all its events, so callbacks must copy the data
+    they want to keep after they return. For compatibility the fields can
+    also be accessed like dictionary entries, e.g. tEvent['tData'].
+    """
+
+    __slots__ = ('sType', 'oCaller', 'tData')
+
+    def __init__(self, oCaller):
+        self.sType = None
+        self.oCaller = oCaller
+        self.tData = None
+
+    def __getitem__(self, sKey):
+        return getattr(self, sKey)
+
+
 class Source:
     """
     Source class provides a framework for event handling.
     Classes that want to use bind or trigger functions must inherit from this class.
+
+    Event names can be hierarchical, e.g. 'schedule.exercise.bicycle'.
+    Triggering such an event also executes the callbacks bound to its
+    parents ('schedule.exercise' and 'schedule'), starting with the most
+    specific name. The callbacks for each triggered name are compiled into
+    a dispatch list on first use, which is discarded whenever a callback is
+    bound or unbound.
     """
 
+    # Unique ids of the bound callbacks, used as unbind tokens
+    _oCallBackIds = itertools.count()
+
     def __init__(self):
         """
         Initializes the Source object with default properties.
         """
-        # Initialize the default, empty event object
-        self.tcEventCallbacks = {}  # Dictionary to store event callbacks
+        # Callbacks of each event, keyed by the id of the callback. The ids
+        # do not change when other callbacks are unbound.
+        self.tcEventCallbacks = {}
         self.bHasCallbacks = False  # Boolean indicating if callbacks exist
-        self.tDefaultEvent = {
-            'sType': None,
-            'oCaller': self,
-            'tData': None,
-        }
+
+        # Compiled callbacks of each triggered event name, including the
+        # callbacks of the parent events
+        self.tcDispatchLists = {}
+
+        # Reused payload of all events of this object
+        self.tDefaultEvent = Event(self)
 
     def bind(self, sName, hCallBack):
         """
@@ -26,20 +61,14 @@ class Source:
             hCallBack (function): Callback function to bind.
 
         Returns:
-            function: A handle to unbind the callback.
+            function: A handle to unbind this specific callback.
         """
-        # Create entry for the event if it doesn't exist
-        if sName not in self.tcEventCallbacks:
-            self.tcEventCallbacks[sName] = []
+        iCallBack = next(self._oCallBackIds)
 
-        # Add the callback to the event
-        self.tcEventCallbacks[sName].append(hCallBack)
-
-        # Mark that this object has callbacks
+        self.tcEventCallbacks.setdefault(sName, {})[iCallBack] = hCallBack
         self.bHasCallbacks = True
+        self.tcDispatchLists = {}
 
-        # Return a handle to unbind this specific callback
-        iCallBack = len(self.tcEventCallbacks[sName]) - 1
         return lambda: self.unbind(sName, iCallBack)
 
     def unbind(self, sName, iId):
@@ -48,14 +77,18 @@ class Source:
 
         Args:
             sName (str): Name of the event.
-            iId (int): Index of the callback to remove.
+            iId (int): Id of the callback, as captured by the handle returned from bind.
         """
-        if sName in self.tcEventCallbacks and 0 <= iId < len(self.tcEventCallbacks[sName]):
-            del self.tcEventCallbacks[sName][iId]
+        thCallBacks = self.tcEventCallbacks.get(sName)
+        if thCallBacks is None or thCallBacks.pop(iId, None) is None:
+            return
 
-            # Clean up empty event entries
-            if not self.tcEventCallbacks[sName]:
-                del self.tcEventCallbacks[sName]
+        # Clean up empty event entries
+        if not thCallBacks:
+            del self.tcEventCallbacks[sName]
+
+        self.bHasCallbacks = bool(self.tcEventCallbacks)
+        self.tcDispatchLists = {}
 
     def unbindAllEvents(self):
         """
@@ -63,6 +96,7 @@ class Source:
         """
         self.tcEventCallbacks = {}
         self.bHasCallbacks = False
+        self.tcDispatchLists = {}
 
     def trigger(self, sName, tData=None):
         """
@@ -76,19 +110,58 @@ class Source:
         if not self.bHasCallbacks:
             return
 
-        # Check if there are callbacks for the given event name
-        cCallbackCell = self.tcEventCallbacks.get(sName, None)
-        if cCallbackCell is None:
+        chCallBacks = self.tcDispatchLists.get(sName)
+        if chCallBacks is None:
+            chCallBacks = self._compile_dispatch_list(sName)
+
+        if not chCallBacks:
             return
 
-        # Prepare the event data
-        tEvent = self.tDefaultEvent.copy()
-        tEvent['sType'] = sName
-        tEvent['tData'] = tData
+        # The payload is reused, the previous values are restored afterwards
+        # in case this is a nested trigger from within another callback
+        tEvent = self.tDefaultEvent
+        sPreviousType = tEvent.sType
+        xPreviousData = tEvent.tData
+        tEvent.sType = sName
+        tEvent.tData = tData
 
         # Execute all callbacks for this event
-        for callback in cCallbackCell:
-            callback(tEvent)
+        for hCallBack in chCallBacks:
+            hCallBack(tEvent)
+
+        tEvent.sType = sPreviousType
+        tEvent.tData = xPreviousData
+
+    def _compile_dispatch_list(self, sName):
+        """
+        Collects the callbacks of an event and its parent events into a
+        tuple and stores it for subsequent triggers.
+
+        Args:
+            sName (str): Name of the event.
+
+        Returns:
+            tuple: Callbacks to execute, most specific event first.
+        """
+        chCallBacks = []
+        sEvent = sName
+        while True:
+            thCallBacks = self.tcEventCallbacks.get(sEvent)
+            if thCallBacks:
+                chCallBacks.extend(thCallBacks.values())
+
+            iSeparator = sEvent.rfind('.')
+            if iSeparator == -1:
+                break
+            sEvent = sEvent[:iSeparator]
+
+        chCallBacks = tuple(chCallBacks)
+        self.tcDispatchLists[sName] = chCallBacks
+        return chCallBacks
+
+
+# Name under which the event source is imported by the other packages
+EventSource = Source
 
 
 # def sample_callback(event):
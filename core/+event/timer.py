@@ -1,15 +1,23 @@
+import heapq
+
+import numpy as np
+
+
 class Timer:
     """
     Timer class handles all timing operations within the simulation framework.
     """
 
-    def __init__(self, fMinimumTimeStep=1e-8, fStart=None):
+    def __init__(self, fMinimumTimeStep=1e-8, fStart=None, bUseHeapScheduler=False):
         """
         Initializes the Timer object.
 
         Args:
             fMinimumTimeStep (float): Minimum allowed time step.
             fStart (float): Start time for the simulation.
+            bUseHeapScheduler (bool): If True, the callbacks are kept in a
+                priority queue keyed on their next execution time instead of
+                being scanned linearly in every tick.
         """
         self.fMinimumTimeStep = fMinimumTimeStep
         self.fStart = fStart if fStart is not None else -1 * fMinimumTimeStep
@@ -18,12 +26,31 @@ class Timer:
         self.fTimeStepFinal = 0
         self.iTick = -1
 
-        # Callback-related properties
-        self.cCallBacks = []
-        self.afTimeSteps = []
-        self.afLastExec = []
-        self.ctPayload = []
-        self.abDependent = []
+        # Callback-related properties. The numeric callback state is stored
+        # in preallocated arrays which are indexed by a stable slot ID. Slots
+        # of unbound callbacks are recycled through aiFreeCallBackSlots.
+        # iCallBackSlots is the number of slots that have been used so far,
+        # all arrays are only evaluated up to this index.
+        self.iCallBackCapacity = 64
+        self.iCallBackSlots = 0
+        self.aiFreeCallBackSlots = []
+        self.cCallBacks = [None] * self.iCallBackCapacity
+        self.ctPayload = [None] * self.iCallBackCapacity
+        self.afTimeSteps = np.full(self.iCallBackCapacity, np.inf)
+        self.afLastExec = np.full(self.iCallBackCapacity, np.inf)
+        self.abDependent = np.zeros(self.iCallBackCapacity, dtype=bool)
+        self.abActive = np.zeros(self.iCallBackCapacity, dtype=bool)
+        self.aiSlotGeneration = np.zeros(self.iCallBackCapacity, dtype=np.int64)
+
+        # Heap scheduler properties. The heap contains entries of the form
+        # (fNextExecution, iCB, iVersion). Entries whose version does not
+        # match aiHeapVersion[iCB] are outdated and skipped lazily.
+        # Dependent callbacks are executed in every tick and are therefore
+        # not part of the heap.
+        self.bUseHeapScheduler = bUseHeapScheduler
+        self.atHeap = []
+        self.aiHeapVersion = np.zeros(self.iCallBackCapacity, dtype=np.int64)
+        self.aiDependentCallBacks = set()
 
         # Post-tick execution properties
         self.txPostTicks = {
@@ -58,10 +85,21 @@ class Timer:
         self.tcsPostTickLevel = {}
         self.aiNumberOfPostTickLevel = []
         self.cabPostTickControl = {}
+        self.chPostTicks = {}
         self.abCallbacksRegistered = []
 
+        # Post ticks that requested execution are pushed into a pending queue
+        # of their level, so the dispatch only touches those entries. Post
+        # ticks that are registered during the execution of their own level
+        # with an index lower than the currently executed one are deferred
+        # to the next pass over that level, identical to a full scan.
+        self.taiPendingPostTicks = {}
+        self.taiDeferredPostTicks = {}
+        self.ttiPostTickExecutions = {}
+
         self.iCurrentPostTickGroup = 0
         self.iCurrentPostTickLevel = 0
+        self.iCurrentPostTick = -1
 
         self._initialize_post_ticks()
 
@@ -73,7 +111,7 @@ class Timer:
             self.tiPostTickGroup[group_name] = group_index
             self.tcsPostTickLevel[group_name] = []
 
-            for level_name in levels.keys():
+            for level_name in list(levels.keys()):
                 pre_level = f"pre_{level_name}"
                 post_level = f"post_{level_name}"
 
@@ -84,6 +122,72 @@ class Timer:
 
             self.aiNumberOfPostTickLevel.append(len(self.tcsPostTickLevel[group_name]))
 
+            self.chPostTicks[group_index] = {}
+            self.cabPostTickControl[group_index] = {}
+            self.taiPendingPostTicks[group_index] = {}
+            self.taiDeferredPostTicks[group_index] = {}
+            self.ttiPostTickExecutions[group_name] = {}
+
+            for level_name in self.tcsPostTickLevel[group_name]:
+                self.chPostTicks[group_index][level_name] = self.txPostTicks[group_name][level_name]
+                self.cabPostTickControl[group_index][level_name] = []
+                self.taiPendingPostTicks[group_index][level_name] = []
+                self.taiDeferredPostTicks[group_index][level_name] = []
+                self.ttiPostTickExecutions[group_name][level_name] = 0
+
+    def register_post_tick(self, hFunction, sPostTickGroup, sPostTickLevel):
+        """
+        Registers a function to be executed in the post tick of the timer.
+
+        Args:
+            hFunction (function): Function to execute in the post tick.
+            sPostTickGroup (str): Name of the post tick group, e.g. 'matter'.
+            sPostTickLevel (str): Name of the post tick level within the
+                group, e.g. 'phase_update' or 'pre_phase_update'.
+
+        Returns:
+            function: A handle which registers the function for execution
+                in the next post tick of its level.
+        """
+        if sPostTickGroup not in self.tiPostTickGroup:
+            raise ValueError(f"Unknown post tick group '{sPostTickGroup}'.")
+        if sPostTickLevel not in self.tcsPostTickLevel[sPostTickGroup]:
+            raise ValueError(f"Unknown post tick level '{sPostTickLevel}' in group '{sPostTickGroup}'.")
+
+        iGroup = self.tiPostTickGroup[sPostTickGroup]
+        iLevel = self.tcsPostTickLevel[sPostTickGroup].index(sPostTickLevel)
+
+        self.chPostTicks[iGroup][sPostTickLevel].append(hFunction)
+        self.cabPostTickControl[iGroup][sPostTickLevel].append(False)
+        iPostTick = len(self.chPostTicks[iGroup][sPostTickLevel]) - 1
+
+        return lambda: self._set_post_tick(iGroup, iLevel, sPostTickLevel, iPostTick)
+
+    # Alias for the MATLAB style method name used throughout the framework
+    registerPostTick = register_post_tick
+
+    def _set_post_tick(self, iGroup, iLevel, sLevel, iPostTick):
+        """
+        Requests the execution of a post tick.
+
+        Args:
+            iGroup (int): Index of the post tick group.
+            iLevel (int): Index of the post tick level within the group.
+            sLevel (str): Name of the post tick level.
+            iPostTick (int): Index of the post tick within the level.
+        """
+        abControl = self.cabPostTickControl[iGroup][sLevel]
+        if abControl[iPostTick]:
+            return
+
+        abControl[iPostTick] = True
+
+        if (iGroup == self.iCurrentPostTickGroup and iLevel == self.iCurrentPostTickLevel
+                and iPostTick < self.iCurrentPostTick):
+            heapq.heappush(self.taiDeferredPostTicks[iGroup][sLevel], iPostTick)
+        else:
+            heapq.heappush(self.taiPendingPostTicks[iGroup][sLevel], iPostTick)
+
     def setMinStep(self, fMinStep):
         """
         Sets the minimum time step of the solver.
@@ -119,31 +223,77 @@ class Timer:
         if tInputPayload and isinstance(tInputPayload, dict):
             tPayload.update(tInputPayload)
 
-        iIdx = len(self.afTimeSteps)
-
-        self.cCallBacks.append(hCallBack)
-        self.afLastExec.append(-float('inf'))
-        self.ctPayload.append(tPayload)
-        self.afTimeSteps.append(fTimeStep if fTimeStep is not None else self.fMinimumTimeStep)
-        self.abDependent.append(fTimeStep == -1 if fTimeStep is not None else False)
-
+        if self.aiFreeCallBackSlots:
+            iIdx = self.aiFreeCallBackSlots.pop()
+        else:
+            if self.iCallBackSlots == self.iCallBackCapacity:
+                self._grow_callback_arrays()
+            iIdx = self.iCallBackSlots
+            self.iCallBackSlots += 1
+
+        self.cCallBacks[iIdx] = hCallBack
+        self.ctPayload[iIdx] = tPayload
+        self.afLastExec[iIdx] = -np.inf
+        self.afTimeSteps[iIdx] = fTimeStep if fTimeStep is not None else self.fMinimumTimeStep
+        self.abDependent[iIdx] = fTimeStep == -1 if fTimeStep is not None else False
+        self.abActive[iIdx] = True
+        self.aiSlotGeneration[iIdx] += 1
+        iGeneration = self.aiSlotGeneration[iIdx]
+
+        if self.bUseHeapScheduler:
+            self._schedule(iIdx)
+
+        # The handles remember the generation of the slot, so they become
+        # ineffective once the callback is unbound and its slot is reused
         return (
-            lambda fTimeStep, bReset=False: self._setTimeStep(iIdx, fTimeStep, bReset),
-            lambda: self.unbind(iIdx)
+            lambda fTimeStep, bReset=False: self._setTimeStep(iIdx, fTimeStep, bReset, iGeneration),
+            lambda: self.unbind(iIdx, iGeneration)
         )
 
-    def unbind(self, iCB):
+    def _grow_callback_arrays(self):
+        """
+        Doubles the capacity of the callback arrays.
+        """
+        iOldCapacity = self.iCallBackCapacity
+        self.iCallBackCapacity *= 2
+        iAdded = self.iCallBackCapacity - iOldCapacity
+
+        self.cCallBacks.extend([None] * iAdded)
+        self.ctPayload.extend([None] * iAdded)
+        self.afTimeSteps = np.concatenate((self.afTimeSteps, np.full(iAdded, np.inf)))
+        self.afLastExec = np.concatenate((self.afLastExec, np.full(iAdded, np.inf)))
+        self.abDependent = np.concatenate((self.abDependent, np.zeros(iAdded, dtype=bool)))
+        self.abActive = np.concatenate((self.abActive, np.zeros(iAdded, dtype=bool)))
+        self.aiSlotGeneration = np.concatenate((self.aiSlotGeneration, np.zeros(iAdded, dtype=np.int64)))
+        self.aiHeapVersion = np.concatenate((self.aiHeapVersion, np.zeros(iAdded, dtype=np.int64)))
+
+    def unbind(self, iCB, iGeneration=None):
         """
-        Unbinds a callback.
+        Unbinds a callback. The slot of the callback is released and may be
+        reused by a later bind, the slots of all other callbacks are not
+        affected.
 
         Args:
-            iCB (int): Index of the callback to remove.
+            iCB (int): Slot of the callback to remove.
+            iGeneration (int): Generation of the slot at bind time. If it
+                does not match, the callback was already unbound.
         """
-        del self.cCallBacks[iCB]
-        del self.afTimeSteps[iCB]
-        del self.abDependent[iCB]
-        del self.afLastExec[iCB]
-        del self.ctPayload[iCB]
+        if not self.abActive[iCB]:
+            return
+        if iGeneration is not None and iGeneration != self.aiSlotGeneration[iCB]:
+            return
+
+        self.cCallBacks[iCB] = None
+        self.ctPayload[iCB] = None
+        self.afTimeSteps[iCB] = np.inf
+        self.afLastExec[iCB] = np.inf
+        self.abDependent[iCB] = False
+        self.abActive[iCB] = False
+        self.aiFreeCallBackSlots.append(iCB)
+
+        # Invalidates all heap entries of this slot
+        self.aiHeapVersion[iCB] += 1
+        self.aiDependentCallBacks.discard(iCB)
 
     def tick(self):
         """
@@ -156,60 +306,190 @@ class Timer:
         self.fTime += fThisStep
         self.iTick += 1
 
-        abExec = [(last_exec + step <= self.fTime) for last_exec, step in zip(self.afLastExec, self.afTimeSteps)]
+        if self.bUseHeapScheduler:
+            self._execute_heap_callbacks()
+        else:
+            self._execute_callbacks()
+
+        # Post-tick execution logic
+        self._execute_post_ticks()
+
+        # Determine the next time step
+        if self.bUseHeapScheduler:
+            self._determine_next_time_step_heap()
+        else:
+            self._determine_next_time_step()
+
+    def _execute_callbacks(self):
+        """
+        Executes all due callbacks by scanning all registered callbacks.
+        """
+        iSlots = self.iCallBackSlots
         if hasattr(self, 'bSynchronizeExecuteCallBack') and self.bSynchronizeExecuteCallBack:
-            abExec = [True] * len(self.afTimeSteps)
+            abExec = self.abActive[:iSlots]
             self.bSynchronizeExecuteCallBack = False
+        else:
+            # Free slots have an infinite last execution time and are
+            # therefore never due
+            abExec = self.afLastExec[:iSlots] + self.afTimeSteps[:iSlots] <= self.fTime
+
+        for i in np.flatnonzero(abExec):
+            self._execute_callback(i)
 
-        aiExec = [i for i, exec_ in enumerate(abExec) if exec_]
+    def _execute_callback(self, iCB):
+        """
+        Executes a single callback and stores its execution time. Callbacks
+        that were unbound by a previously executed callback are skipped.
+
+        Args:
+            iCB (int): Slot of the callback.
+        """
+        hCallBack = self.cCallBacks[iCB]
+        if hCallBack is None:
+            return
+
+        hCallBack(self)
+
+        if self.abActive[iCB]:
+            self.afLastExec[iCB] = self.fTime
+
+    def _execute_heap_callbacks(self):
+        """
+        Executes all due callbacks by popping them from the heap. The
+        callbacks are executed in the order of their index, identical to
+        the linear scan in _execute_callbacks.
+        """
+        if hasattr(self, 'bSynchronizeExecuteCallBack') and self.bSynchronizeExecuteCallBack:
+            aiExec = np.flatnonzero(self.abActive[:self.iCallBackSlots])
+            self.bSynchronizeExecuteCallBack = False
+        else:
+            aiExec = set(self.aiDependentCallBacks)
+            while self.atHeap and self.atHeap[0][0] <= self.fTime:
+                _, iCB, iVersion = heapq.heappop(self.atHeap)
+                if iVersion == self.aiHeapVersion[iCB]:
+                    aiExec.add(iCB)
+            aiExec = sorted(aiExec)
 
         for i in aiExec:
-            self.cCallBacks[i](self)
-            self.afLastExec[i] = self.fTime
+            self._execute_callback(i)
+            if self.abActive[i]:
+                self._schedule(i)
 
-        # Post-tick execution logic
-        self._execute_post_ticks()
+    def _schedule(self, iCB):
+        """
+        Invalidates all heap entries of a callback and, if it is not a
+        dependent callback, pushes a new entry with its next execution time.
 
-        # Determine the next time step
-        self._determine_next_time_step()
+        Args:
+            iCB (int): Index of the callback.
+        """
+        self.aiHeapVersion[iCB] += 1
+        if self.abDependent[iCB]:
+            self.aiDependentCallBacks.add(iCB)
+        else:
+            self.aiDependentCallBacks.discard(iCB)
+            heapq.heappush(self.atHeap, (float(self.afLastExec[iCB] + self.afTimeSteps[iCB]), int(iCB), int(self.aiHeapVersion[iCB])))
 
     def _execute_post_ticks(self):
         """
-        Executes registered post-tick callbacks in the defined order.
+        Executes registered post-tick callbacks in the defined order. The
+        physics groups are executed first, the post_physics group with the
+        time step calculations is executed last.
         """
         for group_name in self.csPostTickGroups[:-1]:
-            group_index = self.tiPostTickGroup[group_name]
-            levels = self.tcsPostTickLevel[group_name]
+            self._execute_post_tick_group(group_name)
 
-            for level_name in levels:
-                while any(self.cabPostTickControl.get(group_index, {}).get(level_name, [])):
-                    for idx, should_execute in enumerate(self.cabPostTickControl[group_index][level_name]):
-                        if should_execute:
-                            self.chPostTicks[group_index][level_name][idx]()
-                            self.cabPostTickControl[group_index][level_name][idx] = False
+        self._execute_post_tick_group(self.csPostTickGroups[-1])
+
+        self.iCurrentPostTickGroup = 0
+        self.iCurrentPostTickLevel = 0
+
+    def _execute_post_tick_group(self, group_name):
+        """
+        Executes the pending post ticks of all levels of one group.
+
+        Args:
+            group_name (str): Name of the post tick group.
+        """
+        group_index = self.tiPostTickGroup[group_name]
+        levels = self.tcsPostTickLevel[group_name]
+
+        self.iCurrentPostTickGroup = group_index
+
+        for level_index, level_name in enumerate(levels):
+            aiPending = self.taiPendingPostTicks[group_index][level_name]
+            if not aiPending:
+                continue
+
+            aiDeferred = self.taiDeferredPostTicks[group_index][level_name]
+            chPostTicks = self.chPostTicks[group_index][level_name]
+            abControl = self.cabPostTickControl[group_index][level_name]
+            self.iCurrentPostTickLevel = level_index
+
+            while aiPending:
+                while aiPending:
+                    idx = heapq.heappop(aiPending)
+                    self.iCurrentPostTick = idx
+                    chPostTicks[idx]()
+                    abControl[idx] = False
+                    self.ttiPostTickExecutions[group_name][level_name] += 1
+
+                # Start the next pass over this level with the post ticks
+                # that were registered behind the executed position
+                self.iCurrentPostTick = -1
+                aiPending.extend(aiDeferred)
+                aiDeferred.clear()
+                heapq.heapify(aiPending)
 
     def _determine_next_time_step(self):
         """
         Determines the next time step based on callback execution times.
         """
-        fNextExecutionTime = min([
-            last_exec + step
-            for last_exec, step, dependent in zip(self.afLastExec, self.afTimeSteps, self.abDependent)
-            if not dependent
-        ], default=self.fTime + self.fMinimumTimeStep)
+        iSlots = self.iCallBackSlots
+        abIndependent = self.abActive[:iSlots] & ~self.abDependent[:iSlots]
+
+        if abIndependent.any():
+            fNextExecutionTime = np.min(self.afLastExec[:iSlots][abIndependent] + self.afTimeSteps[:iSlots][abIndependent])
+        else:
+            fNextExecutionTime = self.fTime + self.fMinimumTimeStep
+
+        self.fTimeStepFinal = max(fNextExecutionTime - self.fTime, self.fMinimumTimeStep)
+
+    def _determine_next_time_step_heap(self):
+        """
+        Determines the next time step from the top of the heap, discarding
+        outdated entries on the way.
+        """
+        while self.atHeap and self.atHeap[0][2] != self.aiHeapVersion[self.atHeap[0][1]]:
+            heapq.heappop(self.atHeap)
+
+        if self.atHeap:
+            fNextExecutionTime = self.atHeap[0][0]
+        else:
+            fNextExecutionTime = self.fTime + self.fMinimumTimeStep
 
         self.fTimeStepFinal = max(fNextExecutionTime - self.fTime, self.fMinimumTimeStep)
 
-    def _setTimeStep(self, iCB, fTimeStep, bResetLastExecuted=False):
+    def _setTimeStep(self, iCB, fTimeStep, bResetLastExecuted=False, iGeneration=None):
         """
         Sets the time step for a specific callback.
 
         Args:
-            iCB (int): Index of the callback.
+            iCB (int): Slot of the callback.
             fTimeStep (float): New time step.
             bResetLastExecuted (bool): Whether to reset the last executed time.
+            iGeneration (int): Generation of the slot at bind time. If it
+                does not match, the callback was unbound and nothing is done.
         """
+        if not self.abActive[iCB]:
+            return
+        if iGeneration is not None and iGeneration != self.aiSlotGeneration[iCB]:
+            return
+
         self.abDependent[iCB] = (fTimeStep == -1)
         self.afTimeSteps[iCB] = max(fTimeStep, 0)
         if bResetLastExecuted:
             self.afLastExec[iCB] = self.fTime
+
+        if self.bUseHeapScheduler:
+            self._schedule(iCB)
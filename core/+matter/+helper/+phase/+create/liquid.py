@@ -1,3 +1,6 @@
+from matter.compoundMass import CompoundMass
+
+
 def liquid(oStore, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
     """
     Helper to create a liquid phase.
@@ -17,7 +20,7 @@ def liquid(oStore, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
     mrMassRatios = [0] * oStore["oMT"]["iSubstances"]
     csSubstances = trMassRatios.keys()
 
-    arCompoundMass = [[0] * oStore["oMT"]["iSubstances"] for _ in range(oStore["oMT"]["iSubstances"])]
+    arCompoundMass = CompoundMass(oStore["oMT"]["iSubstances"])
 
     # Populate the mass ratio vector and compound mass matrix
     for substance in csSubstances:
@@ -27,7 +30,7 @@ def liquid(oStore, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
         if oStore["oMT"]["abCompound"][iMatterIndexSubstance]:
             trBaseComposition = oStore["oMT"]["ttxMatter"][substance]["trBaseComposition"]
             for entry in trBaseComposition:
-                arCompoundMass[iMatterIndexSubstance][oStore["oMT"]["tiN2I"][entry]] = trBaseComposition[entry]
+                arCompoundMass.set_component(iMatterIndexSubstance, oStore["oMT"]["tiN2I"][entry], trBaseComposition[entry])
 
     # Resolve compound mass ratios
     mrResolvedMassRatios = oStore["oMT"]["resolveCompoundMass"](mrMassRatios, arCompoundMass)
@@ -1,3 +1,6 @@
+from matter.compoundMass import CompoundMass
+
+
 def mixture(oStore, sPhase, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
     """
     Helper to create a mixture phase.
@@ -18,7 +21,7 @@ def mixture(oStore, sPhase, fVolume, trMassRatios, fTemperature=293.15, fPressur
     mrMassRatios = [0] * oStore["oMT"]["iSubstances"]
     csSubstances = trMassRatios.keys()
 
-    arCompoundMass = [[0] * oStore["oMT"]["iSubstances"] for _ in range(oStore["oMT"]["iSubstances"])]
+    arCompoundMass = CompoundMass(oStore["oMT"]["iSubstances"])
 
     # Populate the mass ratio vector and compound mass matrix
     for substance in csSubstances:
@@ -28,7 +31,7 @@ def mixture(oStore, sPhase, fVolume, trMassRatios, fTemperature=293.15, fPressur
         if oStore["oMT"]["abCompound"][iMatterIndexSubstance]:
             trBaseComposition = oStore["oMT"]["ttxMatter"][substance]["trBaseComposition"]
             for entry in trBaseComposition:
-                arCompoundMass[iMatterIndexSubstance][oStore["oMT"]["tiN2I"][entry]] = trBaseComposition[entry]
+                arCompoundMass.set_component(iMatterIndexSubstance, oStore["oMT"]["tiN2I"][entry], trBaseComposition[entry])
 
     # Resolve compound mass ratios
     mrResolvedMassRatios = oStore["oMT"]["resolveCompoundMass"](mrMassRatios, arCompoundMass)
@@ -1,3 +1,6 @@
+from matter.compoundMass import CompoundMass
+
+
 def solid(oStore, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
     """
     Helper to create a solid matter phase.
@@ -20,7 +23,7 @@ def solid(oStore, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
     csSubstances = list(trMassRatios.keys())
 
     # Initialize compound mass array
-    arCompoundMass = np.zeros((oStore["oMT"]["iSubstances"], oStore["oMT"]["iSubstances"]))
+    arCompoundMass = CompoundMass(oStore["oMT"]["iSubstances"])
 
     # Populate mass ratios and compound mass
     for substance in csSubstances:
@@ -30,7 +33,7 @@ def solid(oStore, fVolume, trMassRatios, fTemperature=293.15, fPressure=28300):
         if oStore["oMT"]["abCompound"][iMatterIndexSubstance]:
             trBaseComposition = oStore["oMT"]["ttxMatter"][substance]["trBaseComposition"]
             for entry, value in trBaseComposition.items():
-                arCompoundMass[iMatterIndexSubstance, oStore["oMT"]["tiN2I"][entry]] = value
+                arCompoundMass.set_component(iMatterIndexSubstance, oStore["oMT"]["tiN2I"][entry], value)
 
     # Resolve compound mass ratios
     mrResolvedMassRatios = oStore["oMT"]["resolveCompoundMass"](mrMassRatios, arCompoundMass)
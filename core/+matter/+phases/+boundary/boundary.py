@@ -6,6 +6,8 @@ class BoundaryPhase:
     and environmental conditions in test cases.
     """
 
+    bBoundary = True
+
     def __init__(self, store, name, tf_mass, temperature):
         """
         Constructor for the BoundaryPhase class.
@@ -31,6 +33,19 @@ class BoundaryPhase:
         self.density = self.store.oMT.calculate_density(self) if self.mass != 0 else 0
         self.boundary = True
         self.set_time_step_properties({"rMaxChange": float("inf"), "fMaxStep": float("inf")})
+        self._register_post_ticks()
+
+    def _register_post_ticks(self):
+        """
+        Registers the post tick callbacks of the boundary phase.
+
+        Only the mass update is registered. The properties of a boundary phase
+        only change through set_boundary_properties, which updates them
+        directly, and its time step is always the maximum time step.
+        """
+        self.bind_post_tick_mass_update = self.store.timer.register_post_tick(
+            self.mass_update, 'matter', 'phase_massupdate'
+        )
 
     def set_time_step_properties(self, properties):
         """
@@ -1,4 +1,10 @@
-class Flow:
+import numpy as np
+
+from matter.compoundMass import CompoundMass
+from matter.phase.phase import Phase
+
+
+class Flow(Phase):
     """
     Flow phase class
 
@@ -8,6 +14,8 @@ class Flow:
     work correctly if used with either a residual or a multi-branch solver!
     """
 
+    bFlow = True
+
     def __init__(self, oStore, sName, tfMass, fVolume, fTemperature):
         """
         Initializes the flow phase.
@@ -19,87 +27,208 @@ class Flow:
             fVolume (float): Assumed volume for the phase in m^3 (informative).
             fTemperature (float): Temperature of matter in phase.
         """
-        self.oStore = oStore
-        self.sName = sName
-        self.tfMass = tfMass
-        self.fVolume = fVolume
-        self.fTemperature = fTemperature
+        super().__init__(oStore, sName, tfMass, fTemperature)
 
-        self.fMass = sum(tfMass.values()) if tfMass else 0
+        self.fVolume = fVolume
         self.fInitialMass = self.fMass
         self.fDensity = self.fMass / self.fVolume if self.fVolume else 0
 
-        self.mfEmptyCompoundMassFlow = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
+        self.mfEmptyCompoundMassFlow = CompoundMass(self.oMT.iSubstances)
         self.fVirtualPressure = None
         self.oMultiBranchSolver = None
-        self.fPressureLastHeatCapacityUpdate = None
-        self.fTemperatureLastHeatCapacityUpdate = None
-        self.arPartialMassLastHeatCapacityUpdate = None
+        self.fSpecificHeatCapacityLastUpdate = None
+
+        # Total partial inflows of the phase and the contribution of each
+        # ExMe to them (flow rate, partial masses and partial inflows), so
+        # only the inflows of changed ExMes have to be recalculated
+        self.afPartialInFlows = np.zeros(self.oMT.iSubstances)
+        self.ttExMeInFlows = {}
+        self.iIncrementalInFlowUpdates = 0
 
         tTimeStepProperties = {"rMaxChange": 0.01}
         self.set_time_step_properties(tTimeStepProperties)
 
-        self.bFlow = True
         self.bind("update_partials", lambda: self.update_partials())
 
+    def _register_post_ticks(self):
+        """
+        Registers the post tick callbacks of the flow phase.
+
+        The mass of a flow phase does not change, so without a fixed time
+        step it always uses the maximum time step. Only the mass update and
+        the update are registered, the time step calculation is registered
+        once a fixed time step is used, see set_outdated_ts.
+        """
+        self.hBindPostTickMassUpdate = self.oTimer.register_post_tick(self.massupdate, 'matter', 'phase_massupdate')
+        self.hBindPostTickUpdate = self.oTimer.register_post_tick(self.update, 'matter', 'phase_update')
+        self.hBindPostTickTimeStep = None
+
+    def set_outdated_ts(self):
+        """
+        Updates the mass change rates of the flow phase and sets its maximum
+        time step directly. With a fixed time step the time step is
+        calculated in the post tick like for normal phases.
+        """
+        if self.fFixedTimeStep is None:
+            self.update_mass_change_rates()
+            if self.fTimeStep != self.fMaxStep:
+                self.apply_time_step(self.fMaxStep, None)
+            return
+
+        if self.hBindPostTickTimeStep is None:
+            self.hBindPostTickTimeStep = self.oTimer.register_post_tick(self.calculate_time_step, 'post_physics', 'timestep')
+        self.hBindPostTickTimeStep()
+
     def update_partials(self, afPartialInFlows=None):
         """
         Updates the arPartialMass property of the flow phase based on the current inflows.
 
         Args:
             afPartialInFlows (list): Partial mass flow in kg/s for each substance.
+                If not provided, the inflows are updated incrementally from
+                the ExMes of the phase (see calculate_inflows).
         """
         if not self.oStore.bSealed:
             return
 
         if afPartialInFlows is None:
             afPartialInFlows = self.calculate_inflows()
+        else:
+            afPartialInFlows = np.asarray(afPartialInFlows, dtype=float)
 
-        fTotalInFlow = sum(afPartialInFlows)
-        self.arPartialMass = [x / fTotalInFlow for x in afPartialInFlows] if fTotalInFlow else [0] * len(afPartialInFlows)
+        fTotalInFlow = afPartialInFlows.sum()
+        if fTotalInFlow:
+            self.arPartialMass = afPartialInFlows / fTotalInFlow
+        else:
+            self.arPartialMass = np.zeros(len(afPartialInFlows))
+
+    # Number of incremental updates of the partial inflows after which they
+    # are recalculated from all ExMes, to prevent the accumulation of
+    # rounding errors
+    iInFlowResyncInterval = 1000
 
     def calculate_inflows(self):
         """
         Helper function to calculate inflows when no inflows are explicitly provided.
 
+        The contribution of an ExMe is only recalculated if its flow rate
+        or partial mass vector has changed since the last call, the
+        difference is then applied to the total partial inflows.
+
         Returns:
-            list: Partial inflows calculated from connected EXMEs and manipulators.
+            numpy.ndarray: Partial inflows of the phase in kg/s.
         """
-        # Implement calculations as needed based on EXMEs and flow logic
-        return [0] * self.oMT.iSubstances
+        if self.iIncrementalInFlowUpdates >= self.iInFlowResyncInterval:
+            self.afPartialInFlows[:] = 0
+            self.ttExMeInFlows = {}
+            self.iIncrementalInFlowUpdates = 0
+
+        for oExMe in self.coProcsEXME:
+            fFlowRate, arPartials, _, _ = oExMe.getFlowData()
+            self.update_exme_inflow(oExMe, fFlowRate, arPartials)
+
+        return self.afPartialInFlows
+
+    def update_exme_inflow(self, oExMe, fFlowRate, arPartials):
+        """
+        Updates the contribution of one ExMe to the partial inflows of the
+        phase. Solvers that know which flows have changed can call this
+        directly and then call update_partials with the resulting inflows.
+
+        The partial mass vectors of phases and flows are replaced, not
+        modified in place, when they change, so an unchanged vector object
+        and flow rate means the contribution is still valid.
+
+        Args:
+            oExMe: ExMe of this phase.
+            fFlowRate (float): Flow rate through the ExMe in kg/s, positive
+                for flows into the phase.
+            arPartials: Partial mass ratios of the flow.
+
+        Returns:
+            numpy.ndarray: Partial inflows of the phase in kg/s.
+        """
+        tInFlow = self.ttExMeInFlows.get(oExMe)
+        if tInFlow is not None and tInFlow[0] == fFlowRate and tInFlow[1] is arPartials:
+            return self.afPartialInFlows
+
+        if tInFlow is not None and tInFlow[2] is not None:
+            self.afPartialInFlows -= tInFlow[2]
+
+        if fFlowRate > 0:
+            afInFlow = fFlowRate * np.asarray(arPartials, dtype=float)
+            self.afPartialInFlows += afInFlow
+        else:
+            afInFlow = None
+
+        self.ttExMeInFlows[oExMe] = (fFlowRate, arPartials, afInFlow)
+        self.iIncrementalInFlowUpdates += 1
+        return self.afPartialInFlows
+
+    def remove_exme_inflow(self, oExMe):
+        """
+        Removes the contribution of an ExMe to the partial inflows of the
+        phase, e.g. because its flow was removed or the ExMe was reconnected
+        to another phase.
+
+        Args:
+            oExMe: ExMe of this phase.
+        """
+        tInFlow = self.ttExMeInFlows.pop(oExMe, None)
+        if tInFlow is not None and tInFlow[2] is not None:
+            self.afPartialInFlows -= tInFlow[2]
 
     def set_handler(self, oMultiBranchSolver):
         """
-        Sets reference to multi-branch solver.
+        Sets reference to the solver that handles the flow phase, the
+        multi-branch solver or the residual solver network. It is notified
+        in the mass update of the phase (see register_phase_update).
 
         Args:
-            oMultiBranchSolver: Reference to the multi-branch solver.
+            oMultiBranchSolver: Reference to the solver.
         """
         self.oMultiBranchSolver = oMultiBranchSolver
 
     def update(self):
         """
-        Updates the flow phase, including heat capacity and density.
+        Updates the flow phase, including heat capacity and density. Both are
+        taken from the property cache of the matter table, which only
+        recalculates them if the state has left its tolerance band.
         """
-        if self.arPartialMass and (
-            not self.fPressureLastHeatCapacityUpdate
-            or abs(self.fPressureLastHeatCapacityUpdate - self.fPressure) > 100
-            or abs(self.fTemperatureLastHeatCapacityUpdate - self.fTemperature) > 1
-            or max(abs(x - y) for x, y in zip(self.arPartialMassLastHeatCapacityUpdate, self.arPartialMass)) > 0.01
-        ):
-            self.oCapacity.set_specific_heat_capacity(self.oMT.calculate_specific_heat_capacity(self))
-            self.fDensity = self.oMT.calculate_density(self)
+        if self.arPartialMass is None or len(self.arPartialMass) == 0:
+            return
 
-            self.fPressureLastHeatCapacityUpdate = self.fPressure
-            self.fTemperatureLastHeatCapacityUpdate = self.fTemperature
-            self.arPartialMassLastHeatCapacityUpdate = self.arPartialMass
+        fSpecificHeatCapacity = self.oMT.get_memoized_property(self, 'Heat Capacity')
+        if fSpecificHeatCapacity != self.fSpecificHeatCapacityLastUpdate:
+            self.oCapacity.set_specific_heat_capacity(fSpecificHeatCapacity)
+            self.fSpecificHeatCapacityLastUpdate = fSpecificHeatCapacity
+
+        self.fDensity = self.oMT.get_memoized_property(self, 'Density')
 
     def massupdate(self, *args):
         """
-        Updates mass and pressure of the flow phase.
+        Updates the pressure of the flow phase. The mass of a flow phase does
+        not change, so unlike the mass update of normal phases no masses are
+        integrated and the connected branches are not set outdated, they are
+        handled by the solver of the flow phase. The solver is only
+        notified, so it can solve the part of the network with this phase
+        again if flows from outside the solver changed.
+
+        The base mass update is not called, it would only integrate the
+        zero mass change of the phase.
         """
-        self.massupdate_base(*args)
+        fTime = self.oTimer.fTime
+        if fTime == self.fLastMassUpdate:
+            return
+
+        self.fMassUpdateTimeStep = fTime - self.fLastMassUpdate
+        self.fLastMassUpdate = fTime
+
         self.update_pressure()
+        if self.oMultiBranchSolver is not None:
+            self.oMultiBranchSolver.register_phase_update(self)
+        self.set_p2ps_and_manips_outdated()
+        self.set_outdated_ts()
 
     def update_pressure(self):
         """
@@ -109,15 +238,20 @@ class Flow:
             fTotalFlowRate = sum(abs(flow.fFlowRate) for flow in self.coProcsEXME if not flow.bFlowIsAProcP2P)
             fTotalPressure = sum(flow.fPressure * abs(flow.fFlowRate) for flow in self.coProcsEXME if not flow.bFlowIsAProcP2P)
 
-            if fTotalFlowRate:
-                self.fPressure = fTotalPressure / fTotalFlowRate
-                self.fMassToPressure = self.fPressure / self.fMass if self.fMass else 0
+            if fTotalFlowRate and self.fMass:
+                self.fMassToPressure = fTotalPressure / fTotalFlowRate / self.fMass
             else:
-                self.fPressure = 0
                 self.fMassToPressure = 0
         else:
             self.fMassToPressure = self.fVirtualPressure / self.fMass if self.fMass else 0
 
+    @property
+    def fPressure(self):
+        """
+        Pressure of the flow phase, see get_pressure.
+        """
+        return self.get_pressure()
+
     def get_pressure(self):
         """
         Gets the pressure of the flow phase, considering virtual pressure if applicable.
@@ -139,15 +273,6 @@ class Flow:
         self.fVirtualPressure = fPressure
         self.fMassToPressure = fPressure
 
-    def set_time_step_properties(self, tTimeStepProperties):
-        """
-        Sets time step properties for the flow phase.
-
-        Args:
-            tTimeStepProperties (dict): Dictionary of time step properties.
-        """
-        self.tTimeStepProperties = tTimeStepProperties
-
     def bind(self, event_name, callback):
         """
         Binds a callback to an event.
@@ -8,6 +8,11 @@ class ExMe:
     during branch definition.
     """
 
+    __slots__ = (
+        'sName', 'oMT', 'oTimer', 'oPhase', 'oFlow', 'bHasFlow', 'bFlowIsAProcP2P', 'iSign',
+        'oNewPhase', 'hReconnectExme', '__weakref__',
+    )
+
     def __init__(self, oPhase, sName):
         """
         Initializes the ExMe object.
@@ -126,6 +131,7 @@ class ExMe:
         """
         Removes the flow from this ExMe.
         """
+        self._remove_inflow()
         self.oFlow = None
         self.iSign = 0
 
@@ -137,6 +143,8 @@ class ExMe:
             if self.oNewPhase.oStore.oContainer != self.oPhase.oStore.oContainer:
                 raise RuntimeError(f"Cannot change the left-hand ExMe to a phase in a different system ({self.sName}).")
 
+        self._remove_inflow()
+
         oOldPhase = self.oPhase
         self.oPhase = self.oNewPhase
         oOldPhase.removeExMe(self)
@@ -150,8 +158,17 @@ class ExMe:
         """
         Disconnects the ExMe from its connected flow.
         """
+        self._remove_inflow()
         self.oFlow = None
 
+    def _remove_inflow(self):
+        """
+        Removes the inflow of this ExMe from the partial inflows that a flow
+        phase keeps for each of its ExMes (see Flow.update_exme_inflow).
+        """
+        if getattr(self.oPhase, 'bFlow', False):
+            self.oPhase.remove_exme_inflow(self)
+
     def reconnectFlow(self, oFlow):
         """
         Reconnects the ExMe to a previously disconnected flow.
@@ -1,3 +1,6 @@
+from importlib import import_module
+
+
 class F2F:
     """
     F2F (Flow-to-Flow) Processor
@@ -85,10 +88,20 @@ class F2F:
         Provides compatibility with specific solver types.
 
         Args:
-            sType (str): Type of the solver (e.g., 'callback', 'manual').
+            sType (str): Type of the solver (e.g., 'callback', 'manual'), the
+                name of a module in solver.matter.base.type. The module
+                contains the class of the type with a capitalized name.
             *args: Arguments for the specific solver type.
         """
-        solver_class = getattr(solver.matter.base.type, sType)
+        sModule = f"solver.matter.base.type.{sType}"
+        try:
+            oTypeModule = import_module(sModule)
+        except ModuleNotFoundError as oError:
+            if oError.name != sModule:
+                raise
+            raise ValueError(f"Unknown solver type '{sType}' of F2F processor '{self.sName}'.") from None
+
+        solver_class = getattr(oTypeModule, sType[0].upper() + sType[1:])
         self.toSolve[sType] = solver_class(*args)
 
     def getFlows(self, fFlowRate=None):
@@ -1,92 +1,100 @@
+import numpy as np
+
+from base import Base
+from matter.timeStepEvaluator import calculate_new_time_steps, get_time_step_constraints
+
+
 def calculate_time_step(self):
     """
     Calculates the next timestep for the phase.
     Determines the new timestep based on mass changes, inflows, outflows, and various constraints.
+
+    The calculation itself is the same vectorized calculation that the
+    TimeStepEvaluator uses to calculate the time steps of many phases at
+    once, here for a single phase. The time step constraints of the phase
+    are cached, see reset_time_step_constraints.
+    """
+    afPartialFlows = update_mass_change_rates(self)
+
+    tConstraints = getattr(self, 'tTimeStepConstraints', None)
+    if tConstraints is None:
+        tConstraints = get_time_step_constraints([self])
+        self.tTimeStepConstraints = tConstraints
+
+    afNewStep, csReason = calculate_new_time_steps(
+        afPartialFlows[np.newaxis, :], np.asarray(self.afMass, dtype=float)[np.newaxis, :],
+        np.array([self.fMass], dtype=float), tConstraints
+    )
+
+    apply_time_step(self, float(afNewStep[0]), csReason[0])
+
+
+def update_mass_change_rates(self):
+    """
+    Updates the current mass change rates of the phase from its inflows and
+    outflows.
+
+    Returns:
+        numpy.ndarray: Partial mass change rates in kg/s including the
+            substance manipulators.
     """
     # Get total mass change and details
     afChange, mfDetails, self.arInFlowCompoundMass = self.get_total_mass_change()
-    afTmpCurrentTotalInOuts = self.afCurrentTotalInOuts
 
-    # Update current inflow/outflow properties
-    self.afCurrentTotalInOuts = afChange
+    # Update current inflow/outflow properties. In the mass state arena the
+    # rates are a view into the arena and have to be updated in place
+    if getattr(self, 'iMassStateIndex', None) is not None:
+        self.afCurrentTotalInOuts[:] = afChange
+    else:
+        self.afCurrentTotalInOuts = afChange
     self.mfCurrentInflowDetails = mfDetails
 
     # Include substance manipulators if applicable
     if self.iSubstanceManipulators != 0:
-        afPartialFlows = self.afCurrentTotalInOuts + self.toManips.substance.afPartialFlows
-    else:
-        afPartialFlows = self.afCurrentTotalInOuts
+        return np.asarray(self.afCurrentTotalInOuts, dtype=float) + self.toManips.substance.afPartialFlows
 
-    # For boundary phases, use the maximum timestep
-    if self.bBoundary:
-        fNewStep = self.fMaxStep
-    else:
-        # Maximum timestep to avoid negative masses
-        abOutFlows = afPartialFlows < 0
-        fMaxFlowStep = min(abs((self.fMassErrorLimit + self.afMass[abOutFlows]) / afPartialFlows[abOutFlows]))
-
-        if self.fFixedTimeStep is not None:
-            fNewStep = self.fFixedTimeStep
-        elif self.bFlow:
-            fNewStep = self.fMaxStep
-        else:
-            # Calculate partial mass changes per second
-            abChange = afPartialFlows != 0
-            arPartialsChange = abs(afPartialFlows[abChange] / self.round_prec(self.fMass, self.iTimeStepPrecision))
-            rPartialsPerSecond = max(arPartialsChange[~np.isinf(arPartialsChange)]) if arPartialsChange.size > 0 else 0
-
-            # Total mass change per second
-            fChange = sum(afPartialFlows)
-            rTotalPerSecond = abs(self.round_prec(fChange, self.iTimeStepPrecision) / self.fMass) if fChange != 0 else 0
-
-            # Partial mass changes compared to individual masses
-            if self.bHasSubstanceSpecificMaxChangeValues:
-                afCurrentMass = np.copy(self.afMass)
-                afCurrentMass[self.afMass < 10 ** (-self.iTimeStepPrecision)] = 10 ** (-self.iTimeStepPrecision)
-                arPartialChangeToPartials = abs(afPartialFlows / self.round_prec(afCurrentMass, self.iTimeStepPrecision))
-                arPartialChangeToPartials[self.afMass == 0] = 0
-                afNewStepPartialChangeToPartials = self.arMaxChange / arPartialChangeToPartials
-                afNewStepPartialChangeToPartials[self.arMaxChange == 0] = float('inf')
-                fNewStepPartialChangeToPartials = min(afNewStepPartialChangeToPartials)
-            else:
-                fNewStepPartialChangeToPartials = float('inf')
-
-            # Calculate the new timestep
-            fNewStepTotal = self.rMaxChange / rTotalPerSecond
-            fNewStepPartials = self.rMaxChange / rPartialsPerSecond
-            fNewStep = min(fNewStepTotal, fNewStepPartials, fNewStepPartialChangeToPartials)
-
-            # Handle special cases for zero mass phases
-            if self.fMass == 0:
-                if fChange < 0:
-                    fNewStep = abs(self.fMassErrorLimit / fChange)
-                else:
-                    fNewStep = abs(self.fMaximumInitialMass / fChange)
-
-    # Ensure timestep is within allowable bounds
-    if fNewStep > self.fMaxStep:
-        fNewStep = self.fMaxStep
-        self.log_debug(2, "max-time-step", f"Setting maximum timestep: {fNewStep:.16f}s")
-
-    elif fNewStep < self.fMinStep:
-        fNewStep = self.fMinStep
-        self.log_debug(2, "min-time-step", f"Setting minimum timestep: {fNewStep:.16f}s")
-
-    # Debugging outputs
-    self.log_debug(1, "new-timestep", f"New timestep: {fNewStep:.16f}s")
-    self.log_debug(1, "mass-changes", f"Mass: {self.fMass:.16f} kg, Change Rate: {sum(self.afCurrentTotalInOuts):.16f} kg/s")
-
-    # Compare with the maximum flow timestep
-    if fNewStep > fMaxFlowStep:
-        fNewStep = fMaxFlowStep
-        if fNewStep < self.fMinStep:
-            fNewStep = self.fMinStep
+    return np.asarray(self.afCurrentTotalInOuts, dtype=float)
+
+
+def apply_time_step(self, fNewStep, sReason):
+    """
+    Sets the new time step of the phase.
+
+    Args:
+        fNewStep (float): New time step in s.
+        sReason (str): 'max' or 'min' if the step was limited to the maximum
+            or minimum time step, only used for debugging.
+    """
+    # Debugging outputs are only formatted if the debugger is active
+    if Base.o_debug is not None and not Base.o_debug.b_off:
+        if sReason == 'max':
+            self.log_debug(2, "max-time-step", "Setting maximum timestep: %.16fs", fNewStep)
+        elif sReason == 'min':
+            self.log_debug(2, "min-time-step", "Setting minimum timestep: %.16fs", fNewStep)
+
+        self.log_debug(1, "new-timestep", "New timestep: %.16fs", fNewStep)
+        self.log_debug(1, "mass-changes", "Mass: %.16f kg, Change Rate: %.16f kg/s",
+                       self.fMass, float(np.sum(self.afCurrentTotalInOuts)))
 
     # Update the phase's timestep
     if self.fLastUpdate == self.oTimer.fTime or self.bFlow:
-        self.set_time_step(fNewStep, reset_last_exec=True)
+        self.set_time_step(fNewStep, True)
     else:
         self.set_time_step(fNewStep)
 
     # Cache the timestep for logging or further processing
     self.fTimeStep = fNewStep
+
+
+def reset_time_step_constraints(self):
+    """
+    Discards the cached time step constraints of the phase, including the
+    ones collected by the time step evaluator. Must be called when the time
+    step properties (e.g. rMaxChange, fMaxStep or fFixedTimeStep) of the
+    phase are changed, see set_time_step_properties.
+    """
+    self.tTimeStepConstraints = None
+
+    oTimeStepEvaluator = getattr(self, 'oTimeStepEvaluator', None)
+    if oTimeStepEvaluator is not None:
+        oTimeStepEvaluator.reset_constraints()
@@ -1,5 +1,12 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from base import Base
+from matter.compoundMass import CompoundMass
+from matter.phase.calculateTimeStep import (calculate_time_step, update_mass_change_rates, apply_time_step,
+                                            reset_time_step_constraints)
+
 class Phase(ABC):
     """
     Phase with isotropic properties (abstract class).
@@ -9,6 +16,18 @@ class Phase(ABC):
 
     sObjectType = 'phase'  # Object type identifier for all derived classes
 
+    # Flow phases (see Flow) enforce zero mass change and boundary phases
+    # (see BoundaryPhase) contain an infinite amount of matter, both register
+    # reduced post ticks
+    bFlow = False
+    bBoundary = False
+
+    # Methods defined in the function files of the @phase folder
+    calculate_time_step = calculate_time_step
+    update_mass_change_rates = update_mass_change_rates
+    apply_time_step = apply_time_step
+    reset_time_step_constraints = reset_time_step_constraints
+
     @abstractmethod
     def __init__(self, oStore, sName, tfMass=None, fTemperature=None):
         """
@@ -25,13 +44,28 @@ class Phase(ABC):
         self.oMT = oStore.oMT
         self.oTimer = oStore.oTimer
 
-        self.afMass = [0] * self.oMT.iSubstances
-        self.arPartialMass = [0] * self.oMT.iSubstances
-        self.arCompoundMass = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
-        self.arInFlowCompoundMass = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
-        self.afEmptyCompoundMassArray = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
+        # All per-substance state of the phase is stored in contiguous
+        # float64 arrays, so it can be updated in place with vectorized
+        # operations
+        self.afMass = np.zeros(self.oMT.iSubstances)
+        self.arPartialMass = np.zeros(self.oMT.iSubstances)
+        # Only the compounds that are present are stored (see CompoundMass)
+        self.arCompoundMass = CompoundMass(self.oMT.iSubstances)
+        self.arInFlowCompoundMass = CompoundMass(self.oMT.iSubstances)
+        self.afEmptyCompoundMassArray = CompoundMass(self.oMT.iSubstances)
         self.fMinStep = self.oTimer.fMinimumTimeStep
 
+        # Time step properties, see set_time_step_properties
+        self.rMaxChange = 0.25
+        self.arMaxChange = np.zeros(self.oMT.iSubstances)
+        self.bHasSubstanceSpecificMaxChangeValues = False
+        self.fMaxStep = 60
+        self.fFixedTimeStep = None
+        self.fMassErrorLimit = 0
+        self.fMaximumInitialMass = 0
+        self.iTimeStepPrecision = 7
+        self.tTimeStepConstraints = None
+
         if tfMass and isinstance(tfMass, dict):
             if not fTemperature or fTemperature <= 0:
                 raise ValueError("fTemperature must be provided and greater than zero when tfMass is specified.")
@@ -40,22 +74,85 @@ class Phase(ABC):
             self.set_temperature(fTemperature)
         else:
             self.fMass = 0
-            self.arPartialMass = self.afMass
+            self.arPartialMass = np.zeros(self.oMT.iSubstances)
 
             self.set_temperature(self.oMT.Standard.Temperature)
 
         self.fMolarMass = self.oMT.calculate_molar_mass(self.afMass)
-        self.fMass = sum(self.afMass)
-        self.afMassGenerated = [0] * self.oMT.iSubstances
+        self.fMass = float(np.sum(self.afMass))
+        self.afMassGenerated = np.zeros(self.oMT.iSubstances)
         self.fMassToPressure = 0  # Will be set later
 
         self.fMassLastUpdate = 0
-        self.afMassLastUpdate = [0] * self.oMT.iSubstances
+        self.afMassLastUpdate = np.zeros(self.oMT.iSubstances)
+        self.fLastMassUpdate = 0
+        self.afCurrentTotalInOuts = np.zeros(self.oMT.iSubstances)
+
+        self.fTimeStep = None
+        self.fLastUpdate = -1
+        self._register_post_ticks()
 
+        # The timer registers the update of the phase once its time step
+        # has passed, the time step is set by apply_time_step
+        self.set_time_step, self.unbind_timer = self.oTimer.bind(
+            lambda _: self.register_update(),
+            float('inf'),
+            {
+                'sMethod': 'register_update',
+                'sDescription': 'The .register_update method of a phase',
+                'oSrcObj': self,
+            }
+        )
+
+    def _register_post_ticks(self):
+        """
+        Registers the post tick callbacks of the phase.
+
+        Phases register the mass update, the update and the time step
+        calculation.
+        """
         self.hBindPostTickMassUpdate = self.oTimer.register_post_tick(self.massupdate, 'matter', 'phase_massupdate')
         self.hBindPostTickUpdate = self.oTimer.register_post_tick(self.update, 'matter', 'phase_update')
         self.hBindPostTickTimeStep = self.oTimer.register_post_tick(self.calculate_time_step, 'post_physics', 'timestep')
 
+    def set_time_step_properties(self, tTimeStepProperties):
+        """
+        Sets the properties that limit the time step of the phase.
+
+        Args:
+            tTimeStepProperties (dict): Any of rMaxChange, arMaxChange (list
+                for all substances or dict of substance names), fMaxStep,
+                fMinStep, fFixedTimeStep, fMassErrorLimit,
+                fMaximumInitialMass and iTimeStepPrecision.
+        """
+        csValidFields = ('rMaxChange', 'arMaxChange', 'fMaxStep', 'fMinStep', 'fFixedTimeStep', 'fMassErrorLimit',
+                         'fMaximumInitialMass', 'iTimeStepPrecision')
+
+        for sField, xValue in tTimeStepProperties.items():
+            if sField not in csValidFields:
+                raise ValueError(f"The time step property {sField} does not exist for phases.")
+
+            if sField == 'arMaxChange':
+                arMaxChange = np.zeros(self.oMT.iSubstances)
+                if isinstance(xValue, dict):
+                    for sSubstance, rMaxChange in xValue.items():
+                        arMaxChange[self.oMT.tiN2I[sSubstance]] = rMaxChange
+                else:
+                    if len(xValue) != self.oMT.iSubstances:
+                        raise ValueError("arMaxChange must contain a value for each substance of the matter table.")
+                    arMaxChange[:] = xValue
+
+                self.arMaxChange = arMaxChange
+                self.bHasSubstanceSpecificMaxChangeValues = bool(np.any(arMaxChange))
+            else:
+                setattr(self, sField, xValue)
+
+        if self.fMinStep > self.fMaxStep:
+            raise ValueError(f"The minimum time step of phase {self.sName} is larger than its maximum time step.")
+
+        self.reset_time_step_constraints()
+        self.set_outdated_ts()
+
     def _initialize_mass(self, tfMass):
         """
         Initializes the mass properties based on the input mass dictionary.
@@ -69,8 +166,8 @@ class Phase(ABC):
             if self.oMT.abCompound[idx]:
                 self._handle_compound_mass(substance, mass)
 
-        self.fMass = sum(self.afMass)
-        self.arPartialMass = [m / self.fMass if self.fMass > 0 else 0 for m in self.afMass]
+        self.fMass = float(np.sum(self.afMass))
+        self.arPartialMass = self._calculate_partial_mass()
 
     def _handle_compound_mass(self, substance, mass):
         """
@@ -81,7 +178,7 @@ class Phase(ABC):
 
         for component, ratio in compound.trBaseComposition.items():
             comp_idx = self.oMT.tiN2I[component]
-            self.arCompoundMass[idx][comp_idx] = ratio
+            self.arCompoundMass.set_component(idx, comp_idx, ratio)
 
     def set_temperature(self, fTemperature):
         """
@@ -105,29 +202,91 @@ class Phase(ABC):
         self.fLastMassUpdate = fTime
         self.fMassUpdateTimeStep = fLastStep
 
-        afTotalInOuts = self.afCurrentTotalInOuts
-        afTotalInOuts = [flow * fLastStep for flow in afTotalInOuts]
+        # The mass is updated in place. Negative masses are set to zero and
+        # the mass that had to be generated for this is stored
+        self.afMass += np.asarray(self.afCurrentTotalInOuts, dtype=float) * fLastStep
 
-        for i, mass in enumerate(self.afMass):
-            self.afMass[i] += afTotalInOuts[i]
-            if self.afMass[i] < 0:
-                self.afMassGenerated[i] -= self.afMass[i]
-                self.afMass[i] = 0
+        abNegative = self.afMass < 0
+        if abNegative.any():
+            self.afMassGenerated[abNegative] -= self.afMass[abNegative]
+            self.afMass[abNegative] = 0
 
-        self.fMass = sum(self.afMass)
-        self.arPartialMass = [m / self.fMass if self.fMass > 0 else 0 for m in self.afMass]
+        self.finish_massupdate()
+
+    def finish_massupdate(self, fMass=None):
+        """
+        Updates the total mass and the partial mass ratios after the masses
+        were integrated and notifies the connected objects. Also called by the
+        vectorized mass update of the mass state arena.
+
+        Args:
+            fMass (float): Total mass of the phase in kg, if it is already
+                known.
+        """
+        self.fMass = float(np.sum(self.afMass)) if fMass is None else fMass
+        self.arPartialMass = self._calculate_partial_mass()
 
         self.set_branches_outdated()
         self.set_p2ps_and_manips_outdated()
         self.set_outdated_ts()
 
+    def update(self):
+        """
+        Updates the properties of the phase. Extended by the phase types,
+        which calculate their specific properties.
+        """
+        self.fLastUpdate = self.oTimer.fTime
+
+    def register_update(self):
+        """
+        Registers a mass update and an update of the phase in the post tick.
+        """
+        self.hBindPostTickMassUpdate()
+        self.hBindPostTickUpdate()
+
+    def register_massupdate(self):
+        """
+        Registers a mass update of the phase in the post tick, e.g. because a
+        connected flow rate changed.
+        """
+        self.hBindPostTickMassUpdate()
+
+    def bind_mass_state(self, afMass, afMassGenerated, afCurrentTotalInOuts):
+        """
+        Moves the mass vectors of the phase into the provided vectors, which
+        are views into the mass state arena of the simulation container
+        (see MassStateArena). The current values are copied.
+
+        Args:
+            afMass: Vector that stores the masses of the phase from now on.
+            afMassGenerated: Vector that stores the generated masses.
+            afCurrentTotalInOuts: Vector that stores the mass change rates.
+        """
+        afMass[:] = self.afMass
+        afMassGenerated[:] = self.afMassGenerated
+        afCurrentTotalInOuts[:] = self.afCurrentTotalInOuts
+        self.afMass = afMass
+        self.afMassGenerated = afMassGenerated
+        self.afCurrentTotalInOuts = afCurrentTotalInOuts
+
+    def _calculate_partial_mass(self):
+        """
+        Calculates the partial mass ratios from the current masses.
+        """
+        if self.fMass > 0:
+            return self.afMass / self.fMass
+        return np.zeros(len(self.afMass))
+
     def set_branches_outdated(self):
         """
-        Sets branches connected to this phase as outdated.
+        Sets branches connected to this phase as outdated. Branches that are
+        already outdated in this tick only count the notification (see
+        MatterBranch.setOutdated).
         """
         for exme in self.coProcsEXME:
-            branch = exme.oFlow.oBranch
-            branch.set_outdated()
+            if exme.oFlow is None or exme.bFlowIsAProcP2P:
+                continue
+            exme.oFlow.oBranch.setOutdated()
 
     def set_p2ps_and_manips_outdated(self):
         """
@@ -138,6 +297,16 @@ class Phase(ABC):
         if self.iVolumeManipulators > 0:
             self.toManips.volume.register_update()
 
+    def log_debug(self, iLevel, sIdentifier, sMessage, *cParams):
+        """
+        Passes a debug message to the debugger. The message is formatted with
+        the parameters by the debugger, so callers should check that the
+        debugger is active before collecting expensive parameters.
+        """
+        if Base.o_debug is None or Base.o_debug.b_off:
+            return
+        Base.o_debug.output(self, iLevel, 1, sIdentifier, sMessage, list(cParams))
+
     def set_outdated_ts(self):
         """
         Marks the phase's timestep as outdated for recalculation.
@@ -151,3 +320,7 @@ class Phase(ABC):
         """
         fMassSinceUpdate = self.fCurrentTotalMassInOut * (self.oTimer.fTime - self.fLastMassUpdate)
         return self.fMassToPressure * (self.fMass + fMassSinceUpdate)
+
+    # Names used by the branches, P2Ps and components
+    registerMassupdate = register_massupdate
+    registerUpdate = register_update
@@ -80,7 +80,7 @@ def calculate_partial_pressures(self, *args):
 
     # Adjust for two-phase systems
     if bIsMixture:
-        aiPhases = self.determine_phase(afMass, fTemperature, afPartialPressures)
+        aiPhases, _ = self.determine_phase(afMass, fTemperature, afPartialPressures)
         miTwoPhaseIndices = [i for i, phase in enumerate(aiPhases) if phase % 1 != 0]
         for iK in miTwoPhaseIndices:
             afPartialPressures[iK] = self.calculate_vapor_pressure(fTemperature, self.csSubstances[iK])
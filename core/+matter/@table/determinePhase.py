@@ -1,11 +1,21 @@
+import numpy as np
+
+
 def determine_phase(self, s_substance, f_temperature, f_pressure):
     """
     Determine the phase of a substance based on temperature and pressure.
 
+    The phase is looked up in the phase boundary index of the matter table
+    (see build_phase_boundary_index), for a mass vector all substances are
+    handled in one vectorized lookup. Non-integer phases (e.g. 2.5) indicate
+    that the state lies between two phases in the data, i.e. at a phase
+    transition.
+
     Args:
         s_substance (str or list): Substance name or mass vector.
         f_temperature (float): Temperature in Kelvin.
-        f_pressure (float or list): Pressure in Pascal.
+        f_pressure (float or list): Pressure in Pascal, for a mass vector
+            the partial pressure of each substance.
 
     Returns:
         mi_phase (int): Phase indicator (1=solid, 2=liquid, 3=gas, 4=supercritical).
@@ -13,100 +23,220 @@ def determine_phase(self, s_substance, f_temperature, f_pressure):
     """
     cs_phase = ["Solid", "Liquid", "Gas", "Supercritical"]
 
-    if isinstance(s_substance, list):  # Case for a mass vector
-        cs_substances = [self.cs_substances[i] for i, mass in enumerate(s_substance) if mass != 0]
+    if not isinstance(s_substance, str):  # Case for a mass vector
+        af_mass = np.asarray(s_substance, dtype=float)
+        ai_substances = np.flatnonzero(af_mass)
 
-        if any(self.ab_compound[i] for i, mass in enumerate(s_substance) if mass != 0):
+        if np.any(np.asarray(self.abCompound)[ai_substances]):
             raise ValueError("Resolve compound masses using the `resolve_compound_mass` function before using `determine_phase`.")
 
-        mi_phase = [0] * self.i_substances
-        for substance in cs_substances:
-            phase, _ = self._determine_phase_for_substance(substance, f_temperature, f_pressure[self.ti_n2i[substance]])
-            mi_phase[self.ti_n2i[substance]] = phase
+        af_phase = lookup_phases(self, ai_substances, f_temperature, np.asarray(f_pressure, dtype=float)[ai_substances])
 
-        try:
-            cs_possible_phase = [cs_phase[i - 1] for i in set(mi_phase) if i != 0]
-        except Exception:
+        mi_phase = np.zeros(self.iSubstances)
+        mi_phase[ai_substances] = af_phase
+
+        af_unique_phases = np.unique(af_phase)
+        if np.all(af_unique_phases % 1 == 0):
+            cs_possible_phase = [cs_phase[int(f_phase) - 1] for f_phase in af_unique_phases]
+        else:
             cs_possible_phase = ["PhaseChanging"]
 
     else:  # Single substance
-        mi_phase, cs_possible_phase = self._determine_phase_for_substance(s_substance, f_temperature, f_pressure)
+        f_phase = lookup_phases(self, np.array([self.tiN2I[s_substance]]), f_temperature, np.array([f_pressure], dtype=float))[0]
+
+        if f_phase % 1 == 0:
+            mi_phase = int(f_phase)
+            cs_possible_phase = [cs_phase[mi_phase - 1]]
+        else:
+            mi_phase = f_phase
+            cs_possible_phase = cs_phase[int(f_phase) - 1:int(f_phase) + 1]
 
     return mi_phase, cs_possible_phase
 
-def _determine_phase_for_substance(self, s_substance, f_temperature, f_pressure):
+
+def lookup_phases(self, ai_substances, f_temperature, af_pressures):
     """
-    Determine phase for a specific substance.
+    Vectorized phase lookup in the phase boundary index.
+
+    For each substance the pressure level of the index at or below its
+    pressure is selected. The phase then follows from comparing the
+    temperature with the transition temperatures at that level.
 
     Args:
-        s_substance (str): Substance name.
+        ai_substances (array): Indices of the substances.
         f_temperature (float): Temperature in Kelvin.
-        f_pressure (float): Pressure in Pascal.
+        af_pressures (array): Pressure of each substance in Pascal.
 
     Returns:
-        mi_phase (int): Phase indicator.
-        cs_possible_phase (list): Possible phases.
+        array: Phase of each substance, non-integer at phase transitions.
     """
-    cs_phase = ["Solid", "Liquid", "Gas", "Supercritical"]
+    t_index = self.tPhaseBoundaryIndex
 
-    if not self.ttx_matter[s_substance]["bIndividualFile"]:
-        cs_possible_phase = [phase.replace("t", "") for phase in self.ttx_matter[s_substance]["ttxPhases"].keys()]
-        mi_phase = cs_phase.index(cs_possible_phase[0]) + 1
-        return mi_phase, cs_possible_phase
-
-    if "tPhaseIdentification" not in self.ttx_matter[s_substance]["tIsobaricData"]:
-        # Construct mfData matrix
-        mf_data = []
-        for i_phase, phase in enumerate(cs_phase):
-            data = self.ttx_matter[s_substance]["tIsobaricData"][f"t{phase}"]["mfData"]
-            temperature, pressure = data[:, 0], data[:, 1]
-            mf_data.extend([[t, p, i_phase + 1] for t, p in zip(temperature, pressure) if not (t is None or p is None)])
-
-        # Remove duplicates
-        mf_data = list({tuple(row) for row in mf_data})
-
-        # Create interpolation
-        mf_data.sort()
-        temperatures, pressures, phases = zip(*mf_data)
-        interpolation = self.create_interpolation(temperatures, pressures, phases)
-        self.ttx_matter[s_substance]["tIsobaricData"]["tPhaseIdentification"] = {
-            "tInterpolation": interpolation,
-            "bInterpolation": True,
-            "ttExtremes": {
-                "tTemperature": {"Min": min(temperatures), "Max": max(temperatures)},
-                "tPressure": {"Min": min(pressures), "Max": max(pressures)},
-            },
-        }
-
-    # Adjust temperature and pressure if outside interpolation bounds
-    extremes = self.ttx_matter[s_substance]["tIsobaricData"]["tPhaseIdentification"]["ttExtremes"]
-    f_temperature = max(min(f_temperature, extremes["tTemperature"]["Max"]), extremes["tTemperature"]["Min"])
-    f_pressure = max(min(f_pressure, extremes["tPressure"]["Max"]), extremes["tPressure"]["Min"])
-
-    # Perform interpolation
-    interpolation = self.ttx_matter[s_substance]["tIsobaricData"]["tPhaseIdentification"]["tInterpolation"]
-    f_phase = interpolation(f_temperature, f_pressure)
-
-    # Handle numerical errors
-    f_phase = round(f_phase, 6)
-
-    cs_possible_phase = cs_phase[int(f_phase) - 1 : int(f_phase)]
-    mi_phase = int(f_phase)
+    # Substances are only added to the index when their phase is first
+    # requested, so their data does not have to be loaded at startup
+    ai_missing = ai_substances[~t_index["abIndexed"][ai_substances]]
+    if ai_missing.size > 0:
+        add_to_phase_boundary_index(self, np.unique(ai_missing))
 
-    return mi_phase, cs_possible_phase
+    ab_fixed = t_index["aiFixedPhase"][ai_substances] != 0
+    af_phase = t_index["aiFixedPhase"][ai_substances].astype(float)
+
+    ai_indexed = ai_substances[~ab_fixed]
+    if ai_indexed.size == 0:
+        return af_phase
+
+    # Temperature is limited to the range of the data of each substance
+    af_temperature = np.clip(f_temperature, t_index["afMinTemperature"][ai_indexed], t_index["afMaxTemperature"][ai_indexed])
 
-def create_interpolation(self, temperatures, pressures, phases):
+    # The pressure levels are padded with infinity, so counting the levels
+    # at or below the pressure results in the level index
+    mf_levels = t_index["mfPressure"][ai_indexed]
+    ai_level = np.sum(mf_levels <= af_pressures[~ab_fixed, np.newaxis], axis=1) - 1
+    ai_level = np.clip(ai_level, 0, t_index["aiLevels"][ai_indexed] - 1)
+
+    # Lower and upper transition temperatures into liquid, gas and
+    # supercritical phase at the selected level (n x 3)
+    mf_lower = t_index["mfTransitionLower"][ai_indexed, ai_level]
+    mf_upper = t_index["mfTransitionUpper"][ai_indexed, ai_level]
+
+    af_column_temperature = af_temperature[:, np.newaxis]
+    ai_phase = 1 + np.sum(af_column_temperature >= mf_upper, axis=1)
+    ab_transition = np.any((af_column_temperature > mf_lower) & (af_column_temperature < mf_upper), axis=1)
+
+    af_phase[~ab_fixed] = ai_phase + 0.5 * ab_transition
+    return af_phase
+
+
+def build_phase_boundary_index(self):
+    """
+    Initializes the phase boundary index, which holds the phase boundaries
+    of the substances in arrays, so the phase can be determined without
+    interpolation.
+
+    For each pressure level of the isobaric data of a substance the lower
+    and upper transition temperatures into the liquid, gas and supercritical
+    phase are stored. The lower value is the highest temperature of the data
+    below the transition, the upper value the lowest temperature of the data
+    above it. Substances without individual data files have a fixed phase.
+    The rows of the substances are filled by add_to_phase_boundary_index
+    when the phase of a substance is first requested.
+    """
+    self.tPhaseBoundaryIndex = {
+        "abIndexed": np.zeros(self.iSubstances, dtype=bool),
+        "aiFixedPhase": np.zeros(self.iSubstances, dtype=int),
+        "aiLevels": np.ones(self.iSubstances, dtype=int),
+        "mfPressure": np.full((self.iSubstances, 1), np.inf),
+        "mfTransitionLower": np.full((self.iSubstances, 1, 3), -np.inf),
+        "mfTransitionUpper": np.full((self.iSubstances, 1, 3), -np.inf),
+        "afMinTemperature": np.full(self.iSubstances, -np.inf),
+        "afMaxTemperature": np.full(self.iSubstances, np.inf),
+    }
+
+
+def add_to_phase_boundary_index(self, ai_substances):
+    """
+    Adds the phase boundaries of the given substances to the phase boundary
+    index. The level dimension of the index grows if a substance has more
+    pressure levels than the substances indexed so far. Raises a ValueError
+    for substances without any phase data.
+
+    Args:
+        ai_substances (array): Indices of the substances.
+    """
+    cs_phase = ["Solid", "Liquid", "Gas", "Supercritical"]
+    t_index = self.tPhaseBoundaryIndex
+
+    for i_substance in ai_substances:
+        s_substance = self.csSubstances[i_substance]
+        tx_matter = self.ttxMatter[s_substance]
+
+        # Substances without isobaric data in their individual files are
+        # handled like substances without individual files
+        if not tx_matter.get("bIndividualFile", False) or "tIsobaricData" not in tx_matter:
+            cs_possible_phase = [phase.replace("t", "", 1).capitalize() for phase in tx_matter.get("ttxPhases", {}).keys()]
+            if not cs_possible_phase or cs_possible_phase[0] not in cs_phase:
+                raise ValueError(f"The phase of {s_substance} cannot be determined, the matter table contains no phase data for it.")
+
+            t_index["aiFixedPhase"][i_substance] = cs_phase.index(cs_possible_phase[0]) + 1
+            t_index["abIndexed"][i_substance] = True
+            continue
+
+        t_boundaries = _calculate_phase_boundaries(tx_matter["tIsobaricData"], cs_phase)
+        i_levels = len(t_boundaries["afPressure"])
+
+        i_missing_levels = i_levels - t_index["mfPressure"].shape[1]
+        if i_missing_levels > 0:
+            t_index["mfPressure"] = np.pad(t_index["mfPressure"], ((0, 0), (0, i_missing_levels)), constant_values=np.inf)
+            for s_field in ("mfTransitionLower", "mfTransitionUpper"):
+                t_index[s_field] = np.pad(t_index[s_field], ((0, 0), (0, i_missing_levels), (0, 0)), constant_values=-np.inf)
+
+        t_index["aiLevels"][i_substance] = i_levels
+        t_index["mfPressure"][i_substance, :i_levels] = t_boundaries["afPressure"]
+        t_index["mfTransitionLower"][i_substance, :i_levels] = t_boundaries["mfLower"]
+        t_index["mfTransitionUpper"][i_substance, :i_levels] = t_boundaries["mfUpper"]
+        t_index["afMinTemperature"][i_substance] = t_boundaries["fMinTemperature"]
+        t_index["afMaxTemperature"][i_substance] = t_boundaries["fMaxTemperature"]
+        t_index["abIndexed"][i_substance] = True
+
+
+def _calculate_phase_boundaries(tx_isobaric_data, cs_phase):
     """
-    Create an interpolation function for phase determination.
+    Calculates the transition temperatures for each pressure level from
+    the isobaric data of a substance.
 
     Args:
-        temperatures (list): List of temperatures.
-        pressures (list): List of pressures.
-        phases (list): List of phases.
+        tx_isobaric_data (dict): Isobaric data of the substance.
+        cs_phase (list): Names of the phases.
 
     Returns:
-        interpolation: Interpolation function.
+        dict: Pressure levels (afPressure), lower and upper transition
+            temperatures (mfLower, mfUpper) and the temperature range.
     """
-    from scipy.interpolate import LinearNDInterpolator
-    points = list(zip(temperatures, pressures))
-    return LinearNDInterpolator(points, phases)
+    t_columns = tx_isobaric_data.get("tColumns", {})
+    i_temperature = t_columns.get("Temperature", 0)
+    i_pressure = t_columns.get("Pressure", 1)
+
+    cm_data = []
+    for i_phase, s_phase in enumerate(cs_phase):
+        t_phase = tx_isobaric_data.get(f"t{s_phase}")
+        if t_phase is None:
+            continue
+        mf_data = np.asarray(t_phase["mfData"])[:, [i_temperature, i_pressure]]
+        mf_data = mf_data[~np.isnan(mf_data).any(axis=1)]
+        cm_data.append(np.column_stack((mf_data, np.full(len(mf_data), i_phase + 1))))
+
+    mf_data = np.vstack(cm_data)
+
+    # The data contains the saturation states as additional points at
+    # pressures that differ only marginally from the regular pressure
+    # levels, these are merged into the preceding level
+    af_unique_pressure = np.unique(mf_data[:, 1])
+    ab_new_level = np.concatenate(([True], np.diff(af_unique_pressure) > 1e-6 * af_unique_pressure[1:]))
+    ai_unique_level = np.cumsum(ab_new_level) - 1
+    ai_data_level = ai_unique_level[np.searchsorted(af_unique_pressure, mf_data[:, 1])]
+    af_pressure = af_unique_pressure[ab_new_level]
+
+    # Default for transitions without data below them: always passed
+    mf_lower = np.full((len(af_pressure), 3), -np.inf)
+    mf_upper = np.full((len(af_pressure), 3), -np.inf)
+
+    for i_level in range(len(af_pressure)):
+        mf_level = mf_data[ai_data_level == i_level]
+
+        for i_transition, i_phase in enumerate((2, 3, 4)):
+            ab_below = mf_level[:, 2] < i_phase
+            if ab_below.all():
+                # No data above the transition, it is never reached
+                mf_lower[i_level, i_transition] = np.inf
+                mf_upper[i_level, i_transition] = np.inf
+            elif ab_below.any():
+                mf_lower[i_level, i_transition] = mf_level[ab_below, 0].max()
+                mf_upper[i_level, i_transition] = mf_level[~ab_below, 0].min()
+
+    return {
+        "afPressure": af_pressure,
+        "mfLower": mf_lower,
+        "mfUpper": mf_upper,
+        "fMinTemperature": mf_data[:, 0].min(),
+        "fMaxTemperature": mf_data[:, 0].max(),
+    }
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def find_closest_valid_matter_entry(self, t_parameters):
     """
     Find the closest valid value for the demanded property stored in the matter table.
@@ -50,7 +53,7 @@ def find_closest_valid_matter_entry(self, t_parameters):
     if not isinstance(b_use_isobaric_data, bool):
         raise ValueError("Isobaric data selector must be a boolean.")
 
-    tx_matter_for_substance = self.ttx_matter[s_substance]
+    tx_matter_for_substance = self.ttxMatter[s_substance]
 
     # Determine the type of data
     if tx_matter_for_substance["bIndividualFile"]:
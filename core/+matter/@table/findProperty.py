@@ -1,7 +1,16 @@
+import numpy as np
+from scipy.interpolate import interp1d, LinearNDInterpolator
+
+
 def find_property(self, t_parameters):
     """
     Helper method to find substance properties in the matter table.
 
+    The interpolation for each combination of substance, property, phase,
+    dependencies and data type is only created on first use and then stored
+    in the thPropertyInterpolations cache of the matter table, so subsequent
+    lookups only clamp the dependency values and evaluate the interpolation.
+
     Args:
         t_parameters (dict): Input parameters including:
             Mandatory:
@@ -40,8 +49,91 @@ def find_property(self, t_parameters):
     if not isinstance(b_use_isobaric_data, bool):
         raise ValueError("Isobaric data selector must be a boolean.")
 
+    if i_dependencies == 1:
+        s_second_dep_name = None
+
+    t_interpolation = get_property_interpolation(
+        self, s_substance, s_property, s_phase_type, s_first_dep_name, s_second_dep_name, b_use_isobaric_data
+    )
+
+    # Limit the dependencies to the range of the data
+    f_first_dep_value = min(max(f_first_dep_value, t_interpolation["fFirstMin"]), t_interpolation["fFirstMax"])
+
+    if i_dependencies == 1:
+        f_property = t_interpolation["hInterpolation"](f_first_dep_value)
+    else:
+        f_second_dep_value = min(max(f_second_dep_value, t_interpolation["fSecondMin"]), t_interpolation["fSecondMax"])
+        f_property = t_interpolation["hInterpolation"](f_first_dep_value, f_second_dep_value)
+
+    f_property = float(np.squeeze(f_property))
+
+    if np.isnan(f_property):
+        raise ValueError(f"No valid value for {s_property} of {s_substance} in {s_phase_type} phase.")
+
+    return f_property
+
+
+def get_property_interpolation(self, s_substance, s_property, s_phase_type, s_first_dep_name,
+                               s_second_dep_name=None, b_use_isobaric_data=True):
+    """
+    Returns the cached interpolation for a substance property, creating it
+    if it does not exist yet.
+
+    Args:
+        s_substance (str): Substance name.
+        s_property (str): Desired property.
+        s_phase_type (str): Phase type ('solid', 'liquid', 'gas', 'supercritical').
+        s_first_dep_name (str): First dependency name.
+        s_second_dep_name (str): Second dependency name, None for a single dependency.
+        b_use_isobaric_data (bool): Use isobaric data if True; otherwise, use isochoric data.
+
+    Returns:
+        dict: The interpolation function (hInterpolation) and the limits of
+            the dependencies (fFirstMin, fFirstMax, fSecondMin, fSecondMax).
+    """
+    t_key = (s_substance, s_property, s_phase_type, s_first_dep_name, s_second_dep_name, b_use_isobaric_data)
+
+    t_interpolation = self.thPropertyInterpolations.get(t_key)
+    if t_interpolation is None:
+        t_interpolation = _create_property_interpolation(
+            self, s_substance, s_property, s_phase_type, s_first_dep_name, s_second_dep_name, b_use_isobaric_data
+        )
+        self.thPropertyInterpolations[t_key] = t_interpolation
+
+    return t_interpolation
+
+
+def prebuild_property_interpolations(self, cs_substances, cs_properties=("Density", "Heat Capacity", "Thermal Conductivity", "Dynamic Viscosity")):
+    """
+    Creates the interpolations for the given substances and properties in
+    all phases for which data is available, so the first lookup during the
+    simulation does not have to create them. Combinations without data are
+    skipped.
+
+    Args:
+        cs_substances (list): Names of the substances.
+        cs_properties (list): Names of the properties.
+    """
+    for s_substance in cs_substances:
+        if not self.ttxMatter[s_substance].get("bIndividualFile", False):
+            continue
+
+        for s_property in cs_properties:
+            for s_phase_type in ("solid", "liquid", "gas", "supercritical"):
+                try:
+                    get_property_interpolation(self, s_substance, s_property, s_phase_type, "Temperature", "Pressure", True)
+                except (KeyError, ValueError):
+                    pass
+
+
+def _create_property_interpolation(self, s_substance, s_property, s_phase_type, s_first_dep_name,
+                                   s_second_dep_name, b_use_isobaric_data):
+    """
+    Creates the interpolation for a substance property from the data of
+    the matter table.
+    """
     # Fetch matter data for the substance
-    tx_matter_for_substance = self.ttx_matter[s_substance]
+    tx_matter_for_substance = self.ttxMatter[s_substance]
 
     # Determine the type of data
     s_type_struct = "tIsobaricData" if b_use_isobaric_data else "tIsochoricData"
@@ -71,21 +163,22 @@ def find_property(self, t_parameters):
     if i_column_first is None:
         raise ValueError(f"Cannot find dependency {s_first_dep_name} for substance {s_substance}.")
 
-    f_min = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_first_dep_name_no_spaces}"]["Min"]
-    f_max = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_first_dep_name_no_spaces}"]["Max"]
+    t_extremes = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"]
+    t_interpolation = {
+        "fFirstMin": t_extremes[f"t{s_first_dep_name_no_spaces}"]["Min"],
+        "fFirstMax": t_extremes[f"t{s_first_dep_name_no_spaces}"]["Max"],
+        "fSecondMin": None,
+        "fSecondMax": None,
+    }
 
-    if f_first_dep_value > f_max:
-        f_first_dep_value = f_max
-    elif f_first_dep_value < f_min:
-        f_first_dep_value = f_min
-
-    if i_dependencies == 1:
+    if s_second_dep_name is None:
         af_temporary = tx_matter_for_substance_and_type_and_aggregate["mfData"][:, [i_column, i_column_first]]
         af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
         af_temporary = np.unique(af_temporary, axis=0)
 
-        h_interpolation = interp1d(af_temporary[:, 1], af_temporary[:, 0], bounds_error=False, fill_value="extrapolate")
-        f_property = h_interpolation(f_first_dep_value)
+        t_interpolation["hInterpolation"] = interp1d(
+            af_temporary[:, 1], af_temporary[:, 0], bounds_error=False, fill_value="extrapolate"
+        )
 
     else:
         s_second_dep_name_no_spaces = s_second_dep_name.replace(" ", "")
@@ -93,24 +186,15 @@ def find_property(self, t_parameters):
         if i_column_second is None:
             raise ValueError(f"Cannot find dependency {s_second_dep_name} for substance {s_substance}.")
 
-        f_min = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_second_dep_name_no_spaces}"]["Min"]
-        f_max = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_second_dep_name_no_spaces}"]["Max"]
-
-        if f_second_dep_value > f_max:
-            f_second_dep_value = f_max
-        elif f_second_dep_value < f_min:
-            f_second_dep_value = f_min
+        t_interpolation["fSecondMin"] = t_extremes[f"t{s_second_dep_name_no_spaces}"]["Min"]
+        t_interpolation["fSecondMax"] = t_extremes[f"t{s_second_dep_name_no_spaces}"]["Max"]
 
         af_temporary = tx_matter_for_substance_and_type_and_aggregate["mfData"][:, [i_column, i_column_first, i_column_second]]
         af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
         af_temporary = np.unique(af_temporary, axis=0)
 
-        h_interpolation = RegularGridInterpolator(
-            (af_temporary[:, 1], af_temporary[:, 2]), af_temporary[:, 0], bounds_error=False, fill_value=None
-        )
-        f_property = h_interpolation([f_first_dep_value, f_second_dep_value])
+        # The NIST data is scattered in temperature and pressure, therefore a
+        # scattered interpolation is used (scatteredInterpolant in V-HAB)
+        t_interpolation["hInterpolation"] = LinearNDInterpolator(af_temporary[:, 1:3], af_temporary[:, 0])
 
-    if f_property is None or np.isnan(f_property):
-        raise ValueError(f"No valid value for {s_property} of {s_substance} in {s_phase_type} phase.")
-
-    return f_property
+    return t_interpolation
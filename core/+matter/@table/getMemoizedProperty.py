@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def get_memoized_property(self, oObject, sProperty):
+    """
+    Returns a mixture property of a phase or flow from the property cache
+    of the matter table.
+
+    The property is only recalculated if the temperature, pressure or the
+    partial masses of the object have left the tolerance band around the
+    state at which it was last calculated (see tPropertyCacheTolerances).
+    Otherwise the cached value is returned. Hits and misses are counted per
+    property in tiPropertyCacheStatistics.
+
+    The density of a gas phase below the maximum pressure of the ideal gas
+    law of its container is calculated directly from the ideal gas law,
+    which is exact and cheaper than the cache. These lookups are counted as
+    iIdealGas.
+
+    Examples:
+        fSpecificHeatCapacity = get_memoized_property(oPhase, 'Heat Capacity')
+        fDensity = get_memoized_property(oFlow, 'Density')
+
+    Args:
+        oObject: Phase or flow object.
+        sProperty (str): Property to calculate, one of 'Heat Capacity',
+            'Density', 'Thermal Conductivity' or 'Dynamic Viscosity'.
+
+    Returns:
+        float: The value of the property for the current state of the object.
+    """
+    tCache = self.ttxPropertyCache.get(oObject)
+    if tCache is None:
+        tCache = {}
+        self.ttxPropertyCache[oObject] = tCache
+
+    tStatistics = self.tiPropertyCacheStatistics.setdefault(sProperty, {'iHits': 0, 'iMisses': 0, 'iIdealGas': 0})
+
+    fTemperature = oObject.fTemperature
+    fPressure = oObject.fPressure
+    arPartialMass = oObject.arPartialMass
+
+    if sProperty == 'Density' and getattr(oObject, 'sType', None) == 'gas' and fTemperature > 0:
+        oContainer = getattr(getattr(oObject, 'oStore', None), 'oContainer', None)
+        if fPressure < getattr(oContainer, 'fMaxIdealGasLawPressure', self.fMaxIdealGasLawPressure):
+            tStatistics['iIdealGas'] += 1
+            return fPressure * oObject.fMolarMass / (self.CONST['fUniversalGas'] * fTemperature)
+
+    txEntry = tCache.get(sProperty)
+    if txEntry is not None:
+        tTolerances = self.tPropertyCacheTolerances
+        if (abs(txEntry['fPressure'] - fPressure) <= tTolerances['fPressure']
+                and abs(txEntry['fTemperature'] - fTemperature) <= tTolerances['fTemperature']
+                and np.max(np.abs(txEntry['arPartialMass'] - np.asarray(arPartialMass)), initial=0) <= tTolerances['rPartialMass']):
+            tStatistics['iHits'] += 1
+            return txEntry['fValue']
+
+    tStatistics['iMisses'] += 1
+
+    fValue = getattr(self, self.tsPropertyCalculationMethods[sProperty])(oObject)
+
+    tCache[sProperty] = {
+        'fTemperature': fTemperature,
+        'fPressure': fPressure,
+        'arPartialMass': np.array(arPartialMass, dtype=float),
+        'fValue': fValue,
+    }
+
+    return fValue
+
+
+def set_property_cache_tolerances(self, fPressure=None, fTemperature=None, rPartialMass=None):
+    """
+    Sets the tolerance bands of the property cache. Only the provided values
+    are changed. Cached values are kept, the new tolerances apply to all
+    following lookups.
+
+    Args:
+        fPressure (float): Maximum pressure difference in Pa.
+        fTemperature (float): Maximum temperature difference in K.
+        rPartialMass (float): Maximum difference of any partial mass ratio.
+    """
+    for sKey, fValue in (('fPressure', fPressure), ('fTemperature', fTemperature), ('rPartialMass', rPartialMass)):
+        if fValue is not None:
+            if fValue < 0:
+                raise ValueError(f"The tolerance {sKey} of the property cache must not be negative.")
+            self.tPropertyCacheTolerances[sKey] = fValue
+
+
+def reset_property_cache(self, oObject=None):
+    """
+    Removes the cached properties of one object or, if no object is
+    provided, of all objects. The statistics are only reset for all objects.
+
+    Args:
+        oObject: Phase or flow object.
+    """
+    if oObject is None:
+        self.ttxPropertyCache.clear()
+        self.tiPropertyCacheStatistics = {}
+    else:
+        self.ttxPropertyCache.pop(oObject, None)
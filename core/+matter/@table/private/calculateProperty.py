@@ -1,75 +1,236 @@
 import numpy as np
 
-class MatterTable:
-    # Assuming necessary methods and attributes are implemented in this class
-
-    def calculate_property(self, s_property, f_temperature, ar_partial_mass, cs_phase, ai_phase, ai_indices, af_partial_pressures, b_use_isobaric_data):
-        """
-        Calculates requested matter property for the given parameters.
-
-        :param s_property: Property to calculate (string)
-        :param f_temperature: Temperature (float)
-        :param ar_partial_mass: Array of partial masses
-        :param cs_phase: List of phase names
-        :param ai_phase: Array of phase indices
-        :param ai_indices: Array of indices for the substances
-        :param af_partial_pressures: Array of partial pressures
-        :param b_use_isobaric_data: Boolean for isobaric data usage
-        :return: Calculated property value
-        """
-        # If no mass is given, return 0
-        if np.sum(ar_partial_mass) == 0:
-            return 0
-
-        # Ensure there are no NaN values in the mass array
-        if np.isnan(ar_partial_mass).any():
-            raise ValueError("Invalid entries in mass vector.")
-
-        i_num_indices = len(ai_indices)
-
-        # Initialize an array for storing property values
-        af_property = np.zeros(i_num_indices)
-
-        for i, index in enumerate(ai_indices):
-            # Prepare the parameter dictionary for find_property
-            t_parameters = {
-                "sSubstance": self.cs_substances[index],
-                "sProperty": s_property,
-                "sFirstDepName": "Temperature",
-                "fFirstDepValue": f_temperature,
-                "sPhaseType": cs_phase[round(ai_phase[index])],
-                "sSecondDepName": "Pressure",
-                "fSecondDepValue": af_partial_pressures[index],
-                "bUseIsobaricData": b_use_isobaric_data
-            }
-
-            try:
-                af_property[i] = self.find_property(t_parameters)
-            except Exception as s_msg:
-                # Handle phase transition and find closest valid matter entry
-                i_phase = self.determine_phase(
-                    t_parameters["sSubstance"],
-                    f_temperature,
-                    af_partial_pressures[index]
-                )
-                if i_phase % 1 != 0:  # Indicates a phase change
-                    af_property[i] = self.find_closest_valid_matter_entry(t_parameters)
-                else:
-                    raise s_msg
-
-        # Ensure there are no NaN values in the property array
-        if np.isnan(af_property).any():
-            raise ValueError("Invalid entries in specific property vector.")
-
-        # Ensure vector dimensions match
-        if af_property.shape[0] != ar_partial_mass[ai_indices].shape[0]:
-            raise ValueError("Vectors must be of the same length but one transposed.")
-
-        # Calculate the property of the mixture
-        f_property = np.dot(ar_partial_mass[ai_indices] / np.sum(ar_partial_mass[ai_indices]), af_property)
-
-        # Validate the result
-        if np.isnan(f_property) or f_property < 0:
-            raise ValueError(f"Invalid {s_property}: {f_property}")
-
-        return f_property
+
+def calculate_property(self, s_property, f_temperature, ar_partial_mass, cs_phase, ai_phase, ai_indices, af_partial_pressures, b_use_isobaric_data):
+    """
+    Calculates requested matter property for the given parameters.
+
+    The property of all substances in ai_indices is evaluated in one
+    vectorized call on the packed data grids of these substances (see
+    get_packed_property_interpolations). Only the substances whose state is
+    outside the data of their phase (e.g. close to a phase transition) are
+    handled individually.
+
+    :param s_property: Property to calculate (string)
+    :param f_temperature: Temperature (float)
+    :param ar_partial_mass: Array of partial masses
+    :param cs_phase: List of phase names
+    :param ai_phase: Array of phase indices
+    :param ai_indices: Array of indices for the substances
+    :param af_partial_pressures: Array of partial pressures
+    :param b_use_isobaric_data: Boolean for isobaric data usage
+    :return: Calculated property value
+    """
+    # If no mass is given, return 0
+    if np.sum(ar_partial_mass) == 0:
+        return 0
+
+    # Ensure there are no NaN values in the mass array
+    if np.isnan(ar_partial_mass).any():
+        raise ValueError("Invalid entries in mass vector.")
+
+    ar_partial_mass = np.asarray(ar_partial_mass)
+    af_partial_pressures = np.asarray(af_partial_pressures, dtype=float)
+    ai_indices = np.asarray(ai_indices, dtype=int)
+
+    # The phase indices start at 1 for solid
+    cs_phase_types = tuple(cs_phase[round(ai_phase[index]) - 1] for index in ai_indices)
+    t_packed = self.get_packed_property_interpolations(s_property, ai_indices, cs_phase_types, b_use_isobaric_data)
+
+    # Limit the dependencies to the range of the data of each substance,
+    # identical to find_property
+    af_temperature = np.minimum(np.maximum(f_temperature, t_packed["afFirstMin"]), t_packed["afFirstMax"])
+    af_pressure = np.minimum(np.maximum(af_partial_pressures[ai_indices], t_packed["afSecondMin"]), t_packed["afSecondMax"])
+
+    af_property = interpolate_packed_property(t_packed, af_temperature, af_pressure)
+
+    # Mask of the substances whose state lies within the data of their
+    # phase. The others are usually close to a phase transition and use the
+    # interpolation of the scattered data or the closest valid entry.
+    ab_in_range = t_packed["abValid"] & np.isfinite(af_property)
+    for i in np.flatnonzero(~ab_in_range):
+        index = ai_indices[i]
+        t_parameters = {
+            "sSubstance": self.csSubstances[index],
+            "sProperty": s_property,
+            "sFirstDepName": "Temperature",
+            "fFirstDepValue": float(f_temperature),
+            "sPhaseType": cs_phase_types[i],
+            "sSecondDepName": "Pressure",
+            "fSecondDepValue": float(af_partial_pressures[index]),
+            "bUseIsobaricData": b_use_isobaric_data
+        }
+
+        try:
+            af_property[i] = self.find_property(t_parameters)
+        except (KeyError, ValueError):
+            i_phase, _ = self.determine_phase(
+                t_parameters["sSubstance"],
+                f_temperature,
+                af_partial_pressures[index]
+            )
+            if i_phase % 1 != 0:  # Indicates a phase change
+                af_property[i] = self.find_closest_valid_matter_entry(t_parameters)
+            else:
+                raise
+
+    # Ensure there are no NaN values in the property array
+    if np.isnan(af_property).any():
+        raise ValueError("Invalid entries in specific property vector.")
+
+    # Calculate the property of the mixture
+    ar_present_mass = ar_partial_mass[ai_indices]
+    f_property = np.dot(ar_present_mass / np.sum(ar_present_mass), af_property)
+
+    # Validate the result
+    if np.isnan(f_property) or f_property < 0:
+        raise ValueError(f"Invalid {s_property}: {f_property}")
+
+    return f_property
+
+
+def get_packed_property_interpolations(self, s_property, ai_indices, cs_phase_types, b_use_isobaric_data):
+    """
+    Returns the data grids and dependency limits of a property for a set of
+    substances, packed into arrays in the order of ai_indices. The packed
+    data is cached for each combination of property, substances, phases and
+    data type.
+
+    The grid of each substance spans the temperatures and pressures of its
+    data in the requested phase. Its values are taken from the interpolation
+    of find_property, grid points outside the data of the phase are NaN.
+    The grids are padded to a common size so all substances are evaluated
+    in one call by interpolate_packed_property.
+
+    :param s_property: Property to calculate (string)
+    :param ai_indices: Array of indices for the substances
+    :param cs_phase_types: Phase type of each substance in ai_indices
+    :param b_use_isobaric_data: Boolean for isobaric data usage
+    :return: Dictionary with the padded grid axes of the first and then
+        the second dependency (afAxes), the index of their last interval
+        (aiMaxInterval) and their offset in the flattened axes
+        (aiAxisOffsets), the grid values (mfGrids) and the offset of each
+        grid in them (aiGridOffsets), the limits for
+        temperature and pressure and a mask of the substances for which
+        data exists (abValid)
+    """
+    t_key = (s_property, tuple(ai_indices.tolist()), cs_phase_types, b_use_isobaric_data)
+
+    t_packed = self.thPackedPropertyInterpolations.get(t_key)
+    if t_packed is not None:
+        return t_packed
+
+    i_num_indices = len(ai_indices)
+    ct_grids = [None] * i_num_indices
+
+    for i, index in enumerate(ai_indices):
+        try:
+            t_interpolation = self.get_property_interpolation(
+                self.csSubstances[index], s_property, cs_phase_types[i], "Temperature", "Pressure", b_use_isobaric_data
+            )
+        except (KeyError, ValueError):
+            # No data for this combination, handled by the fallback
+            continue
+
+        ct_grids[i] = (t_interpolation, _get_property_grid(t_interpolation))
+
+    i_max_first = max([2] + [len(t_grid[1][0]) for t_grid in ct_grids if t_grid is not None])
+    i_max_second = max([2] + [len(t_grid[1][1]) for t_grid in ct_grids if t_grid is not None])
+
+    i_max_points = max(i_max_first, i_max_second)
+    t_packed = {
+        "afAxes": np.full((2 * i_num_indices, i_max_points), np.inf),
+        "aiMaxInterval": np.zeros(2 * i_num_indices, dtype=int),
+        "aiAxisOffsets": np.arange(2 * i_num_indices) * i_max_points,
+        "aiGridOffsets": np.arange(i_num_indices) * i_max_first * i_max_second,
+        "mfGrids": np.full((i_num_indices, i_max_first, i_max_second), np.nan),
+        "afFirstMin": np.full(i_num_indices, -np.inf),
+        "afFirstMax": np.full(i_num_indices, np.inf),
+        "afSecondMin": np.full(i_num_indices, -np.inf),
+        "afSecondMax": np.full(i_num_indices, np.inf),
+        "abValid": np.zeros(i_num_indices, dtype=bool),
+    }
+
+    for i, t_grid in enumerate(ct_grids):
+        if t_grid is None:
+            continue
+
+        t_interpolation, (af_first, af_second, mf_grid) = t_grid
+        t_packed["afAxes"][i, :len(af_first)] = af_first
+        t_packed["afAxes"][i_num_indices + i, :len(af_second)] = af_second
+        t_packed["aiMaxInterval"][i] = len(af_first) - 2
+        t_packed["aiMaxInterval"][i_num_indices + i] = len(af_second) - 2
+        t_packed["mfGrids"][i, :len(af_first), :len(af_second)] = mf_grid
+        t_packed["afFirstMin"][i] = t_interpolation["fFirstMin"]
+        t_packed["afFirstMax"][i] = t_interpolation["fFirstMax"]
+        t_packed["afSecondMin"][i] = t_interpolation["fSecondMin"]
+        t_packed["afSecondMax"][i] = t_interpolation["fSecondMax"]
+        t_packed["abValid"][i] = True
+
+    # Substances without data get a zero axis, so the interpolation returns
+    # NaN for them without evaluating the infinite padding
+    t_packed["afAxes"][np.tile(~t_packed["abValid"], 2)] = 0
+
+    self.thPackedPropertyInterpolations[t_key] = t_packed
+    return t_packed
+
+
+def interpolate_packed_property(t_packed, af_first, af_second):
+    """
+    Bilinear interpolation of the packed property grids, one value per
+    substance. Substances without data or whose state is surrounded by grid
+    points outside the data of their phase return NaN.
+
+    :param t_packed: Packed grids from get_packed_property_interpolations
+    :param af_first: First dependency (temperature) of each substance
+    :param af_second: Second dependency (pressure) of each substance
+    :return: Array with the property of each substance
+    """
+    i_num_indices = len(af_first)
+
+    # Both dependencies are located in one call, the axes of the second
+    # dependency follow the axes of the first one
+    af_dependencies = np.concatenate((af_first, af_second))
+    ai_interval = np.minimum(np.maximum(
+        np.count_nonzero(t_packed["afAxes"] <= af_dependencies[:, np.newaxis], axis=1) - 1, 0), t_packed["aiMaxInterval"])
+
+    af_flat_axes = t_packed["afAxes"].reshape(-1)
+    ai_lower = t_packed["aiAxisOffsets"] + ai_interval
+    af_lower = af_flat_axes[ai_lower]
+    af_width = af_flat_axes[ai_lower + 1] - af_lower
+    ar_position = np.divide(af_dependencies - af_lower, af_width, out=np.zeros(2 * i_num_indices), where=af_width > 0)
+
+    ai_first, ai_second = ai_interval[:i_num_indices], ai_interval[i_num_indices:]
+    ar_first, ar_second = ar_position[:i_num_indices], ar_position[i_num_indices:]
+
+    # Values of the four surrounding grid points of each substance in the
+    # order (first, second), (first + 1, second), (first, second + 1) and
+    # (first + 1, second + 1)
+    i_second_points = t_packed["mfGrids"].shape[2]
+    ai_corner = t_packed["aiGridOffsets"] + ai_first * i_second_points + ai_second
+    mf_corners = t_packed["mfGrids"].reshape(-1)[ai_corner[:, np.newaxis] + np.array([0, i_second_points, 1, i_second_points + 1])]
+
+    af_at_lower_second = mf_corners[:, 0] + ar_first * (mf_corners[:, 1] - mf_corners[:, 0])
+    af_at_upper_second = mf_corners[:, 2] + ar_first * (mf_corners[:, 3] - mf_corners[:, 2])
+    return af_at_lower_second + ar_second * (af_at_upper_second - af_at_lower_second)
+
+
+def _get_property_grid(t_interpolation):
+    """
+    Returns the grid axes and values of an interpolation of find_property,
+    the grid is created on first use and stored with the interpolation.
+    """
+    if "tGrid" not in t_interpolation:
+        h_interpolation = t_interpolation["hInterpolation"]
+        af_first = np.unique(h_interpolation.points[:, 0])
+        af_second = np.unique(h_interpolation.points[:, 1])
+
+        # Axes with a single point are doubled, the interpolation in that
+        # direction then returns the value of the point
+        af_first = np.repeat(af_first, 2) if len(af_first) == 1 else af_first
+        af_second = np.repeat(af_second, 2) if len(af_second) == 1 else af_second
+
+        mf_first, mf_second = np.meshgrid(af_first, af_second, indexing="ij")
+        t_interpolation["tGrid"] = (af_first, af_second, h_interpolation(mf_first, mf_second))
+
+    return t_interpolation["tGrid"]
@@ -1,13 +1,27 @@
 import csv
+import os
 import numpy as np
 
+# Directory of the matter source data
+S_MATTER_DATA_DIRECTORY = os.path.join('core', '+matter', '+data')
+S_NIST_DIRECTORY = os.path.join(S_MATTER_DATA_DIRECTORY, '+NIST')
+
+# Phase indices used in the Phase column of the NIST data files
+T_NIST_PHASES = {"tSolid": 1, "tLiquid": 2, "tGas": 3, "tSupercritical": 4}
+
+
 def import_matter_data(s_target):
     """
     Imports substance data from CSV files into a structured format.
-    
+
+    Importing 'MatterData' only reads the general substance table, which
+    serves as the index of the matter table. The NIST data of an individual
+    substance is imported separately by passing its name, so it can be
+    loaded on first access (see get_nist_substances).
+
     Parameters:
     s_target (str): 'MatterData' to import the main data file, or the name of a specific substance.
-    
+
     Returns:
     dict: Structured data containing substance properties and related metadata.
     """
@@ -15,8 +29,10 @@ def import_matter_data(s_target):
 
     if s_target == 'MatterData':
         # Import MatterData.csv
-        file_path = '+matter/+data/MatterData.csv'.replace('/', '\\')
-        with open(file_path, 'r') as file:
+        file_path = os.path.join(S_MATTER_DATA_DIRECTORY, 'MatterData.csv')
+        # The file is not UTF-8 encoded, it contains single byte characters
+        # such as the degree sign in its comments
+        with open(file_path, 'r', encoding='latin-1') as file:
             reader = csv.reader(file, delimiter=';')
             header_row = next(reader)
             column_names = [name for name in header_row if name.strip()]
@@ -56,7 +72,7 @@ def import_matter_data(s_target):
 
     else:
         # Import specific substance files
-        info_file_path = f'+matter/+data/+NIST/{s_target}_Information_File.csv'.replace('/', '\\')
+        info_file_path = os.path.join(S_NIST_DIRECTORY, f'{s_target}_Information_File.csv')
         with open(info_file_path, 'r') as file:
             lines = file.readlines()
             column_names = lines[0].strip().split(';')
@@ -77,26 +93,76 @@ def import_matter_data(s_target):
 
         # Import isochoric and isobaric data
         for data_type in ["Isochoric", "Isobaric"]:
-            header_file_path = f'+matter/+data/+NIST/{s_target}_{data_type}_HeaderFile.csv'.replace('/', '\\')
-            data_file_path = f'+matter/+data/+NIST/{s_target}_{data_type}_DataFile.csv'.replace('/', '\\')
+            header_file_path = os.path.join(S_NIST_DIRECTORY, f'{s_target}_{data_type}_HeaderFile.csv')
+            data_file_path = os.path.join(S_NIST_DIRECTORY, f'{s_target}_{data_type}_DataFile.csv')
+
+            if not os.path.exists(data_file_path):
+                continue
 
             with open(header_file_path, 'r') as file:
                 headers = file.readlines()
                 column_names = headers[0].strip().split(';')
                 units = headers[1].strip().split(';')
 
-            with open(data_file_path, 'r') as file:
-                raw_data = np.loadtxt(file, delimiter=';', skiprows=0)
+            raw_data = read_numeric_csv(data_file_path, len(column_names))
 
-            ttx_import_matter[f"t{data_type}Data"] = {"tColumns": {}, "tUnits": {}, "Phases": {}}
+            t_data = {"tColumns": {}, "tUnits": {}}
             for i, col_name in enumerate(column_names):
-                ttx_import_matter[f"t{data_type}Data"]["tColumns"][col_name] = i
-                ttx_import_matter[f"t{data_type}Data"]["tUnits"][col_name] = units[i]
+                t_data["tColumns"][col_name.replace(" ", "")] = i
+                t_data["tUnits"][col_name.replace(" ", "")] = units[i]
+
+            # Organize data by phase, including the extremes of each column
+            # which are used to limit the dependencies in find_property
+            i_phase_column = t_data["tColumns"]["Phase"]
+            for s_phase_struct, i_phase in T_NIST_PHASES.items():
+                mf_phase_data = raw_data[raw_data[:, i_phase_column] == i_phase]
+                if mf_phase_data.size == 0:
+                    continue
+
+                af_min = np.nanmin(mf_phase_data, axis=0)
+                af_max = np.nanmax(mf_phase_data, axis=0)
+                t_data[s_phase_struct] = {
+                    "mfData": mf_phase_data,
+                    "ttExtremes": {
+                        f"t{col_name}": {"Min": af_min[i], "Max": af_max[i]}
+                        for col_name, i in t_data["tColumns"].items()
+                    },
+                }
 
-            # Organize data by phase
-            phases = {"solid": 1, "liquid": 2, "gas": 3, "supercritical": 4}
-            for phase_name, phase_id in phases.items():
-                phase_data = raw_data[raw_data[:, ttx_import_matter[f"t{data_type}Data"]["tColumns"]["Phase"]] == phase_id]
-                ttx_import_matter[f"t{data_type}Data"]["Phases"][phase_name] = phase_data
+            ttx_import_matter[f"t{data_type}Data"] = t_data
 
     return ttx_import_matter
+
+
+def get_nist_substances():
+    """
+    Returns the names of all substances with individual NIST data files,
+    without reading any of the files.
+
+    Returns:
+    list: Names of the substances.
+    """
+    s_suffix = '_Information_File.csv'
+    return sorted(
+        s_file[:-len(s_suffix)] for s_file in os.listdir(S_NIST_DIRECTORY) if s_file.endswith(s_suffix)
+    )
+
+
+def read_numeric_csv(s_file_path, i_columns):
+    """
+    Reads a semicolon separated file that only contains numbers. The whole
+    file is converted in a single vectorized call instead of parsing it
+    line by line.
+
+    Parameters:
+    s_file_path (str): Path to the file.
+    i_columns (int): Number of columns in the file.
+
+    Returns:
+    ndarray: The data with one row per line of the file.
+    """
+    with open(s_file_path, 'r') as file:
+        s_content = file.read()
+
+    af_values = np.array(s_content.replace(';', ' ').split(), dtype=float)
+    return af_values.reshape(-1, i_columns)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from matter.compoundMass import CompoundMass
+
 def resolve_compound_mass(self, af_mass, ar_compound_mass):
     """
     Resolves compound masses into their components and provides a resolved afMass vector 
@@ -7,12 +9,18 @@ def resolve_compound_mass(self, af_mass, ar_compound_mass):
 
     Args:
         af_mass (numpy.ndarray): Mass vector with compound masses.
-        ar_compound_mass (numpy.ndarray): Array representing the composition of compounds in terms of base substances.
+        ar_compound_mass (CompoundMass or numpy.ndarray): Composition of the compounds in terms of base
+            substances, either sparse or as dense matrix.
 
     Returns:
         numpy.ndarray: Resolved mass vector containing only base substances.
     """
+    af_mass = np.asarray(af_mass, dtype=float)
+
     if np.any(af_mass[self.abCompound]):
+        if isinstance(ar_compound_mass, CompoundMass):
+            return ar_compound_mass.resolve(af_mass, self.abCompound)
+
         af_resolved_mass = af_mass[:, np.newaxis] * ar_compound_mass
         af_resolved_mass = np.sum(af_resolved_mass, axis=0)
         # Add masses of non-compound substances back to the resolved mass
@@ -1,7 +1,78 @@
+import hashlib
 import numpy as np
 import os
 import re
 import json
+import weakref
+from collections.abc import MutableMapping
+
+from matter.table.calculateDensity import calculateDensity
+from matter.table.calculateDynamicViscosity import calculateDynamicViscosity
+from matter.table.calculatePartialPressures import calculate_partial_pressures
+from matter.table.calculateSpecificHeatCapacity import calculate_specific_heat_capacity
+from matter.table.calculateThermalConductivity import calculate_thermal_conductivity
+from matter.table.determinePhase import (
+    determine_phase, lookup_phases, build_phase_boundary_index, add_to_phase_boundary_index
+)
+from matter.table.findClosestValidMatterEntry import find_closest_valid_matter_entry
+from matter.table.findProperty import find_property, get_property_interpolation, prebuild_property_interpolations
+from matter.table.getMemoizedProperty import get_memoized_property, set_property_cache_tolerances, reset_property_cache
+from matter.table.resolveCompoundMass import resolve_compound_mass
+from matter.table.private.calculateProperty import calculate_property, get_packed_property_interpolations
+from matter.table.private.getNecessaryParameters import get_necessary_parameters
+from matter.table.private.importMatterData import import_matter_data, get_nist_substances
+
+
+class LazyMatterData(MutableMapping):
+    """
+    Dictionary of the substance data of the matter table. The data of each
+    substance is only resolved on first access. The numeric arrays of the
+    compiled matter data, including the NIST data grids, are memory-mapped
+    read-only from their .npy files, so they are paged in on demand and
+    shared between all processes that load the same compiled matter data.
+    """
+
+    def __init__(self, sArrayDirectory, txRawMatter):
+        self.sArrayDirectory = sArrayDirectory
+        self.txRawMatter = txRawMatter
+        self.txLoadedMatter = {}
+
+    def __getitem__(self, sSubstance):
+        if sSubstance not in self.txLoadedMatter:
+            xRawEntry = self.txRawMatter[sSubstance]
+            self.txLoadedMatter[sSubstance] = Table.unpack_matter_entry(xRawEntry, self.sArrayDirectory)
+        return self.txLoadedMatter[sSubstance]
+
+    def __setitem__(self, sSubstance, xValue):
+        self.txRawMatter[sSubstance] = None
+        self.txLoadedMatter[sSubstance] = xValue
+
+    def __delitem__(self, sSubstance):
+        del self.txRawMatter[sSubstance]
+        self.txLoadedMatter.pop(sSubstance, None)
+
+    def __iter__(self):
+        return iter(self.txRawMatter)
+
+    def __len__(self):
+        return len(self.txRawMatter)
+
+    def is_loaded(self, sSubstance):
+        """
+        Checks whether the data of a substance has already been resolved.
+        """
+        return sSubstance in self.txLoadedMatter
+
+    def has_individual_file(self, sSubstance):
+        """
+        Checks whether a substance has individual NIST data files, without
+        loading its data.
+        """
+        if sSubstance in self.txLoadedMatter:
+            return self.txLoadedMatter[sSubstance].get("bIndividualFile", False)
+        xRawEntry = self.txRawMatter[sSubstance]
+        return isinstance(xRawEntry, dict) and xRawEntry.get("bIndividualFile", False)
+
 
 class Table:
     """
@@ -27,9 +98,57 @@ class Table:
         'Pressure': 101325,  # Pa (sea-level pressure)
     }
 
-    def __init__(self):
+    # Aliases for the MATLAB style property names used in the function files
+    Const = CONST
+    Standard = STANDARD
+
+    # Maximum pressure in Pa up to which get_memoized_property calculates the
+    # density of gases with the ideal gas law, if the container of the phase
+    # does not define it
+    fMaxIdealGasLawPressure = 5e5
+
+    # Methods used by get_memoized_property to calculate a mixture property
+    tsPropertyCalculationMethods = {
+        'Heat Capacity': 'calculate_specific_heat_capacity',
+        'Density': 'calculateDensity',
+        'Thermal Conductivity': 'calculate_thermal_conductivity',
+        'Dynamic Viscosity': 'calculateDynamicViscosity',
+    }
+
+    # Methods defined in the function files of the @table folder
+    determine_phase = determine_phase
+    lookup_phases = lookup_phases
+    build_phase_boundary_index = build_phase_boundary_index
+    add_to_phase_boundary_index = add_to_phase_boundary_index
+    find_property = find_property
+    get_memoized_property = get_memoized_property
+    set_property_cache_tolerances = set_property_cache_tolerances
+    reset_property_cache = reset_property_cache
+    get_property_interpolation = get_property_interpolation
+    prebuild_property_interpolations = prebuild_property_interpolations
+    find_closest_valid_matter_entry = find_closest_valid_matter_entry
+    calculate_property = calculate_property
+    get_packed_property_interpolations = get_packed_property_interpolations
+    get_necessary_parameters = get_necessary_parameters
+    resolve_compound_mass = resolve_compound_mass
+    calculate_partial_pressures = calculate_partial_pressures
+    calculate_specific_heat_capacity = calculate_specific_heat_capacity
+    calculateDensity = calculateDensity
+    calculate_thermal_conductivity = calculate_thermal_conductivity
+    calculateDynamicViscosity = calculateDynamicViscosity
+
+    # Aliases for the MATLAB style method names used in the function files
+    calculateProperty = calculate_property
+    getNecessaryParameters = get_necessary_parameters
+
+    def __init__(self, csPrebuildSubstances=None):
         """
         Class constructor to initialize the matter table.
+
+        Args:
+            csPrebuildSubstances (list): Optional names of substances for
+                which the property interpolations are created directly after
+                loading the table instead of on first use.
         """
         print("Checking for changes regarding the matter table source data.")
 
@@ -47,24 +166,70 @@ class Table:
         self.abEdibleSubstances = []
         self.csEdibleSubstances = []
 
+        # Cache for the interpolations used in find_property, keyed by
+        # (substance, property, phase, first dependency, second dependency,
+        # isobaric data flag)
+        self.thPropertyInterpolations = {}
+
+        # Data grids and dependency limits of calculate_property packed
+        # per combination of property, substances, phases and data type
+        self.thPackedPropertyInterpolations = {}
+
+        self.initialize_property_cache()
+
         # Attempt to load existing matter data
         self.load_matter_data()
 
+        # Phase boundary index for the vectorized determine_phase, filled per
+        # substance on first use
+        self.build_phase_boundary_index()
+
+        if csPrebuildSubstances:
+            self.prebuild_property_interpolations(csPrebuildSubstances)
+
+    # Directory of the compiled matter data. It contains a JSON header with
+    # the structure of the matter table and one .npy file per numeric array.
+    sMatterDataDirectory = os.path.join("data", "MatterData")
+    sMatterDataHeader = "header.json"
+
+    # Source data of the matter table, the compiled matter data is only
+    # regenerated if the file checker reports changes in this folder
+    sMatterSourceDirectory = os.path.join("core", "+matter", "+data")
+
+    def initialize_property_cache(self):
+        """
+        Initializes the per-phase cache of mixture properties used by
+        get_memoized_property. A cached property is reused as long as the
+        state of the phase or flow stays within the tolerance bands.
+        """
+        self.ttxPropertyCache = weakref.WeakKeyDictionary()
+        self.tPropertyCacheTolerances = {
+            'fPressure': 100,       # Pa
+            'fTemperature': 1,      # K
+            'rPartialMass': 0.01,   # -
+        }
+        self.tiPropertyCacheStatistics = {}
+
     def load_matter_data(self):
         """
-        Load matter data or initialize from scratch if not available.
+        Load the compiled matter data or initialize from scratch if it is
+        not available or the source data has changed.
         """
-        data_file = os.path.join("data", "MatterData.json")
+        from tools.fileChecker.checkForChanges import FileChecker
 
-        if os.path.exists(data_file):
-            with open(data_file, 'r') as file:
+        header_file = os.path.join(self.sMatterDataDirectory, self.sMatterDataHeader)
+        b_changed = FileChecker().check_for_changes(self.sMatterSourceDirectory, "MatterTable")
+
+        if os.path.exists(header_file) and not b_changed:
+            with open(header_file, 'r') as file:
                 print("Loading MatterData from stored file.")
                 data = json.load(file)
-                self.ttxMatter = data['ttxMatter']
-                self.afMolarMass = data['afMolarMass']
-                self.aiCharge = data['aiCharge']
-                self.afNutritionalEnergy = data['afNutritionalEnergy']
-                self.afDissociationConstant = data['afDissociationConstant']
+                array_directory = os.path.join(self.sMatterDataDirectory, "arrays")
+                self.ttxMatter = LazyMatterData(array_directory, data['ttxMatter'])
+                self.afMolarMass = self.unpack_matter_entry(data['afMolarMass'], array_directory)
+                self.aiCharge = self.unpack_matter_entry(data['aiCharge'], array_directory)
+                self.afNutritionalEnergy = self.unpack_matter_entry(data['afNutritionalEnergy'], array_directory)
+                self.afDissociationConstant = self.unpack_matter_entry(data['afDissociationConstant'], array_directory)
                 self.tiN2I = data['tiN2I']
                 self.csSubstances = data['csSubstances']
                 self.iSubstances = len(self.csSubstances)
@@ -79,10 +244,19 @@ class Table:
     def initialize_matter_table(self):
         """
         Initialize the matter table from raw data sources.
+
+        The general substance table (MatterData.csv) and the individual NIST
+        data files are only parsed here. Their data is compiled into the
+        matter data directory, so all later loads and all worker processes
+        memory-map the arrays instead of parsing the CSV files again.
         """
-        # Placeholder: Load the necessary data
-        # For simplicity, these should be replaced with actual data import logic.
-        self.ttxMatter = self.import_matter_data("MatterData.csv")
+        txIndex = import_matter_data("MatterData")
+        csNISTSubstances = get_nist_substances()
+
+        self.ttxMatter = dict(txIndex)
+        for substance in csNISTSubstances:
+            self.ttxMatter[substance] = import_matter_data(substance)
+
         self.csSubstances = list(self.ttxMatter.keys())
         self.iSubstances = len(self.csSubstances)
         self.afMolarMass = [0] * self.iSubstances
@@ -95,19 +269,43 @@ class Table:
         for i, substance in enumerate(self.csSubstances):
             self.tiN2I[substance] = i
 
+        # Array files of the previous compilation are removed, their names
+        # depend on the substances and keys of the old source data
+        array_directory = os.path.join(self.sMatterDataDirectory, "arrays")
+        if os.path.isdir(array_directory):
+            for sFileName in os.listdir(array_directory):
+                if sFileName.endswith('.npy'):
+                    os.remove(os.path.join(array_directory, sFileName))
+
         # Save initialized data
         self.save_matter_data()
 
     def save_matter_data(self):
         """
-        Save the initialized matter table to a file for future use.
+        Save the initialized matter table to the compiled matter data for
+        future use. Numeric arrays are written to individual .npy files so
+        they can be memory-mapped when loading. Afterwards the substance
+        data of this table is memory-mapped from the saved files as well.
         """
+        array_directory = os.path.join(self.sMatterDataDirectory, "arrays")
+        os.makedirs(array_directory, exist_ok=True)
+
+        # Substances that are already backed by the compiled matter data
+        # keep their references, so their files are not rewritten while
+        # they are memory-mapped
+        ttxMatter = {}
+        for substance in self.ttxMatter:
+            if isinstance(self.ttxMatter, LazyMatterData) and self.ttxMatter.txRawMatter[substance] is not None:
+                ttxMatter[substance] = self.ttxMatter.txRawMatter[substance]
+            else:
+                ttxMatter[substance] = self.pack_matter_entry(self.ttxMatter[substance], array_directory, substance)
+
         data = {
-            'ttxMatter': self.ttxMatter,
-            'afMolarMass': self.afMolarMass,
-            'aiCharge': self.aiCharge,
-            'afNutritionalEnergy': self.afNutritionalEnergy,
-            'afDissociationConstant': self.afDissociationConstant,
+            'ttxMatter': ttxMatter,
+            'afMolarMass': self.pack_matter_entry(np.asarray(self.afMolarMass, dtype=float), array_directory, 'afMolarMass'),
+            'aiCharge': self.pack_matter_entry(np.asarray(self.aiCharge), array_directory, 'aiCharge'),
+            'afNutritionalEnergy': self.pack_matter_entry(np.asarray(self.afNutritionalEnergy, dtype=float), array_directory, 'afNutritionalEnergy'),
+            'afDissociationConstant': self.pack_matter_entry(np.asarray(self.afDissociationConstant, dtype=float), array_directory, 'afDissociationConstant'),
             'tiN2I': self.tiN2I,
             'csSubstances': self.csSubstances,
             'csI2N': self.csI2N,
@@ -116,25 +314,248 @@ class Table:
             'csEdibleSubstances': self.csEdibleSubstances,
         }
 
-        data_file = os.path.join("data", "MatterData.json")
-        os.makedirs(os.path.dirname(data_file), exist_ok=True)
+        header_file = os.path.join(self.sMatterDataDirectory, self.sMatterDataHeader)
 
-        with open(data_file, 'w') as file:
+        with open(header_file, 'w') as file:
             json.dump(data, file)
         print("MatterData saved successfully.")
 
+        self.ttxMatter = LazyMatterData(array_directory, ttxMatter)
+
     @staticmethod
-    def import_matter_data(filename):
+    def pack_matter_entry(xValue, sArrayDirectory, sPath, ckKeys=()):
+        """
+        Converts an entry of the matter table into a JSON serializable
+        structure. NumPy arrays are saved to a .npy file in sArrayDirectory
+        and replaced by a reference to that file.
+
+        Args:
+            xValue: Entry of the matter table.
+            sArrayDirectory (str): Directory for the array files.
+            sPath (str): Unique name of the entry, used as file name.
+            ckKeys (tuple): Keys of the nested entry within the entry.
+
+        Returns:
+            JSON serializable representation of the entry.
         """
-        Placeholder for importing matter data from a CSV file.
+        if isinstance(xValue, np.ndarray):
+            # The file name is made unique with a hash of the keys, the
+            # readable part alone is ambiguous (e.g. keys containing dots)
+            sName = '.'.join([sPath] + [str(xKey) for xKey in ckKeys])
+            sHash = hashlib.sha1(repr((sPath,) + ckKeys).encode()).hexdigest()[:16]
+            sFileName = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', sName)}_{sHash}.npy"
+            np.save(os.path.join(sArrayDirectory, sFileName), np.ascontiguousarray(xValue))
+            return {'__npy__': sFileName}
+        if isinstance(xValue, MutableMapping):
+            return {key: Table.pack_matter_entry(value, sArrayDirectory, sPath, ckKeys + (key,))
+                    for key, value in xValue.items()}
+        if isinstance(xValue, (list, tuple)):
+            return [Table.pack_matter_entry(value, sArrayDirectory, sPath, ckKeys + (i,))
+                    for i, value in enumerate(xValue)]
+        if isinstance(xValue, np.generic):
+            return xValue.item()
+        return xValue
+
+    @staticmethod
+    def unpack_matter_entry(xValue, sArrayDirectory):
         """
-        # Example data, replace with real data parsing logic
-        print(f"Importing data from {filename}")
-        return {
-            "H2O": {"fMolarMass": 18.015, "iCharge": 0, "fNutritionalEnergy": 0},
-            "CO2": {"fMolarMass": 44.01, "iCharge": 0, "fNutritionalEnergy": 0},
+        Reverts pack_matter_entry. Array references are memory-mapped
+        read-only from their .npy files.
+
+        Args:
+            xValue: JSON representation of the entry.
+            sArrayDirectory (str): Directory of the array files.
+
+        Returns:
+            The entry of the matter table.
+        """
+        if isinstance(xValue, dict):
+            if '__npy__' in xValue:
+                return np.load(os.path.join(sArrayDirectory, xValue['__npy__']), mmap_mode='r')
+            return {key: Table.unpack_matter_entry(value, sArrayDirectory) for key, value in xValue.items()}
+        if isinstance(xValue, list):
+            return [Table.unpack_matter_entry(value, sArrayDirectory) for value in xValue]
+        return xValue
+
+    # Properties of the matter table that are published to shared memory
+    # for parallel simulations. Numeric arrays (and lists of numbers) within
+    # them are placed in the shared memory block, everything else is part
+    # of the descriptor that is passed to the worker processes.
+    csSharedProperties = (
+        'ttxMatter', 'afMolarMass', 'aiCharge', 'afNutritionalEnergy', 'afDissociationConstant',
+        'tiN2I', 'csSubstances', 'iSubstances', 'csI2N', 'abCompound', 'abEdibleSubstances',
+        'csEdibleSubstances', 'abAbsorber', 'tPhaseBoundaryIndex',
+    )
+
+    def publish_shared_memory(self, csSubstances=None):
+        """
+        Publishes the numeric data of the matter table (molar masses,
+        charges, property data, Antoine and absorber parameters, ...) into a
+        single shared memory block, so parallel worker processes can attach
+        to it without copying the data.
+
+        The shared memory block stays allocated until release_shared_memory
+        is called on this object.
+
+        Args:
+            csSubstances (list): Names of the substances used by the
+                workers, their data is loaded and placed in the block. By
+                default all substances are loaded. Other substances are only
+                passed as references to the compiled matter data.
+
+        Returns:
+            dict: Descriptor of the shared matter table, to be passed to
+                attach_shared_memory in the worker processes.
+        """
+        from multiprocessing import shared_memory
+
+        # Accessing a substance resolves its data, so its arrays are copied
+        # into the block instead of being passed as a reference
+        for sSubstance in (self.csSubstances if csSubstances is None else csSubstances):
+            self.ttxMatter[sSubstance]
+
+        caArrays = []
+
+        def pack(xValue):
+            if isinstance(xValue, (list, tuple)) and xValue and all(
+                    isinstance(x, (bool, int, float, np.number, np.bool_)) for x in xValue):
+                xValue = np.asarray(xValue)
+            if isinstance(xValue, np.ndarray) and xValue.dtype.kind in 'biuf':
+                caArrays.append(np.ascontiguousarray(xValue))
+                return {'__shm__': len(caArrays) - 1}
+            if isinstance(xValue, MutableMapping):
+                return {key: pack(value) for key, value in xValue.items()}
+            if isinstance(xValue, (list, tuple)):
+                return [pack(value) for value in xValue]
+            return xValue
+
+        def pack_property(xValue):
+            # Substances that have not been loaded are passed as references
+            # to their compiled matter data
+            if isinstance(xValue, LazyMatterData):
+                return {'__lazy__': {
+                    'sArrayDirectory': xValue.sArrayDirectory,
+                    'txRawMatter': {
+                        sSubstance: None if xValue.is_loaded(sSubstance) else xRawEntry
+                        for sSubstance, xRawEntry in xValue.txRawMatter.items()
+                    },
+                    'txLoadedMatter': pack(xValue.txLoadedMatter),
+                }}
+            return pack(xValue)
+
+        tDescriptor = {
+            'txProperties': {
+                sProperty: pack_property(getattr(self, sProperty))
+                for sProperty in self.csSharedProperties if hasattr(self, sProperty)
+            },
+            'ctArrays': [],
         }
 
+        # Arrays are aligned to 8 bytes within the shared memory block
+        iOffset = 0
+        for afArray in caArrays:
+            tDescriptor['ctArrays'].append({'iOffset': iOffset, 'aiShape': afArray.shape, 'sDType': afArray.dtype.str})
+            iOffset += -(-afArray.nbytes // 8) * 8
+
+        oSharedMemory = shared_memory.SharedMemory(create=True, size=max(iOffset, 1))
+        for afArray, tArray in zip(caArrays, tDescriptor['ctArrays']):
+            afShared = np.ndarray(afArray.shape, dtype=afArray.dtype, buffer=oSharedMemory.buf, offset=tArray['iOffset'])
+            afShared[...] = afArray
+
+        tDescriptor['sName'] = oSharedMemory.name
+        self.oSharedMemory = oSharedMemory
+        self.bOwnsSharedMemory = True
+        return tDescriptor
+
+    def release_shared_memory(self):
+        """
+        Releases the shared memory block. The table that created the block
+        with publish_shared_memory removes it, which must only be done after
+        all worker processes have finished. Tables attached to the block
+        only close their mapping of it.
+        """
+        oSharedMemory = getattr(self, 'oSharedMemory', None)
+        if oSharedMemory is None:
+            return
+
+        self.oSharedMemory = None
+        if self.bOwnsSharedMemory:
+            oSharedMemory.close()
+            oSharedMemory.unlink()
+            return
+
+        try:
+            oSharedMemory.close()
+        except BufferError:
+            # Arrays of the block are still in use, it stays mapped until
+            # they are deleted or the worker exits
+            pass
+
+    @classmethod
+    def attach_shared_memory(cls, tDescriptor):
+        """
+        Creates a matter table in a worker process whose numeric data are
+        read-only views into the shared memory block published by
+        publish_shared_memory. No data is copied.
+
+        Args:
+            tDescriptor (dict): Descriptor returned by publish_shared_memory.
+
+        Returns:
+            Table: The matter table attached to the shared memory.
+        """
+        from multiprocessing import shared_memory
+
+        try:
+            # The publishing process owns the block, the worker must not
+            # unlink it when it exits
+            oSharedMemory = shared_memory.SharedMemory(name=tDescriptor['sName'], track=False)
+        except TypeError:
+            oSharedMemory = shared_memory.SharedMemory(name=tDescriptor['sName'])
+
+        caArrays = []
+        for tArray in tDescriptor['ctArrays']:
+            afArray = np.ndarray(tuple(tArray['aiShape']), dtype=np.dtype(tArray['sDType']),
+                                 buffer=oSharedMemory.buf, offset=tArray['iOffset'])
+            afArray.flags.writeable = False
+            caArrays.append(afArray)
+
+        def unpack(xValue):
+            if isinstance(xValue, dict):
+                if '__shm__' in xValue:
+                    return caArrays[xValue['__shm__']]
+                if '__lazy__' in xValue:
+                    tLazy = xValue['__lazy__']
+                    ttxMatter = LazyMatterData(tLazy['sArrayDirectory'], dict(tLazy['txRawMatter']))
+                    ttxMatter.txLoadedMatter = unpack(tLazy['txLoadedMatter'])
+                    return ttxMatter
+                return {key: unpack(value) for key, value in xValue.items()}
+            if isinstance(xValue, list):
+                return [unpack(value) for value in xValue]
+            return xValue
+
+        oMT = cls.__new__(cls)
+        for sProperty, xValue in tDescriptor['txProperties'].items():
+            setattr(oMT, sProperty, unpack(xValue))
+
+        # Workers add the substances they use to their own copy of the phase
+        # boundary index, the shared arrays are read-only
+        if hasattr(oMT, 'tPhaseBoundaryIndex'):
+            oMT.tPhaseBoundaryIndex = {sKey: np.array(afValue) for sKey, afValue in oMT.tPhaseBoundaryIndex.items()}
+        else:
+            oMT.build_phase_boundary_index()
+
+        oMT.thPropertyInterpolations = {}
+        oMT.thPackedPropertyInterpolations = {}
+        oMT.initialize_property_cache()
+
+        # Keeps the shared memory mapped as long as the matter table exists.
+        # The block is owned by the publishing table, the worker must not
+        # remove it
+        oMT.oSharedMemory = oSharedMemory
+        oMT.bOwnsSharedMemory = False
+        return oMT
+
     @staticmethod
     def extract_atomic_types(s_molecule):
         """
@@ -7,6 +7,17 @@ class MatterBranch(BaseBranch):
     # Constant property to identify the object type
     sObjectType = 'branch'
 
+    __slots__ = (
+        'aoFlows', 'aoFlowProcs', 'iFlows', 'iFlowProcs', 'fFlowRate', 'afFlowRates',
+        'bTriggerSetFlowRateCallbackBound', 'iIfFlow', 'oThermalBranch', 'hSetFlowData',
+        'hRemoveIfProc', 'hGetBranchData', 'iFlowRateHistoryIndex', 'fFlowRateHistorySum',
+        'iLastOutdatedTick', 'iSuppressedOutdatedTriggers',
+    )
+
+    # Default number of flow rates in the history that is used to detect a
+    # zero flow rate in setFlowRate
+    iFlowRateHistoryLength = 10
+
     def __init__(self, oContainer, xLeft, csProcs, xRight, sCustomName=None):
         """
         Initializes a new matter branch object to transport matter between phases.
@@ -25,11 +36,20 @@ class MatterBranch(BaseBranch):
         self.iFlows = 0
         self.iFlowProcs = 0
         self.fFlowRate = 0
-        self.afFlowRates = [1.0] * 10
+        # Ring buffer of the last flow rates with a running sum, so setting
+        # the flow rate does not allocate a new list
+        self.afFlowRates = [1.0] * self.iFlowRateHistoryLength
+        self.iFlowRateHistoryIndex = 0
+        self.fFlowRateHistorySum = float(self.iFlowRateHistoryLength)
         self.bTriggerSetFlowRateCallbackBound = False
         self.iIfFlow = None
         self.oThermalBranch = None
 
+        # Tick in which the outdated event was last triggered and the number
+        # of outdated notifications that were coalesced into that event
+        self.iLastOutdatedTick = None
+        self.iSuppressedOutdatedTriggers = 0
+
         self.oContainer.addBranch(self)
         self.iFlows = len(self.aoFlows)
         self.iFlowProcs = len(self.aoFlowProcs)
@@ -59,9 +79,20 @@ class MatterBranch(BaseBranch):
     def setOutdated(self):
         """
         Marks the branch as outdated, triggering recalculations for flow rate.
+
+        Within one tick the branch is usually outdated several times, e.g.
+        by the mass updates of the phases on both sides. These notifications
+        are coalesced, the outdated event is only triggered again once the
+        solver has set a new flow rate. Suppressed notifications are counted
+        in iSuppressedOutdatedTriggers.
         """
+        if self.bOutdated and self.iLastOutdatedTick == self.oTimer.iTick:
+            self.iSuppressedOutdatedTriggers += 1
+            return
+
         if not self.bOutdated or self.oTimer.fTime > self.oHandler.fLastUpdate:
             self.bOutdated = True
+            self.iLastOutdatedTick = self.oTimer.iTick
             self.trigger('outdated')
 
     def setIfLength(self, iLength):
@@ -113,10 +144,40 @@ class MatterBranch(BaseBranch):
         Args:
             sType (str): Type of event.
             callback (callable): Callback function.
+
+        Returns:
+            function: A handle to unbind the callback.
         """
-        super().bind(sType, callback)
+        hUnbind = super().bind(sType, callback)
         if sType == 'setFlowRate':
             self.bTriggerSetFlowRateCallbackBound = True
+        return hUnbind
+
+    def setFlowRateHistoryLength(self, iLength):
+        """
+        Sets the number of flow rates in the history of the branch. The
+        flow rate is only set to zero if the sum of all flow rates in the
+        history is below the precision threshold. The current history is
+        reset.
+
+        Args:
+            iLength (int): Number of flow rates in the history.
+        """
+        if iLength < 1:
+            raise ValueError("The flow rate history must contain at least one entry.")
+
+        self.afFlowRates = [1.0] * iLength
+        self.iFlowRateHistoryIndex = 0
+        self.fFlowRateHistorySum = float(iLength)
+
+    def getFlowRateHistory(self):
+        """
+        Returns the recent flow rates of the branch for diagnostics.
+
+        Returns:
+            list: Flow rates in kg/s, from the oldest to the newest.
+        """
+        return self.afFlowRates[self.iFlowRateHistoryIndex:] + self.afFlowRates[:self.iFlowRateHistoryIndex]
 
     def setThermalBranch(self, oThermalBranch):
         """
@@ -141,9 +202,19 @@ class MatterBranch(BaseBranch):
         for exme in self.coExmes:
             exme.oPhase.registerMassupdate()
 
-        self.afFlowRates = self.afFlowRates[1:] + [fFlowRate]
-
-        if sum(self.afFlowRates) < 1e-10:  # Precision threshold
+        # Replace the oldest flow rate in the ring buffer and update the sum.
+        # The sum is recalculated once per pass through the buffer to prevent
+        # the accumulation of rounding errors.
+        iIndex = self.iFlowRateHistoryIndex
+        self.fFlowRateHistorySum += fFlowRate - self.afFlowRates[iIndex]
+        self.afFlowRates[iIndex] = fFlowRate
+        iIndex += 1
+        if iIndex == len(self.afFlowRates):
+            iIndex = 0
+            self.fFlowRateHistorySum = sum(self.afFlowRates)
+        self.iFlowRateHistoryIndex = iIndex
+
+        if self.fFlowRateHistorySum < 1e-10:  # Precision threshold
             fFlowRate = 0
             afPressureDrops = [0] * self.iFlowProcs
 
@@ -169,7 +240,7 @@ class MatterBranch(BaseBranch):
             if self.abIf[1] and self.iIfFlow == i + 1:
                 self.hSetFlowData, self.hRemoveIfProc = flow.seal(True)
             elif i == 0:
-                self.hSetFlowData = flow.seal(False, self)
+                self.hSetFlowData, _ = flow.seal(False, self)
             else:
                 flow.seal(False, self)
 
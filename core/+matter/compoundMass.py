@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class CompoundMass:
+    """
+    CompoundMass: Sparse storage of the composition of compound masses.
+
+    In V-HAB the composition of the compound masses of a phase or flow is
+    stored as a dense iSubstances x iSubstances matrix, in which row i
+    holds the base composition of compound i. Only a few compounds (e.g.
+    food, biomass, urine, feces) ever have entries, so only these rows are
+    stored here, as a dictionary of compound index to composition vector.
+
+    Phases, flows and P2Ps that handle the same matter share one object by
+    reference, like they shared the dense matrix before.
+    """
+
+    __slots__ = ('iSubstances', 'tarComposition')
+
+    def __init__(self, iSubstances, tarComposition=None):
+        """
+        Args:
+            iSubstances (int): Number of substances in the matter table.
+            tarComposition (dict): Optional mapping of compound index to
+                the base composition of the compound.
+        """
+        self.iSubstances = iSubstances
+        self.tarComposition = {}
+
+        if tarComposition:
+            for iCompound, arComposition in tarComposition.items():
+                self.set_composition(iCompound, arComposition)
+
+    @classmethod
+    def from_dense(cls, mrCompoundMass):
+        """
+        Creates the sparse representation of a dense compound mass matrix.
+
+        Args:
+            mrCompoundMass: iSubstances x iSubstances matrix.
+
+        Returns:
+            CompoundMass: The sparse compound mass.
+        """
+        if isinstance(mrCompoundMass, cls):
+            return mrCompoundMass
+
+        mrCompoundMass = np.asarray(mrCompoundMass, dtype=float)
+        oCompoundMass = cls(mrCompoundMass.shape[0])
+        for iCompound in np.flatnonzero(np.any(mrCompoundMass, axis=1)):
+            oCompoundMass.tarComposition[int(iCompound)] = mrCompoundMass[iCompound].copy()
+        return oCompoundMass
+
+    def set_composition(self, iCompound, arComposition):
+        """
+        Sets the base composition of a compound. A composition without any
+        entries removes the compound.
+
+        Args:
+            iCompound (int): Index of the compound in the matter table.
+            arComposition: Mass ratios of the base substances.
+        """
+        arComposition = np.asarray(arComposition, dtype=float)
+        if arComposition.shape != (self.iSubstances,):
+            raise ValueError(f"The composition of a compound must have {self.iSubstances} entries.")
+
+        if np.any(arComposition):
+            self.tarComposition[int(iCompound)] = arComposition.copy()
+        else:
+            self.tarComposition.pop(int(iCompound), None)
+
+    def set_component(self, iCompound, iSubstance, rRatio):
+        """
+        Sets the ratio of a single base substance in a compound.
+
+        Args:
+            iCompound (int): Index of the compound in the matter table.
+            iSubstance (int): Index of the base substance.
+            rRatio (float): Mass ratio of the base substance.
+        """
+        arComposition = self.tarComposition.get(int(iCompound))
+        if arComposition is None:
+            if rRatio == 0:
+                return
+            arComposition = np.zeros(self.iSubstances)
+            self.tarComposition[int(iCompound)] = arComposition
+        arComposition[iSubstance] = rRatio
+
+    def get_composition(self, iCompound):
+        """
+        Returns the base composition of a compound, zeros if the compound
+        has no entries.
+        """
+        arComposition = self.tarComposition.get(int(iCompound))
+        if arComposition is None:
+            return np.zeros(self.iSubstances)
+        return arComposition
+
+    def resolve(self, afMass, abCompound):
+        """
+        Resolves the compound masses of a mass vector into their base
+        substances.
+
+        Args:
+            afMass: Mass (or mass ratio) vector including compound masses.
+            abCompound: Boolean vector of the compound substances.
+
+        Returns:
+            numpy.ndarray: Mass vector that only contains base substances.
+        """
+        afMass = np.asarray(afMass, dtype=float)
+        abCompound = np.asarray(abCompound, dtype=bool)
+
+        afResolvedMass = np.where(abCompound, 0.0, afMass)
+        for iCompound, arComposition in self.tarComposition.items():
+            if afMass[iCompound] != 0:
+                afResolvedMass += afMass[iCompound] * arComposition
+        return afResolvedMass
+
+    def to_dense(self):
+        """
+        Returns the dense iSubstances x iSubstances matrix.
+        """
+        mrCompoundMass = np.zeros((self.iSubstances, self.iSubstances))
+        for iCompound, arComposition in self.tarComposition.items():
+            mrCompoundMass[iCompound] = arComposition
+        return mrCompoundMass
+
+    def copy(self):
+        """
+        Returns an independent copy of the compound mass.
+        """
+        return CompoundMass(self.iSubstances, self.tarComposition)
+
+    def __contains__(self, iCompound):
+        return int(iCompound) in self.tarComposition
@@ -148,6 +148,20 @@ class Container(Sys):
             if not branch.oHandler:
                 raise ValueError(f"Branch {branch.sName} in system {self.sName} has no solver.")
 
+    def getSuppressedOutdatedTriggers(self):
+        """
+        Returns the number of outdated notifications of the branches in this
+        container and all subsystems that were coalesced into an already
+        triggered outdated event (see MatterBranch.setOutdated).
+
+        Returns:
+            int: Number of suppressed outdated triggers.
+        """
+        iSuppressed = sum(branch.iSuppressedOutdatedTriggers for branch in self.aoBranches)
+        for child in self.toChildren.values():
+            iSuppressed += child.getSuppressedOutdatedTriggers()
+        return iSuppressed
+
     def setMaxIdealGasLawPressure(self, fMaxIdealGasLawPressure):
         """
         Sets the maximum pressure up to which the ideal gas law is used.
@@ -1,9 +1,28 @@
+import numpy as np
+
+from matter.compoundMass import CompoundMass
+
+
 class Flow:
     """
     Flow: A class describing the flow of matter.
     Represents a homogenous flow of matter at an interface between components of the simulation.
     """
 
+    # Flows are the most numerous objects of large branch networks, so their
+    # attributes are stored in slots instead of an instance dictionary. The
+    # weak reference slot is required for the property cache of the matter
+    # table.
+    __slots__ = (
+        'fFlowRate', 'fPressure', 'fTemperature', 'fMolarMass', 'fDensity', 'fDynamicViscosity',
+        'arPartialMass', 'arCompoundMass', 'oMT', 'oTimer', 'oBranch', 'oStore', 'fDiameter',
+        'oIn', 'oOut', 'iFlow', 'bSealed', 'bInterface', 'fTemperatureAtLastMassPropertySet',
+        'fPressureAtLastMassPropertySet', 'arPartialsAtLastMassPropertySet', 'thRemoveCBs',
+        '__weakref__',
+    )
+
+    sObjectType = "flow"  # Object type identifier
+
     def __init__(self, oCreator=None):
         """
         Initialize the flow object.
@@ -29,19 +48,16 @@ class Flow:
         self.iFlow = 0  # Flow index within the branch
         self.bSealed = False  # Indicates if the flow is sealed
         self.bInterface = False  # Indicates if this is an interface flow
-        self.tfPropertiesAtLastMassPropertySet = {
-            "fTemperature": -1,
-            "fPressure": -1,
-            "arPartials": None,
-        }
-        self.sObjectType = "flow"  # Object type identifier
+        self.fTemperatureAtLastMassPropertySet = -1
+        self.fPressureAtLastMassPropertySet = -1
+        self.arPartialsAtLastMassPropertySet = None
         self.thRemoveCBs = {"in": None, "out": None}  # Callbacks for removal
 
         if oCreator:
             self.oMT = oCreator.oMT
             self.oTimer = oCreator.oTimer
-            self.arPartialMass = [0] * self.oMT.iSubstances
-            self.arCompoundMass = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
+            self.arPartialMass = np.zeros(self.oMT.iSubstances)
+            self.arCompoundMass = CompoundMass(self.oMT.iSubstances)
 
             if isinstance(oCreator, MatterBranch):
                 self.oBranch = oCreator
@@ -65,7 +81,7 @@ class Flow:
 
         self.bSealed = True
         hRemoveIfProc = None
-        setData = lambda oThis, *args: oThis.setData(*args)
+        setData = Flow.setData
 
         if bIf and self.oIn and not self.oOut:
             self.bInterface = True
@@ -101,6 +117,18 @@ class Flow:
         self.oIn = None
         self.oOut = None
 
+    @property
+    def tfPropertiesAtLastMassPropertySet(self):
+        """
+        Returns the properties of the flow at the last time the mass
+        properties were set.
+        """
+        return {
+            "fTemperature": self.fTemperatureAtLastMassPropertySet,
+            "fPressure": self.fPressureAtLastMassPropertySet,
+            "arPartials": self.arPartialsAtLastMassPropertySet,
+        }
+
     def getDensity(self):
         """
         Returns the density of the flow.
@@ -186,9 +214,39 @@ class Flow:
             return fFlowRate / density
         return 0
 
-    def setData(self, aoFlows, oExme, fFlowRate, afPressures):
+    @staticmethod
+    def setData(aoFlows, oExme, fFlowRate, afPressures):
         """
-        Sets the data for this flow based on provided parameters.
-        """
-        # Logic for updating flow properties...
-        pass
+        Sets the flow rate and the matter properties of all flows of a
+        branch. The matter properties are those of the phase the matter
+        flows out of, the pressure of the flows decreases by the pressure
+        drops of the F2F processors in the direction of the flow.
+
+        Args:
+            aoFlows (list): Flows of the branch, from left to right.
+            oExme: ExMe through which the matter flows into the branch.
+            fFlowRate (float): Flow rate in kg/s.
+            afPressures (list): Pressure drops of the F2F processors in Pa,
+                positive in the direction of the flow.
+        """
+        oPhase = oExme.oPhase
+
+        if fFlowRate < 0:
+            aoFlows = aoFlows[::-1]
+            afPressures = afPressures[::-1]
+
+        fPressure = oPhase.fPressure
+        for iFlow, oFlow in enumerate(aoFlows):
+            oFlow.fFlowRate = fFlowRate
+            oFlow.fPressure = fPressure
+            oFlow.fTemperature = oPhase.fTemperature
+            oFlow.arPartialMass = oPhase.arPartialMass
+            oFlow.fMolarMass = oPhase.fMolarMass
+            oFlow.arCompoundMass = oPhase.arCompoundMass
+
+            # The cached properties depend on the matter of the flow
+            oFlow.fDensity = None
+            oFlow.fDynamicViscosity = None
+
+            if iFlow < len(afPressures):
+                fPressure = max(fPressure - afPressures[iFlow], 0)
@@ -0,0 +1,234 @@
+import numpy as np
+
+
+def calculate_new_time_steps(mfPartialFlows, mfMass, afMass, tConstraints):
+    """
+    Calculates the new time steps of a set of phases in one vectorized pass.
+    Each row of the matrices belongs to one phase, see
+    Phase.calculate_time_step for the meaning of the individual limits.
+
+    Args:
+        mfPartialFlows: Partial mass change rates in kg/s (phases x substances).
+        mfMass: Partial masses in kg (phases x substances).
+        afMass: Total mass of each phase in kg.
+        tConstraints (dict): Time step constraints of the phases as arrays:
+            afMassErrorLimit, afMaxStep, afMinStep, afFixedTimeStep (NaN
+            for phases without a fixed time step), abFlow, arMaxChange,
+            mrMaxChange (substance-specific limits, zero where not used),
+            afPrecision (10 ** -iTimeStepPrecision) and afMaximumInitialMass.
+
+    Returns:
+        tuple: The new time steps and, for debugging, the reason for each
+            step ('max', 'min' or None).
+    """
+    afPrecision = tConstraints['afPrecision'][:, np.newaxis]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Maximum time step to avoid negative masses
+        mfMaxFlowStep = np.abs((tConstraints['afMassErrorLimit'][:, np.newaxis] + mfMass) / mfPartialFlows)
+        afMaxFlowStep = np.where(mfPartialFlows < 0, mfMaxFlowStep, np.inf).min(axis=1, initial=np.inf)
+
+        # Partial mass changes per second
+        afRoundedMass = _round_to_precision(afMass, tConstraints['afPrecision'])
+        mrPartialsChange = np.abs(mfPartialFlows / afRoundedMass[:, np.newaxis])
+        mrPartialsChange[(mfPartialFlows == 0) | np.isinf(mrPartialsChange) | np.isnan(mrPartialsChange)] = 0
+        arPartialsPerSecond = mrPartialsChange.max(axis=1, initial=0)
+
+        # Total mass change per second
+        afChange = mfPartialFlows.sum(axis=1)
+        arTotalPerSecond = np.abs(_round_to_precision(afChange, tConstraints['afPrecision']) / afMass)
+        arTotalPerSecond[afChange == 0] = 0
+
+        # Partial mass changes compared to the individual masses
+        mfCurrentMass = np.maximum(mfMass, afPrecision)
+        mrChangeToPartials = np.abs(mfPartialFlows / _round_to_precision(mfCurrentMass, afPrecision))
+        mrChangeToPartials[mfMass == 0] = 0
+        mfStepChangeToPartials = tConstraints['mrMaxChange'] / mrChangeToPartials
+        mfStepChangeToPartials[(tConstraints['mrMaxChange'] == 0) | np.isnan(mfStepChangeToPartials)] = np.inf
+        afStepChangeToPartials = mfStepChangeToPartials.min(axis=1, initial=np.inf)
+
+        arMaxChange = tConstraints['arMaxChange']
+        afNewStep = np.minimum.reduce([
+            np.where(arTotalPerSecond > 0, arMaxChange / arTotalPerSecond, np.inf),
+            np.where(arPartialsPerSecond > 0, arMaxChange / arPartialsPerSecond, np.inf),
+            afStepChangeToPartials,
+        ])
+
+        # Special cases for phases without mass
+        abEmpty = afMass == 0
+        afEmptyStep = np.where(afChange < 0, tConstraints['afMassErrorLimit'], tConstraints['afMaximumInitialMass'])
+        afNewStep[abEmpty] = np.abs(afEmptyStep[abEmpty] / afChange[abEmpty])
+
+    afNewStep[tConstraints['abFlow']] = tConstraints['afMaxStep'][tConstraints['abFlow']]
+    abFixed = ~np.isnan(tConstraints['afFixedTimeStep'])
+    afNewStep[abFixed] = tConstraints['afFixedTimeStep'][abFixed]
+
+    # Ensure the time step is within the allowable bounds
+    abMax = afNewStep > tConstraints['afMaxStep']
+    abMin = ~abMax & (afNewStep < tConstraints['afMinStep'])
+    afNewStep = np.clip(afNewStep, tConstraints['afMinStep'], tConstraints['afMaxStep'])
+
+    # Compare with the maximum flow time step
+    afNewStep = np.where(afNewStep > afMaxFlowStep, np.maximum(afMaxFlowStep, tConstraints['afMinStep']), afNewStep)
+
+    csReason = np.where(abMax, 'max', np.where(abMin, 'min', None))
+    return afNewStep, csReason
+
+
+def _round_to_precision(xValue, xPrecision):
+    """
+    Rounds values to the given precision (e.g. 1e-5 for 5 decimals).
+    """
+    return np.round(xValue / xPrecision) * xPrecision
+
+
+def get_time_step_constraints(aoPhases):
+    """
+    Collects the time step constraints of the phases into arrays for
+    calculate_new_time_steps.
+
+    Args:
+        aoPhases (list): Phases, all with the same number of substances.
+
+    Returns:
+        dict: The constraints of the phases.
+    """
+    iSubstances = len(aoPhases[0].afMass) if aoPhases else 0
+
+    mrMaxChange = np.zeros((len(aoPhases), iSubstances))
+    for iPhase, oPhase in enumerate(aoPhases):
+        if oPhase.bHasSubstanceSpecificMaxChangeValues:
+            mrMaxChange[iPhase] = oPhase.arMaxChange
+
+    return {
+        'afMassErrorLimit': np.array([oPhase.fMassErrorLimit for oPhase in aoPhases], dtype=float),
+        'afMaxStep': np.array([oPhase.fMaxStep for oPhase in aoPhases], dtype=float),
+        'afMinStep': np.array([oPhase.fMinStep for oPhase in aoPhases], dtype=float),
+        'afFixedTimeStep': np.array([np.nan if oPhase.fFixedTimeStep is None else oPhase.fFixedTimeStep
+                                     for oPhase in aoPhases], dtype=float),
+        'abFlow': np.array([bool(oPhase.bFlow) for oPhase in aoPhases], dtype=bool),
+        'arMaxChange': np.array([oPhase.rMaxChange for oPhase in aoPhases], dtype=float),
+        'mrMaxChange': mrMaxChange,
+        'afPrecision': np.array([10.0 ** -oPhase.iTimeStepPrecision for oPhase in aoPhases], dtype=float),
+        'afMaximumInitialMass': np.array([oPhase.fMaximumInitialMass for oPhase in aoPhases], dtype=float),
+    }
+
+
+class TimeStepEvaluator:
+    """
+    TimeStepEvaluator: Calculates the time steps of many phases at once.
+
+    The time step constraints of the phases are collected into arrays and
+    reused for every evaluation, they are collected again after the time
+    step properties of a phase changed (see
+    Phase.reset_time_step_constraints). Flow and boundary phases always use
+    their maximum time step and are therefore not handled here.
+
+    If a timer is given, the evaluator replaces the time step post ticks of
+    its phases: a phase that sets its time step outdated only marks itself
+    and the evaluator calculates the time steps of all marked phases in one
+    post tick.
+    """
+
+    def __init__(self, aoPhases, oMassStateArena=None, oTimer=None):
+        """
+        Args:
+            aoPhases (list): Phases whose time steps are calculated.
+            oMassStateArena: Optional mass state arena of the phases. If
+                provided, the masses are read from the arena instead of
+                being collected from the phases.
+            oTimer: Timer of the simulation. If given, the time step post
+                ticks of the phases are executed by the evaluator.
+        """
+        self.aoPhases = [oPhase for oPhase in aoPhases
+                         if not (getattr(oPhase, 'bFlow', False) or getattr(oPhase, 'bBoundary', False))]
+        self.oMassStateArena = oMassStateArena
+
+        if oMassStateArena is not None:
+            self.aiArenaRows = np.array([oPhase.iMassStateIndex for oPhase in self.aoPhases], dtype=int)
+
+        self.abOutdated = np.zeros(len(self.aoPhases), dtype=bool)
+        self.tConstraints = None
+
+        for iPhase, oPhase in enumerate(self.aoPhases):
+            oPhase.oTimeStepEvaluator = self
+            oPhase.iTimeStepIndex = iPhase
+
+        if oTimer is not None:
+            self.hBindPostTickTimeStep = oTimer.register_post_tick(self.update, 'post_physics', 'timestep')
+
+            for iPhase, oPhase in enumerate(self.aoPhases):
+                oPhase.hBindPostTickTimeStep = lambda iPhase=iPhase: self.register_time_step(iPhase)
+
+    def reset_constraints(self):
+        """
+        Discards the collected time step constraints, they are collected
+        again in the next evaluation.
+        """
+        self.tConstraints = None
+
+    def refresh_constraints(self):
+        """
+        Collects the time step constraints of the phases again.
+        """
+        self.tConstraints = get_time_step_constraints(self.aoPhases)
+
+    def register_time_step(self, iPhase):
+        """
+        Marks the time step of a phase as outdated for the next post tick.
+
+        Args:
+            iPhase (int): Index of the phase in the evaluator.
+        """
+        self.abOutdated[iPhase] = True
+        self.hBindPostTickTimeStep()
+
+    def update(self):
+        """
+        Post tick of the evaluator, calculates the time steps of all phases
+        that were marked as outdated.
+        """
+        aiPhases = np.flatnonzero(self.abOutdated)
+        self.abOutdated[aiPhases] = False
+        self.calculate_time_steps(aiPhases)
+
+    def calculate_time_steps(self, aiPhases=None):
+        """
+        Updates the mass change rates of the phases, calculates their new
+        time steps in one vectorized pass and sets them.
+
+        Args:
+            aiPhases: Indices of the phases to calculate, all phases if not
+                provided.
+
+        Returns:
+            numpy.ndarray: The new time steps of the phases.
+        """
+        if aiPhases is None:
+            aiPhases = np.arange(len(self.aoPhases))
+        if len(aiPhases) == 0:
+            return np.zeros(0)
+
+        if self.tConstraints is None:
+            self.refresh_constraints()
+
+        aoPhases = [self.aoPhases[iPhase] for iPhase in aiPhases]
+
+        mfPartialFlows = np.empty((len(aoPhases), len(aoPhases[0].afMass)))
+        for iRow, oPhase in enumerate(aoPhases):
+            mfPartialFlows[iRow] = oPhase.update_mass_change_rates()
+
+        if self.oMassStateArena is not None:
+            mfMass = self.oMassStateArena.mfMass[self.aiArenaRows[aiPhases]]
+        else:
+            mfMass = np.array([oPhase.afMass for oPhase in aoPhases], dtype=float)
+
+        afMass = np.array([oPhase.fMass for oPhase in aoPhases], dtype=float)
+
+        tConstraints = {sField: xValue[aiPhases] for sField, xValue in self.tConstraints.items()}
+        afNewStep, csReason = calculate_new_time_steps(mfPartialFlows, mfMass, afMass, tConstraints)
+
+        for iRow, oPhase in enumerate(aoPhases):
+            oPhase.apply_time_step(float(afNewStep[iRow]), csReason[iRow])
+
+        return afNewStep
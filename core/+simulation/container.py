@@ -1,3 +1,7 @@
+from matter.timeStepEvaluator import TimeStepEvaluator
+from simulation.massStateArena import MassStateArena
+
+
 class Container:
     """
     Base class for simulation models.
@@ -28,8 +32,61 @@ class Container:
             "rSolverDampening": 1,
             "fMaxTimeStep": 20,
             "fSolverSensitivity": 5,
+            # Store the masses of all phases in one contiguous matrix, see
+            # seal_mass_state_arena
+            "bUseMassStateArena": False,
+            # Calculate the time steps of all phases in one vectorized post
+            # tick, see seal_time_step_evaluator
+            "bUseTimeStepEvaluator": False,
         }
 
         # Merge provided solver parameters with the defaults, if applicable
         if tSolverParams:
             self.tSolverParams.update(tSolverParams)
+
+        self.oMassStateArena = None
+        self.oTimeStepEvaluator = None
+
+    def seal_mass_state_arena(self):
+        """
+        Allocates the mass state arena for all phases of the simulation that
+        accumulate mass, binds the mass vectors of the phases to it and moves
+        their mass updates into the arena. Must be called after the matter
+        structure has been sealed.
+
+        Returns:
+            MassStateArena: The mass state arena.
+        """
+        if self.oMassStateArena is not None:
+            raise RuntimeError("The mass state arena has already been created.")
+
+        self.oMassStateArena = MassStateArena(self.get_all_phases(), self.oMT.iSubstances, self.oTimer)
+        return self.oMassStateArena
+
+    def seal_time_step_evaluator(self):
+        """
+        Creates the time step evaluator, which calculates the time steps of
+        all phases of the simulation in one vectorized post tick. Must be
+        called after the mass state arena, if any, has been created.
+
+        Returns:
+            TimeStepEvaluator: The time step evaluator.
+        """
+        if self.oTimeStepEvaluator is not None:
+            raise RuntimeError("The time step evaluator has already been created.")
+
+        self.oTimeStepEvaluator = TimeStepEvaluator(self.get_all_phases(), self.oMassStateArena, self.oTimer)
+        return self.oTimeStepEvaluator
+
+    def get_all_phases(self):
+        """
+        Returns the phases of all stores in all systems of the simulation.
+        """
+        aoPhases = []
+        aoSystems = list(getattr(self, 'toChildren', {}).values())
+        while aoSystems:
+            oSystem = aoSystems.pop(0)
+            for oStore in getattr(oSystem, 'toStores', {}).values():
+                aoPhases.extend(oStore.aoPhases)
+            aoSystems.extend(getattr(oSystem, 'toChildren', {}).values())
+        return aoPhases
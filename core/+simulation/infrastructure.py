@@ -69,7 +69,7 @@ class Infrastructure:
         """
         Placeholder for creating a global timer object.
         """
-        return Timer()
+        return Timer(bUseHeapScheduler=self.tSolverParams.get('bUseHeapScheduler', False))
 
     def _create_simulation_container(self):
         """
@@ -100,6 +100,13 @@ class Infrastructure:
 
         print("Initializing simulation...")
         self.bInitialized = True
+
+        if self.oSimulationContainer.tSolverParams.get("bUseMassStateArena", False):
+            self.oSimulationContainer.seal_mass_state_arena()
+
+        if self.oSimulationContainer.tSolverParams.get("bUseTimeStepEvaluator", False):
+            self.oSimulationContainer.seal_time_step_evaluator()
+
         self.configure_monitors()
 
     def configure_monitors(self):
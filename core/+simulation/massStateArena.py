@@ -0,0 +1,175 @@
+import numpy as np
+
+
+class MassStateArena:
+    """
+    MassStateArena: Contiguous storage of the mass state of all phases.
+
+    The masses of all phases of a simulation that accumulate mass are stored
+    in one iPhases x iSubstances matrix. Flow phases enforce zero mass
+    change and boundary phases contain an infinite amount of matter, so
+    both are not part of the arena. After binding, the afMass,
+    afMassGenerated and afCurrentTotalInOuts vectors of each phase are views
+    into its row of the matrices, so the phases keep working on their own
+    vectors while the whole model can be handled with single vectorized
+    operations, e.g. for the total mass checks of the observers, snapshots
+    for checkpoints or the export to the logger.
+
+    If a timer is given, the mass updates of the phases are also executed
+    by the arena: a phase that registers its mass update only marks its row
+    and the arena integrates all marked rows in one post tick (see
+    massupdate).
+
+    The phases must only update their vectors in place, assigning a new
+    vector would detach the phase from the arena.
+    """
+
+    def __init__(self, aoPhases, iSubstances, oTimer=None):
+        """
+        Allocates the arena and binds the mass vectors of the phases to it.
+        The current masses of the phases are copied into the arena.
+
+        Args:
+            aoPhases (list): All phases of the simulation, flow and boundary
+                phases are skipped.
+            iSubstances (int): Number of substances in the matter table.
+            oTimer: Timer of the simulation. If given, the mass updates of
+                the phases are executed by the arena.
+        """
+        self.aoPhases = [oPhase for oPhase in aoPhases
+                         if not (getattr(oPhase, 'bFlow', False) or getattr(oPhase, 'bBoundary', False))]
+        self.iPhases = len(self.aoPhases)
+        self.iSubstances = iSubstances
+        self.oTimer = oTimer
+
+        self.mfMass = np.zeros((self.iPhases, self.iSubstances))
+        self.mfMassGenerated = np.zeros((self.iPhases, self.iSubstances))
+        self.mfCurrentTotalInOuts = np.zeros((self.iPhases, self.iSubstances))
+
+        self.afLastMassUpdate = np.array([oPhase.fLastMassUpdate for oPhase in self.aoPhases], dtype=float)
+        self.abMassUpdatePending = np.zeros(self.iPhases, dtype=bool)
+
+        for iPhase, oPhase in enumerate(self.aoPhases):
+            oPhase.bind_mass_state(self.mfMass[iPhase], self.mfMassGenerated[iPhase], self.mfCurrentTotalInOuts[iPhase])
+            oPhase.iMassStateIndex = iPhase
+
+        if self.oTimer is not None:
+            self.hBindPostTickMassUpdate = self.oTimer.register_post_tick(self.massupdate, 'matter', 'phase_massupdate')
+
+            # The phases register their mass update with the arena instead
+            # of their own post tick
+            for iPhase, oPhase in enumerate(self.aoPhases):
+                oPhase.hBindPostTickMassUpdate = lambda iPhase=iPhase: self.register_massupdate(iPhase)
+
+    def register_massupdate(self, iPhase):
+        """
+        Marks the mass update of a phase for the next post tick.
+
+        Args:
+            iPhase (int): Row of the phase in the arena.
+        """
+        self.abMassUpdatePending[iPhase] = True
+        self.hBindPostTickMassUpdate()
+
+    def massupdate(self):
+        """
+        Integrates the masses of all phases that registered a mass update
+        with one vectorized operation. Negative masses are set to zero and
+        the mass that had to be generated for this is stored, as in
+        Phase.massupdate.
+        """
+        aiPhases = np.flatnonzero(self.abMassUpdatePending)
+        self.abMassUpdatePending[aiPhases] = False
+
+        fTime = self.oTimer.fTime
+        afLastStep = fTime - self.afLastMassUpdate[aiPhases]
+        abStep = afLastStep != 0
+
+        # Phases that were already updated in this tick only recalculate
+        # their time step and notify their P2Ps and manipulators
+        for iPhase in aiPhases[~abStep]:
+            oPhase = self.aoPhases[iPhase]
+            oPhase.set_outdated_ts()
+            oPhase.set_p2ps_and_manips_outdated()
+
+        aiPhases = aiPhases[abStep]
+        if aiPhases.size == 0:
+            return
+        afLastStep = afLastStep[abStep]
+
+        mfMass = self.mfMass[aiPhases] + self.mfCurrentTotalInOuts[aiPhases] * afLastStep[:, np.newaxis]
+
+        mbNegative = mfMass < 0
+        if mbNegative.any():
+            self.mfMassGenerated[aiPhases] -= np.where(mbNegative, mfMass, 0)
+            mfMass[mbNegative] = 0
+
+        self.mfMass[aiPhases] = mfMass
+        self.afLastMassUpdate[aiPhases] = fTime
+        afTotalMass = mfMass.sum(axis=1)
+
+        for iRow, iPhase in enumerate(aiPhases):
+            oPhase = self.aoPhases[iPhase]
+            oPhase.fLastMassUpdate = fTime
+            oPhase.fMassUpdateTimeStep = float(afLastStep[iRow])
+            oPhase.finish_massupdate(float(afTotalMass[iRow]))
+
+    def get_total_masses(self):
+        """
+        Returns the total mass of each phase.
+        """
+        return self.mfMass.sum(axis=1)
+
+    def get_total_mass(self):
+        """
+        Returns the total mass of all phases in the arena.
+        """
+        return float(self.mfMass.sum())
+
+    def get_generated_mass(self):
+        """
+        Returns the total mass that had to be generated in all phases to
+        prevent negative masses.
+        """
+        return float(self.mfMassGenerated.sum())
+
+    def get_mass_state(self):
+        """
+        Returns a read-only view of the mass matrix, e.g. for the logger.
+        No data is copied.
+        """
+        mfMass = self.mfMass.view()
+        mfMass.flags.writeable = False
+        return mfMass
+
+    def create_snapshot(self):
+        """
+        Creates a snapshot of the mass state of all phases for checkpoints.
+
+        Returns:
+            dict: Copies of the mass and generated mass matrices.
+        """
+        return {
+            'mfMass': self.mfMass.copy(),
+            'mfMassGenerated': self.mfMassGenerated.copy(),
+        }
+
+    def restore_snapshot(self, tSnapshot):
+        """
+        Restores the mass state of all phases from a snapshot created by
+        create_snapshot. The total masses and partial mass ratios of the
+        phases are updated accordingly.
+
+        Args:
+            tSnapshot (dict): Snapshot of the mass state.
+        """
+        if tSnapshot['mfMass'].shape != self.mfMass.shape:
+            raise ValueError("The snapshot does not match the phases of the mass state arena.")
+
+        self.mfMass[...] = tSnapshot['mfMass']
+        self.mfMassGenerated[...] = tSnapshot['mfMassGenerated']
+
+        afTotalMass = self.get_total_masses()
+        for iPhase, oPhase in enumerate(self.aoPhases):
+            oPhase.fMass = float(afTotalMass[iPhase])
+            oPhase.arPartialMass = oPhase._calculate_partial_mass()
@@ -0,0 +1,19 @@
+class Callback:
+    """
+    Callback: Solver support of F2F processors that calculate their pressure
+    drop for a given flow rate.
+
+    Registered by the F2F processors with supportSolver('callback', ...) and
+    used by the solvers that iterate the flow rate of a branch, e.g. the
+    multi-branch solver. The pressure drop is positive if pressure is lost
+    in the direction of the flow and negative if the processor raises the
+    pressure (e.g. a fan).
+    """
+
+    def __init__(self, calculateDeltas):
+        """
+        Args:
+            calculateDeltas (function): Function that returns the pressure
+                drop in Pa for a flow rate in kg/s.
+        """
+        self.calculateDeltas = calculateDeltas
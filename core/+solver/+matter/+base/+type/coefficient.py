@@ -0,0 +1,19 @@
+class Coefficient:
+    """
+    Coefficient: Solver support of F2F processors whose pressure drop is
+    described by a coefficient.
+
+    Registered by the F2F processors with supportSolver('coefficient', ...)
+    and used by the solvers that linearize the pressure drops of the
+    processors. The pressure drop in Pa is the coefficient times the flow
+    rate in kg/s.
+    """
+
+    def __init__(self, calculatePressureDropCoefficient):
+        """
+        Args:
+            calculatePressureDropCoefficient (function): Function that
+                returns the pressure drop coefficient in Pa/(kg/s) for a
+                flow rate in kg/s.
+        """
+        self.calculatePressureDropCoefficient = calculatePressureDropCoefficient
@@ -0,0 +1,30 @@
+class Hydraulic:
+    """
+    Hydraulic: Solver support of F2F processors that are described by their
+    hydraulic diameter and length.
+
+    Registered by the F2F processors with supportSolver('hydraulic', ...)
+    and used by the solvers that calculate the pressure drop from the
+    geometry of the processors. Active processors (e.g. a fan) change the
+    pressure themselves, their update function is called by the solver
+    instead.
+    """
+
+    def __init__(self, fHydrDiam, fHydrLength, bActive=False, hUpdate=None):
+        """
+        Args:
+            fHydrDiam (float): Hydraulic diameter in m, negative for active
+                processors.
+            fHydrLength (float): Hydraulic length in m.
+            bActive (bool): True if the processor changes the pressure
+                itself.
+            hUpdate (function): Function that returns the pressure drop in
+                Pa for a flow rate in kg/s, required for active processors.
+        """
+        if bActive and hUpdate is None:
+            raise ValueError("Active F2F processors require an update function for the hydraulic solver support.")
+
+        self.fHydrDiam = fHydrDiam
+        self.fHydrLength = fHydrLength
+        self.bActive = bActive
+        self.hUpdate = hUpdate
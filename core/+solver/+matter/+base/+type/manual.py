@@ -0,0 +1,24 @@
+class Manual:
+    """
+    Manual: Solver support of F2F processors in branches with a flow rate
+    set by the user.
+
+    Registered by the F2F processors with supportSolver('manual', ...) and
+    used by the manual solver. Active processors (e.g. a fan or a heater)
+    change the pressure or temperature of the flow themselves, their update
+    function is called when the flow rate of the branch was set.
+    """
+
+    def __init__(self, bActive, hUpdate=None):
+        """
+        Args:
+            bActive (bool): True if the processor changes the pressure or
+                temperature of the flow.
+            hUpdate (function): Function without arguments which updates the
+                processor, required for active processors.
+        """
+        if bActive and hUpdate is None:
+            raise ValueError("Active F2F processors require an update function for the manual solver support.")
+
+        self.bActive = bActive
+        self.hUpdate = hUpdate
@@ -0,0 +1,67 @@
+from base import Base
+
+
+class BaseBranch(Base):
+    """
+    BaseBranch: Base class of the solvers for single matter branches.
+
+    Registers the solver as the handler of its branch and executes the
+    update of the solver in the 'solver' level of the matter post ticks
+    whenever the branch is outdated. Derived solvers calculate the new flow
+    rate in their update and pass it to update of this class, which sets it
+    on the branch.
+    """
+
+    sObjectType = 'solver'
+
+    # Post tick level in which the solver is updated. Solvers that are
+    # updated together with others (e.g. the residual solver) do not
+    # register their own post tick.
+    sPostTickLevel = 'solver'
+
+    def __init__(self, oBranch):
+        """
+        Args:
+            oBranch: Matter branch whose flow rate is calculated.
+        """
+        super().__init__()
+
+        if oBranch.oHandler is not None:
+            raise ValueError(f"Branch '{oBranch.sName}' already has a solver.")
+
+        self.oBranch = oBranch
+        self.oTimer = oBranch.oTimer
+        self.oMT = oBranch.oMT
+
+        self.fFlowRate = oBranch.fFlowRate
+        self.fLastUpdate = -1
+
+        if self.sPostTickLevel is not None:
+            self.hBindPostTickUpdate = self.oTimer.register_post_tick(self.update, 'matter', self.sPostTickLevel)
+
+        oBranch.oHandler = self
+        oBranch.bind('outdated', lambda _: self.register_update())
+
+        self.register_update()
+
+    def register_update(self):
+        """
+        Registers the solver to be executed in the post tick.
+        """
+        self.hBindPostTickUpdate()
+
+    def update(self, fFlowRate=None, afPressureDrops=None):
+        """
+        Sets the flow rate of the branch.
+
+        Args:
+            fFlowRate (float): New flow rate in kg/s, by default the current
+                flow rate of the solver.
+            afPressureDrops (list): Pressure drops of the F2F processors of
+                the branch in Pa.
+        """
+        if fFlowRate is not None:
+            self.fFlowRate = fFlowRate
+
+        self.fLastUpdate = self.oTimer.fTime
+        self.oBranch.setFlowRate(self.fFlowRate, afPressureDrops)
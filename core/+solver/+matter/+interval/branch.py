@@ -0,0 +1,211 @@
+import math
+
+from solver.matter.base.branch import BaseBranch
+
+
+class IntervalBranch(BaseBranch):
+    """
+    IntervalBranch: Solver for a single branch between two phases.
+
+    Calculates the flow rate at which the sum of the pressure drops of the
+    F2F processors of the branch equals the pressure difference between
+    the two phases, with a bracketing root finder (regula falsi with the
+    Illinois modification, bisection where a pressure drop is infinite).
+
+    The bracket around the flow rate of the last solve is stored and the
+    next solve starts from it, so in a quasi-steady state a few evaluations
+    of the pressure drops are sufficient. The pressure drops of all F2F
+    processors are only calculated once per tested flow rate. The number
+    of evaluations of each solve is logged and counted, see get_statistics.
+    """
+
+    # Relative error of the pressure balance and the flow rate at which the
+    # solution is converged
+    rMaxError = 1e-6
+
+    # Minimum flow rate in kg/s that is distinguished from zero
+    fMinFlowRate = 1e-12
+
+    # Half width of the first bracket in kg/s, if the flow rate of the
+    # branch is zero
+    fInitialBracketWidth = 1e-3
+
+    # The half width of the bracket of the next solve is this multiple of
+    # the change of the flow rate in the last solve
+    rBracketGrowth = 2
+
+    # Maximum number of evaluations per solve
+    iMaxEvaluations = 200
+
+    def __init__(self, oBranch):
+        """
+        Args:
+            oBranch: Matter branch whose flow rate is calculated.
+        """
+        # Pressure drop functions of the F2F processors of the branch
+        self.chCalculateDeltas = []
+        for oProc in oBranch.aoFlowProcs:
+            if 'callback' not in oProc.toSolve:
+                raise ValueError(
+                    f"F2F '{oProc.sName}' in branch '{oBranch.sName}' does not support the callback solver type "
+                    "required by the interval solver."
+                )
+            self.chCalculateDeltas.append(oProc.toSolve['callback'].calculateDeltas)
+
+        if not self.chCalculateDeltas:
+            raise ValueError(f"The interval solver requires at least one F2F in branch '{oBranch.sName}'.")
+
+        # Bracket of the flow rate for the next solve
+        fWidth = max(abs(oBranch.fFlowRate), self.fInitialBracketWidth)
+        self.afBracket = [oBranch.fFlowRate - fWidth, oBranch.fFlowRate + fWidth]
+
+        self.iSolves = 0
+        self.iEvaluations = 0
+        self.tLastSolve = {}
+
+        super().__init__(oBranch)
+
+    def update(self):
+        """
+        Calculates and sets the new flow rate of the branch.
+        """
+        fFlowRate, afPressureDrops = self.solve()
+        super().update(fFlowRate, afPressureDrops)
+
+    def solve(self):
+        """
+        Calculates the flow rate of the branch for the current pressures of
+        its phases.
+
+        Returns:
+            tuple: Flow rate in kg/s and the pressure drops of the F2F
+                processors at this flow rate in Pa.
+        """
+        fPressureDifference = (self.oBranch.coExmes[0].oPhase.fPressure
+                               - self.oBranch.coExmes[1].oPhase.fPressure)
+        fPressureTolerance = max(self.rMaxError * max(abs(self.oBranch.coExmes[0].oPhase.fPressure),
+                                                      abs(self.oBranch.coExmes[1].oPhase.fPressure)), 1e-9)
+
+        # Evaluated flow rates with the remaining pressure difference and
+        # the pressure drops of the processors
+        ttEvaluations = {}
+
+        def evaluate(fFlowRate):
+            tEvaluation = ttEvaluations.get(fFlowRate)
+            if tEvaluation is None:
+                if len(ttEvaluations) >= self.iMaxEvaluations:
+                    self.throw('solve', "The interval solver of branch '%s' did not converge within %i evaluations.",
+                               self.oBranch.sName, self.iMaxEvaluations)
+
+                afDrops = [calculateDeltas(fFlowRate) for calculateDeltas in self.chCalculateDeltas]
+                fDrop = math.fsum(afDrops) if all(math.isfinite(fDrop) for fDrop in afDrops) else math.inf
+
+                # The drops are positive in the direction of the flow
+                fResidual = fPressureDifference - (-fDrop if fFlowRate < 0 else fDrop)
+                tEvaluation = (fResidual, afDrops)
+                ttEvaluations[fFlowRate] = tEvaluation
+            return tEvaluation[0]
+
+        fLower, fUpper = self.afBracket
+        fResidualLower = evaluate(fLower)
+        fResidualUpper = evaluate(fUpper)
+
+        # The residual decreases with the flow rate, the bracket is moved
+        # and widened until it contains the root
+        iExpansions = 0
+        while fResidualLower < 0 or fResidualUpper > 0:
+            fWidth = fUpper - fLower
+            if fResidualLower < 0:
+                fLower, fUpper, fResidualUpper = fLower - 2 * fWidth, fLower, fResidualLower
+                fResidualLower = evaluate(fLower)
+            else:
+                fLower, fUpper, fResidualLower = fUpper, fUpper + 2 * fWidth, fResidualUpper
+                fResidualUpper = evaluate(fUpper)
+            iExpansions += 1
+
+        fFlowRate, fResidual = (fLower, fResidualLower) if abs(fResidualLower) <= abs(fResidualUpper) \
+            else (fUpper, fResidualUpper)
+        iSide = 0
+
+        while abs(fResidual) > fPressureTolerance:
+            if fUpper - fLower <= self.rMaxError * max(abs(fLower), abs(fUpper)) + self.fMinFlowRate:
+                break
+
+            bBlockedBothWays = math.isinf(fResidualLower) and math.isinf(fResidualUpper) and fLower < 0 < fUpper
+            if bBlockedBothWays:
+                # Discontinuity at zero, e.g. a closed valve or a check valve
+                # that blocks the flow direction
+                fTest = 0.0
+            elif math.isinf(fResidualLower) or math.isinf(fResidualUpper):
+                fTest = 0.5 * (fLower + fUpper)
+            else:
+                fTest = (fLower * fResidualUpper - fUpper * fResidualLower) / (fResidualUpper - fResidualLower)
+                if not fLower < fTest < fUpper:
+                    fTest = 0.5 * (fLower + fUpper)
+
+            fResidualTest = evaluate(fTest)
+            fFlowRate, fResidual = fTest, fResidualTest
+
+            # A finite residual at zero between two infinite ones means the
+            # branch is closed in both directions, zero is the only flow rate
+            # with a defined pressure balance
+            if bBlockedBothWays and math.isfinite(fResidualTest):
+                break
+
+            # Illinois modification: the residual of an end of the bracket
+            # that is kept twice in a row is halved
+            if fResidualTest > 0:
+                fLower, fResidualLower = fTest, fResidualTest
+                if iSide == 1 and math.isfinite(fResidualUpper):
+                    fResidualUpper *= 0.5
+                iSide = 1
+            elif fResidualTest < 0:
+                fUpper, fResidualUpper = fTest, fResidualTest
+                if iSide == -1 and math.isfinite(fResidualLower):
+                    fResidualLower *= 0.5
+                iSide = -1
+            else:
+                break
+
+            if math.isinf(fResidualLower) and math.isinf(fResidualUpper) and (fLower == 0 or fUpper == 0):
+                fFlowRate = 0.0
+                break
+
+        # An infinite residual means the branch is blocked, e.g. by a closed
+        # valve, so there is no flow
+        if math.isinf(ttEvaluations[fFlowRate][0]):
+            fFlowRate = 0.0
+            afPressureDrops = [0] * len(self.chCalculateDeltas)
+        else:
+            afPressureDrops = ttEvaluations[fFlowRate][1]
+
+        # The next solve starts from a bracket around this flow rate, wide
+        # enough to contain a change of the flow rate as large as this one
+        fHalfWidth = max(self.rBracketGrowth * abs(fFlowRate - self.fFlowRate),
+                         self.rMaxError * abs(fFlowRate), self.fMinFlowRate)
+        self.afBracket = [fFlowRate - fHalfWidth, fFlowRate + fHalfWidth]
+
+        iEvaluations = len(ttEvaluations)
+        self.iSolves += 1
+        self.iEvaluations += iEvaluations
+        self.tLastSolve = {'iEvaluations': iEvaluations, 'iExpansions': iExpansions}
+
+        self.out(1, 1, 'solve-statistics', 'Solved flow rate %.9g kg/s with %i evaluations (%i bracket expansions)',
+                 fFlowRate, iEvaluations, iExpansions)
+
+        return fFlowRate, afPressureDrops
+
+    def get_statistics(self):
+        """
+        Returns the statistics of all solves so far, e.g. to compare the
+        interval solver with the multi-branch solver.
+
+        Returns:
+            dict: Number of solves and evaluations of the pressure drops of
+                all F2F processors of the branch, in total and per solve.
+        """
+        return {
+            'iSolves': self.iSolves,
+            'iEvaluations': self.iEvaluations,
+            'fMeanEvaluations': self.iEvaluations / self.iSolves if self.iSolves else 0,
+        }
@@ -0,0 +1,190 @@
+import math
+from bisect import bisect_right
+
+from solver.matter.base.branch import BaseBranch
+
+
+class ManualBranch(BaseBranch):
+    """
+    ManualBranch: Solver for a single branch with a flow rate set by the user.
+
+    The flow rate is either set directly (set_flow_rate), as a volumetric
+    flow rate that is converted with the density of the inflowing phase
+    (set_volumetric_flow_rate), or scheduled over time. A schedule is given
+    as a precomputed time series (set_flow_rate_profile) or as a piecewise
+    function that returns the flow rate and the time of its next change
+    (set_flow_rate_function). The change points of a schedule are registered
+    with the timer, so the solver is only executed when the flow rate
+    actually changes instead of in every exec() of the parent system.
+    """
+
+    def __init__(self, oBranch):
+        """
+        Args:
+            oBranch: Matter branch whose flow rate is set.
+        """
+        self.fRequestedFlowRate = oBranch.fFlowRate
+        self.fRequestedVolumetricFlowRate = None
+
+        # Schedule of the flow rate, see set_flow_rate_function
+        self.hFlowRateFunction = None
+        self.fNextChange = math.inf
+        self.iChanges = 0
+
+        super().__init__(oBranch)
+
+        # The timer callback of the schedule is inactive until a change
+        # point is registered
+        self.hSetChangeTimeStep, _ = self.oTimer.bind(
+            lambda _: self.execute_change(),
+            0,
+            {
+                'sMethod': 'execute_change',
+                'sDescription': 'The .execute_change method of a manual branch solver',
+                'oSrcObj': self,
+            }
+        )
+        self.hSetChangeTimeStep(math.inf, True)
+
+    def update(self):
+        """
+        Sets the requested flow rate on the branch. A volumetric flow rate is
+        converted with the current density of the inflowing phase.
+        """
+        if self.fRequestedVolumetricFlowRate is not None:
+            oInPhase = self.oBranch.coExmes[0 if self.fRequestedVolumetricFlowRate >= 0 else 1].oPhase
+            self.fRequestedFlowRate = self.fRequestedVolumetricFlowRate * oInPhase.fDensity
+
+        super().update(self.fRequestedFlowRate)
+
+    def set_flow_rate(self, fFlowRate):
+        """
+        Sets a constant flow rate and removes the schedule.
+
+        Args:
+            fFlowRate (float): Flow rate in kg/s, positive from the left to
+                the right phase of the branch.
+        """
+        self._remove_schedule()
+        self._request_flow_rate(fFlowRate)
+
+    def set_volumetric_flow_rate(self, fVolumetricFlowRate):
+        """
+        Sets a constant volumetric flow rate and removes the schedule.
+
+        Args:
+            fVolumetricFlowRate (float): Volumetric flow rate in m^3/s,
+                positive from the left to the right phase of the branch.
+        """
+        self._remove_schedule()
+        self.fRequestedVolumetricFlowRate = fVolumetricFlowRate
+        self.register_update()
+
+    def set_flow_rate_profile(self, afTimes, afFlowRates):
+        """
+        Sets a precomputed time series of flow rates. Each flow rate is set at
+        its time and held until the next one, before the first time the
+        current flow rate is kept.
+
+        Args:
+            afTimes (list): Strictly increasing simulation times in s.
+            afFlowRates (list): Flow rates in kg/s, one for each time.
+        """
+        afTimes = [float(fTime) for fTime in afTimes]
+        afFlowRates = [float(fFlowRate) for fFlowRate in afFlowRates]
+
+        if not afTimes or len(afTimes) != len(afFlowRates):
+            raise ValueError("The flow rate profile requires the same, non-zero number of times and flow rates.")
+        if any(fNext <= fTime for fTime, fNext in zip(afTimes, afTimes[1:])):
+            raise ValueError("The times of the flow rate profile must be strictly increasing.")
+
+        def hProfile(fTime):
+            iIndex = bisect_right(afTimes, fTime)
+            fFlowRate = afFlowRates[iIndex - 1] if iIndex > 0 else None
+            fNextChange = afTimes[iIndex] if iIndex < len(afTimes) else None
+            return fFlowRate, fNextChange
+
+        self.set_flow_rate_function(hProfile)
+
+    def set_flow_rate_function(self, hFlowRateFunction):
+        """
+        Sets a piecewise constant flow rate. The function is evaluated now and
+        at every change point it returns, so it is never called in between.
+
+        Args:
+            hFlowRateFunction (function): Function of the simulation time in
+                s, which returns the flow rate in kg/s from this time on (None
+                to keep the current flow rate) and the time of the next change
+                in s (None if the flow rate does not change anymore).
+        """
+        self._remove_schedule()
+        self.hFlowRateFunction = hFlowRateFunction
+        self._apply_flow_rate_function(self.oTimer.fTime)
+
+    def execute_change(self):
+        """
+        Timer callback at a change point of the schedule.
+        """
+        if self.hFlowRateFunction is None or math.isinf(self.fNextChange):
+            return
+
+        # The timer may reach the change point with a rounding error, the
+        # function is evaluated at the change point itself
+        self._apply_flow_rate_function(max(self.oTimer.fTime, self.fNextChange))
+
+    def _apply_flow_rate_function(self, fTime):
+        """
+        Sets the flow rate of the schedule at the given time and registers
+        its next change point with the timer.
+
+        Args:
+            fTime (float): Simulation time in s.
+        """
+        fFlowRate, fNextChange = self.hFlowRateFunction(fTime)
+
+        if fFlowRate is not None:
+            self._request_flow_rate(fFlowRate)
+
+        if fNextChange is None or math.isinf(fNextChange):
+            self.fNextChange = math.inf
+            self.hSetChangeTimeStep(math.inf, True)
+            return
+
+        if fNextChange <= fTime:
+            self.throw('set_flow_rate_function', "The next change of the flow rate of branch '%s' at %g s is not "
+                       "after the current time of %g s.", self.oBranch.sName, fNextChange, fTime)
+
+        self.fNextChange = fNextChange
+        self.hSetChangeTimeStep(fNextChange - self.oTimer.fTime, True)
+
+        self.out(1, 1, 'schedule', 'Next flow rate change of branch %s at %g s', self.oBranch.sName, fNextChange)
+
+    def _request_flow_rate(self, fFlowRate):
+        """
+        Sets the requested flow rate and executes the solver if it changed.
+
+        Args:
+            fFlowRate (float): Flow rate in kg/s.
+        """
+        if fFlowRate == self.fRequestedFlowRate and self.fRequestedVolumetricFlowRate is None:
+            return
+
+        self.fRequestedFlowRate = fFlowRate
+        self.fRequestedVolumetricFlowRate = None
+        self.iChanges += 1
+        self.register_update()
+
+    def _remove_schedule(self):
+        """
+        Removes the schedule and deactivates its timer callback.
+        """
+        if self.hFlowRateFunction is None:
+            return
+
+        self.hFlowRateFunction = None
+        self.fNextChange = math.inf
+        self.hSetChangeTimeStep(math.inf, True)
+
+    # Names used by the systems and components
+    setFlowRate = set_flow_rate
+    setVolumetricFlowRate = set_volumetric_flow_rate
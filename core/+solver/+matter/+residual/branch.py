@@ -0,0 +1,51 @@
+from solver.matter.base.branch import BaseBranch
+from solver.matter.residual.network import ResidualNetwork
+
+
+class ResidualBranch(BaseBranch):
+    """
+    ResidualBranch: Solver that balances the flows of a phase.
+
+    Sets the flow rate of the branch to the sum of all other flows into the
+    phase it balances, so the mass of that phase does not change. This is
+    the left phase of the branch, unless only the right phase is a flow
+    phase. All residual branches of a simulation are updated together by
+    one ResidualNetwork, in the 'residual_solver' level of the matter post
+    ticks.
+    """
+
+    # The residual branches are updated by their network
+    sPostTickLevel = None
+
+    def __init__(self, oBranch):
+        """
+        Args:
+            oBranch: Matter branch whose flow rate is calculated.
+        """
+        # Side of the branch with the balanced phase, 0 for left and 1 for
+        # right
+        bLeftFlow = getattr(oBranch.coExmes[0].oPhase, 'bFlow', False)
+        bRightFlow = getattr(oBranch.coExmes[1].oPhase, 'bFlow', False)
+        self.iBalancedSide = 1 if bRightFlow and not bLeftFlow else 0
+
+        self.oNetwork = ResidualNetwork.get_network(oBranch.oTimer)
+
+        super().__init__(oBranch)
+
+        self.oNetwork.add_solver(self)
+
+        oPhase = self.get_balanced_phase()
+        if getattr(oPhase, 'bFlow', False) and oPhase.oMultiBranchSolver is None:
+            oPhase.set_handler(self.oNetwork)
+
+    def get_balanced_phase(self):
+        """
+        Returns the phase whose flows are balanced by the branch.
+        """
+        return self.oBranch.coExmes[self.iBalancedSide].oPhase
+
+    def register_update(self):
+        """
+        Registers the update of the residual network in the post tick.
+        """
+        self.oNetwork.register_update()
@@ -0,0 +1,196 @@
+import weakref
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import connected_components
+
+
+class ResidualNetwork:
+    """
+    ResidualNetwork: Updates all residual branches of a simulation at once.
+
+    The flow rate of a residual branch is the sum of the flow rates through
+    all other ExMes of the phase it balances. When the network is sealed,
+    these contributions are gathered into a sparse matrix, so all residual
+    flow rates are calculated with one sparse matrix-vector product from
+    the flow rates of the contributing flows. Residual branches in series,
+    e.g. a chain of flow phases, depend on each other. This coupling is
+    resolved with a sparse LU factorization that is also calculated when
+    the network is sealed.
+
+    The network is sealed in its first update and again after a residual
+    branch was added or reconnect was called.
+    """
+
+    # Residual network of each timer, i.e. of each simulation
+    _toNetworks = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def get_network(cls, oTimer):
+        """
+        Returns the residual network of a simulation, it is created if it
+        does not exist yet.
+
+        Args:
+            oTimer: Timer of the simulation.
+        """
+        oNetwork = cls._toNetworks.get(oTimer)
+        if oNetwork is None:
+            oNetwork = cls(oTimer)
+            cls._toNetworks[oTimer] = oNetwork
+        return oNetwork
+
+    def __init__(self, oTimer):
+        """
+        Args:
+            oTimer: Timer of the simulation.
+        """
+        self.oTimer = oTimer
+        self.aoSolvers = []
+        self.bSealed = False
+
+        self.aoContributingFlows = []
+        self.chUnbindContributingBranches = []
+        self.mfContributions = None
+        self.oCouplingFactorization = None
+        self.afFlowRates = np.zeros(0)
+
+        self.hBindPostTickUpdate = oTimer.register_post_tick(self.update, 'matter', 'residual_solver')
+
+    def add_solver(self, oSolver):
+        """
+        Adds a residual branch solver to the network.
+        """
+        self.aoSolvers.append(oSolver)
+        self.reconnect()
+
+    def reconnect(self):
+        """
+        Gathers the contributing flows again in the next update, must be
+        called if ExMes of the balanced phases were reconnected.
+        """
+        self.bSealed = False
+        self.register_update()
+
+    def register_update(self):
+        """
+        Registers the update of all residual branches in the post tick.
+        """
+        self.hBindPostTickUpdate()
+
+    def register_phase_update(self, _):
+        """
+        Registers an update after the mass update of a balanced flow phase.
+        """
+        self.register_update()
+
+    def seal(self):
+        """
+        Gathers the contributing flows of all residual branches into the
+        sparse contribution matrix and factorizes the coupling between the
+        residual branches.
+        """
+        tiSolverIndex = {id(oSolver.oBranch): iSolver for iSolver, oSolver in enumerate(self.aoSolvers)}
+        tiFlowIndex = {}
+        self.aoContributingFlows = []
+
+        # The callbacks of the previous seal are replaced by the ones below
+        for hUnbind in self.chUnbindContributingBranches:
+            hUnbind()
+        self.chUnbindContributingBranches = []
+
+        aiRows, aiColumns, afValues = [], [], []
+        aiCouplingRows, aiCouplingColumns, afCouplingValues = [], [], []
+
+        for iSolver, oSolver in enumerate(self.aoSolvers):
+            oOwnExMe = oSolver.oBranch.coExmes[oSolver.iBalancedSide]
+
+            # A positive flow rate of the branch flows out of its left phase
+            fSign = 1.0 if oSolver.iBalancedSide == 0 else -1.0
+
+            for oExMe in oSolver.get_balanced_phase().coProcsEXME:
+                if oExMe is oOwnExMe or oExMe.oFlow is None:
+                    continue
+
+                fValue = fSign * oExMe.iSign
+                iCoupledSolver = None if oExMe.bFlowIsAProcP2P else tiSolverIndex.get(id(oExMe.oFlow.oBranch))
+
+                if iCoupledSolver is not None:
+                    aiCouplingRows.append(iSolver)
+                    aiCouplingColumns.append(iCoupledSolver)
+                    afCouplingValues.append(fValue)
+                    continue
+
+                iFlow = tiFlowIndex.get(id(oExMe.oFlow))
+                if iFlow is None:
+                    iFlow = len(self.aoContributingFlows)
+                    tiFlowIndex[id(oExMe.oFlow)] = iFlow
+                    self.aoContributingFlows.append(oExMe.oFlow)
+
+                    if not oExMe.bFlowIsAProcP2P:
+                        self.chUnbindContributingBranches.append(
+                            oExMe.oFlow.oBranch.bind('setFlowRate', lambda _: self.register_update())
+                        )
+
+                aiRows.append(iSolver)
+                aiColumns.append(iFlow)
+                afValues.append(fValue)
+
+        iSolvers = len(self.aoSolvers)
+        self.mfContributions = sp.csr_matrix(
+            (afValues, (aiRows, aiColumns)), shape=(iSolvers, len(self.aoContributingFlows))
+        )
+
+        # Residual branches that contribute to the balance of another one
+        # are solved together: (I - C) * afFlowRates = afContributions
+        self.oCouplingFactorization = None
+        if aiCouplingRows:
+            mfCoupling = sp.csc_matrix(
+                (afCouplingValues, (aiCouplingRows, aiCouplingColumns)), shape=(iSolvers, iSolvers)
+            )
+            self._check_for_loops(mfCoupling)
+            self.oCouplingFactorization = spla.splu(sp.identity(iSolvers, format='csc') - mfCoupling)
+
+        self.afFlowRates = np.array([oSolver.fFlowRate for oSolver in self.aoSolvers], dtype=float)
+        self.bSealed = True
+
+    def _check_for_loops(self, mfCoupling):
+        """
+        Checks that the residual branches do not depend on each other in a
+        loop, the flow rates of the branches in a loop are not defined. A
+        loop is a strongly connected component of the coupling graph with
+        more than one branch, or a branch that balances its own flow.
+
+        Args:
+            mfCoupling: Coupling matrix of the residual branches.
+        """
+        _, aiLabels = connected_components(mfCoupling, directed=True, connection='strong')
+        aiComponentSize = np.bincount(aiLabels)
+        abInLoop = (aiComponentSize[aiLabels] > 1) | (mfCoupling.diagonal() != 0)
+
+        if abInLoop.any():
+            csBranches = [self.aoSolvers[iSolver].oBranch.sName for iSolver in np.flatnonzero(abInLoop)]
+            raise ValueError("The residual branches %s form a loop, their flow rates are not defined."
+                             % ', '.join(csBranches))
+
+    def update(self):
+        """
+        Calculates the flow rates of all residual branches and sets the ones
+        that changed.
+        """
+        if not self.bSealed:
+            self.seal()
+
+        afContributingFlowRates = np.fromiter(
+            (oFlow.fFlowRate for oFlow in self.aoContributingFlows), dtype=float, count=len(self.aoContributingFlows)
+        )
+        afFlowRates = self.mfContributions @ afContributingFlowRates
+
+        if self.oCouplingFactorization is not None:
+            afFlowRates = self.oCouplingFactorization.solve(afFlowRates)
+
+        for iSolver in np.flatnonzero(afFlowRates != self.afFlowRates):
+            self.aoSolvers[iSolver].update(float(afFlowRates[iSolver]))
+
+        self.afFlowRates = afFlowRates
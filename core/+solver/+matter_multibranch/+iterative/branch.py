@@ -0,0 +1,301 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from base import Base
+from solver.matter_multibranch.iterative.component import NetworkComponent
+
+
+class IterativeBranch(Base):
+    """
+    IterativeBranch: Multi-branch solver for networks of matter branches.
+
+    Calculates the flow rates of all branches of the network and the
+    pressures of the flow phases between them at the same time. The
+    unknowns are the flow rates of the branches and the pressures of the
+    flow phases, the pressures of all other phases are fixed during a solve.
+    For each branch, the pressure difference between its phases must equal
+    the sum of the pressure drops of its F2F processors, and for each flow
+    phase the sum of all flow rates into the phase must be zero.
+
+    The system is solved with a Newton iteration on scipy.sparse matrices.
+    The factorized Jacobian is reused across iterations and ticks (chord
+    method) and is only calculated and factorized again if the iteration
+    does not contract fast enough, the operating point has moved too far
+    from the one it was calculated for, or a branch was opened or closed.
+    Steps with a fresh Jacobian are damped by backtracking, so a start far
+    from the solution (e.g. with all flow rates at zero) does not overshoot.
+    The statistics of the solves (iterations, factorization reuse and wall
+    time) are available from get_statistics.
+
+    Branches that are only coupled through phases with a fixed pressure are
+    hydraulically independent. The network is therefore partitioned into
+    connected components (see NetworkComponent), which are solved
+    separately. Only the components with an outdated branch or flow phase
+    are solved again, optionally on a thread pool.
+    """
+
+    sObjectType = 'solver'
+
+    # Relative error of the pressure and mass balances at which the solution
+    # is converged
+    rMaxError = 1e-6
+
+    # Maximum number of iterations per solve
+    iMaxIterations = 100
+
+    # A reused Jacobian is discarded if an iteration does not reduce the
+    # residual to at least this fraction of the previous residual
+    rMinContraction = 0.5
+
+    # Relative change of the flow rates since the last factorization above
+    # which the Jacobian is calculated again before the next solve
+    rMaxOperatingPointChange = 0.1
+
+    # A Newton step with a fresh Jacobian is halved until it reduces the
+    # residual by at least this fraction of the step length (backtracking),
+    # at most iMaxStepHalvings times
+    rSufficientDecrease = 1e-4
+    iMaxStepHalvings = 40
+
+    # Relative and minimum flow rate perturbation in kg/s for the finite
+    # difference derivatives of the pressure drops
+    rFiniteDifference = 1e-6
+    fMinFiniteDifference = 1e-8
+
+    def __init__(self, aoBranches, sMode='complex', *, iWorkerThreads=0):
+        """
+        Args:
+            aoBranches (list): Matter branches of the network. Every branch
+                must connect two phases, branches that are not part of the
+                solver but connected to its flow phases are taken into
+                account as fixed in- or outflows.
+            sMode (str): 'simple' or 'complex', the solution mode of the
+                MATLAB solver. The Newton iteration always solves the
+                complete system, so both modes give the same result.
+            iWorkerThreads (int): Keyword only. Number of threads on which
+                independent components of the network are solved. By
+                default the components are solved one after the other.
+        """
+        super().__init__()
+
+        if sMode not in ('simple', 'complex'):
+            raise ValueError(f"Unknown mode '{sMode}' of the multi-branch solver, use 'simple' or 'complex'.")
+        self.sMode = sMode
+
+        self.aoBranches = list(aoBranches)
+        self.iBranches = len(self.aoBranches)
+
+        if self.iBranches == 0:
+            raise ValueError("The multi-branch solver requires at least one branch.")
+
+        for oBranch in self.aoBranches:
+            if oBranch.coExmes[0] is None or oBranch.coExmes[1] is None:
+                raise ValueError(f"Branch '{oBranch.sName}' is not connected to a phase on both sides.")
+
+        oFirstBranch = self.aoBranches[0]
+        self.oTimer = oFirstBranch.oTimer
+        self.oMT = oFirstBranch.oMT
+        self.fLastUpdate = -1
+
+        self._initialize_components()
+
+        self.oThreadPool = None
+        if iWorkerThreads > 1 and self.iComponents > 1:
+            self.oThreadPool = ThreadPoolExecutor(max_workers=iWorkerThreads)
+
+        # Solver statistics
+        self.iSolves = 0
+        self.iComponentSolves = 0
+        self.iIterations = 0
+        self.iFactorizations = 0
+        self.iLinearSolves = 0
+        self.iCallbackEvaluations = 0
+        self.fWallTime = 0
+        self.tLastSolve = {}
+
+        self.hBindPostTickUpdate = self.oTimer.register_post_tick(self.update, 'matter', 'multibranch_solver')
+
+        # Outdated branches only outdate their own component
+        for oBranch, iComponent in zip(self.aoBranches, self.aiBranchComponent):
+            oBranch.oHandler = self
+            oBranch.bind('outdated', lambda _, iComponent=int(iComponent): self.register_update(iComponent))
+
+        for oComponent in self.aoComponents:
+            for oPhase in oComponent.aoVariablePhases:
+                oPhase.set_handler(self)
+
+        self.register_update()
+
+    def _initialize_components(self):
+        """
+        Partitions the network into its connected components. Branches are
+        connected if they share a flow phase, phases with a fixed pressure
+        decouple the branches connected to them.
+        """
+        tiFlowPhaseIndex = {}
+        aiRows = []
+        aiColumns = []
+        for iBranch, oBranch in enumerate(self.aoBranches):
+            for oExMe in oBranch.coExmes:
+                oPhase = oExMe.oPhase
+                if not getattr(oPhase, 'bFlow', False):
+                    continue
+                iPhase = tiFlowPhaseIndex.setdefault(id(oPhase), len(tiFlowPhaseIndex))
+                aiRows.append(iBranch)
+                aiColumns.append(self.iBranches + iPhase)
+
+        # Graph of the branches and flow phases, the first iBranches nodes
+        # are the branches
+        iNodes = self.iBranches + len(tiFlowPhaseIndex)
+        mbGraph = sp.csr_matrix((np.ones(len(aiRows)), (aiRows, aiColumns)), shape=(iNodes, iNodes))
+        _, aiLabels = connected_components(mbGraph, directed=False)
+
+        # Number the components in the order of their first branch
+        _, aiFirstBranch, aiBranchComponent = np.unique(
+            aiLabels[:self.iBranches], return_index=True, return_inverse=True
+        )
+        aiOrder = np.argsort(np.argsort(aiFirstBranch))
+        self.aiBranchComponent = aiOrder[aiBranchComponent]
+        self.iComponents = len(aiFirstBranch)
+
+        self.aoComponents = [
+            NetworkComponent(self, [self.aoBranches[iBranch]
+                                    for iBranch in np.flatnonzero(self.aiBranchComponent == iComponent)])
+            for iComponent in range(self.iComponents)
+        ]
+
+        # Component of each flow phase with flows from outside the solver,
+        # the other flow phases only change through the solver itself
+        self.tiExternalPhaseComponent = {}
+        for iComponent, oComponent in enumerate(self.aoComponents):
+            for oPhase, coExMes in zip(oComponent.aoVariablePhases, oComponent.coExternalExMes):
+                if coExMes:
+                    self.tiExternalPhaseComponent[id(oPhase)] = iComponent
+
+        # All components have to be solved initially
+        self.abOutdatedComponents = np.ones(self.iComponents, dtype=bool)
+
+    def register_update(self, iComponent=None):
+        """
+        Registers the solver to be executed in the post tick.
+
+        Args:
+            iComponent (int): Index of the component that has to be solved
+                again. By default all components are solved again.
+        """
+        if iComponent is None:
+            self.abOutdatedComponents[:] = True
+        else:
+            self.abOutdatedComponents[iComponent] = True
+
+        self.hBindPostTickUpdate()
+
+    def register_phase_update(self, oPhase):
+        """
+        Registers the component of a flow phase to be solved again if the
+        phase has flows from outside the solver, which may have changed.
+
+        Args:
+            oPhase: Flow phase handled by this solver.
+        """
+        iComponent = self.tiExternalPhaseComponent.get(id(oPhase))
+        if iComponent is not None:
+            self.register_update(iComponent)
+
+    def invalidate_jacobian(self):
+        """
+        Discards the factorized Jacobians, e.g. after a component changed its
+        characteristic significantly. They are calculated again in the next
+        solve.
+        """
+        for oComponent in self.aoComponents:
+            oComponent.invalidate_jacobian()
+
+    def update(self):
+        """
+        Solves the outdated components of the network and sets the new flow
+        rates of their branches and pressures of their flow phases.
+        """
+        aiComponents = self.solve()
+
+        for iComponent in aiComponents:
+            self.aoComponents[iComponent].apply_solution()
+
+        self.fLastUpdate = self.oTimer.fTime
+
+    def solve(self):
+        """
+        Calculates the flow rates of the branches and the pressures of the
+        flow phases of all outdated components for the current pressures of
+        the fixed phases and the current external flows into the flow
+        phases. The results are stored in the components.
+
+        Returns:
+            numpy.ndarray: Indices of the solved components.
+        """
+        fStart = time.perf_counter()
+
+        aiComponents = np.flatnonzero(self.abOutdatedComponents)
+        self.abOutdatedComponents[:] = False
+
+        aoComponents = [self.aoComponents[iComponent] for iComponent in aiComponents]
+        if self.oThreadPool is not None and len(aoComponents) > 1:
+            ctStatistics = list(self.oThreadPool.map(NetworkComponent.solve, aoComponents))
+        else:
+            ctStatistics = [oComponent.solve() for oComponent in aoComponents]
+
+        fWallTime = time.perf_counter() - fStart
+
+        tLastSolve = {
+            sKey: sum(tStatistics[sKey] for tStatistics in ctStatistics)
+            for sKey in ('iIterations', 'iFactorizations', 'iLinearSolves', 'iCallbackEvaluations')
+        }
+        tLastSolve['iComponents'] = len(aiComponents)
+        tLastSolve['fWallTime'] = fWallTime
+        self.tLastSolve = tLastSolve
+
+        self.iSolves += 1
+        self.iComponentSolves += len(aiComponents)
+        self.iIterations += tLastSolve['iIterations']
+        self.iFactorizations += tLastSolve['iFactorizations']
+        self.iLinearSolves += tLastSolve['iLinearSolves']
+        self.iCallbackEvaluations += tLastSolve['iCallbackEvaluations']
+        self.fWallTime += fWallTime
+
+        self.out(1, 1, 'solve-statistics',
+                 'Solved %i of %i components in %i iterations with %i factorizations and %i callback evaluations '
+                 'in %.3f ms', len(aiComponents), self.iComponents, tLastSolve['iIterations'],
+                 tLastSolve['iFactorizations'], tLastSolve['iCallbackEvaluations'], fWallTime * 1000)
+
+        return aiComponents
+
+    def get_statistics(self):
+        """
+        Returns the statistics of all solves so far, e.g. to size networks
+        with many branches.
+
+        Returns:
+            dict: Number of solves, solved components, iterations,
+                factorizations, linear solves and callback evaluations (each
+                evaluating the pressure drops of all F2F processors of a
+                component), the factorization reuse rate (the fraction of
+                linear solves that reused an earlier factorization), and the
+                total and mean wall time in s.
+        """
+        return {
+            'iSolves': self.iSolves,
+            'iComponents': self.iComponents,
+            'iComponentSolves': self.iComponentSolves,
+            'iIterations': self.iIterations,
+            'fMeanIterations': self.iIterations / self.iSolves if self.iSolves else 0,
+            'iFactorizations': self.iFactorizations,
+            'iLinearSolves': self.iLinearSolves,
+            'rFactorizationReuse': 1 - self.iFactorizations / self.iLinearSolves if self.iLinearSolves else 0,
+            'iCallbackEvaluations': self.iCallbackEvaluations,
+            'fWallTime': self.fWallTime,
+            'fMeanWallTime': self.fWallTime / self.iSolves if self.iSolves else 0,
+        }
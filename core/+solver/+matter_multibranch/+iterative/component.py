@@ -0,0 +1,353 @@
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+
+class NetworkComponent:
+    """
+    NetworkComponent: Hydraulically independent part of a multi-branch
+    network.
+
+    The branches of a component are only coupled through flow phases, to
+    branches of other components they are at most coupled through phases
+    with a fixed pressure (e.g. stores). Each component is therefore solved
+    on its own, with its own factorized Jacobian (see IterativeBranch for
+    the system of equations and the reuse of the Jacobian).
+    """
+
+    def __init__(self, oSolver, aoBranches):
+        """
+        Args:
+            oSolver: Multi-branch solver the component belongs to, its
+                parameters (e.g. rMaxError) are used for the solve.
+            aoBranches (list): Branches of the component.
+        """
+        self.oSolver = oSolver
+        self.aoBranches = list(aoBranches)
+        self.iBranches = len(self.aoBranches)
+
+        self._initialize_network()
+
+        # Pressure drop functions of the F2F processors of each branch
+        self.cchCalculateDeltas = []
+        for oBranch in self.aoBranches:
+            chCalculateDeltas = []
+            for oProc in oBranch.aoFlowProcs:
+                if 'callback' not in oProc.toSolve:
+                    raise ValueError(
+                        f"F2F '{oProc.sName}' in branch '{oBranch.sName}' does not support the callback solver "
+                        "type required by the multi-branch solver."
+                    )
+                chCalculateDeltas.append(oProc.toSolve['callback'].calculateDeltas)
+            self.cchCalculateDeltas.append(chCalculateDeltas)
+
+        # Factorized Jacobian and the state it was calculated for
+        self.oFactorization = None
+        self.afFlowRatesAtFactorization = None
+        self.abClosedAtFactorization = None
+
+        self.afFlowRates = np.array([oBranch.fFlowRate for oBranch in self.aoBranches], dtype=float)
+        self.afPressures = np.zeros(self.iVariablePhases)
+        self.afPressureDrops = [np.zeros(len(chCalculateDeltas)) for chCalculateDeltas in self.cchCalculateDeltas]
+
+    def _initialize_network(self):
+        """
+        Collects the phases of the component and creates the incidence
+        matrix between the branches and the flow phases, whose pressures
+        are solved for.
+        """
+        self.aoPhases = []
+        tiPhaseIndex = {}
+        self.aiLeftPhase = np.zeros(self.iBranches, dtype=int)
+        self.aiRightPhase = np.zeros(self.iBranches, dtype=int)
+
+        for iBranch, oBranch in enumerate(self.aoBranches):
+            for iSide, aiPhase in enumerate((self.aiLeftPhase, self.aiRightPhase)):
+                oPhase = oBranch.coExmes[iSide].oPhase
+                if id(oPhase) not in tiPhaseIndex:
+                    tiPhaseIndex[id(oPhase)] = len(self.aoPhases)
+                    self.aoPhases.append(oPhase)
+                aiPhase[iBranch] = tiPhaseIndex[id(oPhase)]
+
+        self.abVariablePhase = np.array([bool(getattr(oPhase, 'bFlow', False)) for oPhase in self.aoPhases])
+        self.aoVariablePhases = [oPhase for oPhase, bVariable in zip(self.aoPhases, self.abVariablePhase) if bVariable]
+        self.iVariablePhases = len(self.aoVariablePhases)
+
+        # Index of each phase in the vector of unknown pressures, -1 for
+        # phases with a fixed pressure
+        self.aiPressureIndex = np.full(len(self.aoPhases), -1, dtype=int)
+        self.aiPressureIndex[self.abVariablePhase] = np.arange(self.iVariablePhases)
+
+        # Incidence matrix of the flow phases and branches, a positive flow
+        # rate flows out of the left and into the right phase
+        aiRows = []
+        aiColumns = []
+        afValues = []
+        for aiPhase, fSign in ((self.aiLeftPhase, -1.0), (self.aiRightPhase, 1.0)):
+            aiPressureIndex = self.aiPressureIndex[aiPhase]
+            abVariable = aiPressureIndex >= 0
+            aiRows.extend(aiPressureIndex[abVariable])
+            aiColumns.extend(np.flatnonzero(abVariable))
+            afValues.extend([fSign] * int(abVariable.sum()))
+
+        self.mfIncidence = sp.csr_matrix(
+            (afValues, (aiRows, aiColumns)), shape=(self.iVariablePhases, self.iBranches)
+        )
+
+        # ExMes of the flow phases whose flow rates are not calculated by
+        # the solver (other branches and P2Ps)
+        setBranches = set(id(oBranch) for oBranch in self.oSolver.aoBranches)
+        self.coExternalExMes = []
+        for oPhase in self.aoVariablePhases:
+            self.coExternalExMes.append([
+                oExMe for oExMe in oPhase.coProcsEXME
+                if oExMe.oFlow is not None and (oExMe.bFlowIsAProcP2P or id(oExMe.oFlow.oBranch) not in setBranches)
+            ])
+
+    def invalidate_jacobian(self):
+        """
+        Discards the factorized Jacobian of the component.
+        """
+        self.oFactorization = None
+
+    def solve(self):
+        """
+        Calculates the flow rates of the branches and the pressures of the
+        flow phases of the component for the current pressures of the fixed
+        phases and the current external flows into the flow phases. The
+        results are stored in afFlowRates, afPressures and afPressureDrops.
+
+        Returns:
+            dict: Statistics of the solve, the number of iterations,
+                factorizations, linear solves and callback evaluations.
+        """
+        oSolver = self.oSolver
+
+        afFixedPressures = np.array([
+            0.0 if bVariable else oPhase.fPressure for oPhase, bVariable in zip(self.aoPhases, self.abVariablePhase)
+        ])
+        afExternalFlows = np.array([
+            sum(oExMe.getFlowData()[0] for oExMe in coExMes) for coExMes in self.coExternalExMes
+        ])
+
+        afInitialPressures = np.array([self._get_initial_pressure(oPhase, afFixedPressures)
+                                       for oPhase in self.aoVariablePhases], dtype=float)
+        afState = np.concatenate((self.afFlowRates, afInitialPressures))
+
+        # Tolerances of the pressure and mass balances
+        fPressureTolerance = max(oSolver.rMaxError * float(np.max(np.abs(afFixedPressures), initial=0)), 1e-9)
+        fFlowTolerance = oSolver.rMaxError * max(
+            float(np.max(np.abs(self.afFlowRates), initial=0)),
+            float(np.max(np.abs(afExternalFlows), initial=0)),
+            oSolver.fMinFiniteDifference,
+        )
+        afTolerance = np.concatenate((
+            np.full(self.iBranches, fPressureTolerance), np.full(self.iVariablePhases, fFlowTolerance)
+        ))
+
+        iIterations = 0
+        iFactorizations = 0
+        iLinearSolves = 0
+        iCallbackEvaluations = 0
+
+        afResidual, afDrops, abClosed = self._calculate_residual(afState, afFixedPressures, afExternalFlows)
+        iCallbackEvaluations += 1
+        fResidual = np.max(np.abs(afResidual) / afTolerance, initial=0)
+
+        if not np.isfinite(fResidual):
+            oSolver.throw('solve', 'The residual of the multi-branch network is not finite at the start of the '
+                          'solve. Check the pressures of the phases and the pressure drops of the branches.')
+
+        while fResidual > 1:
+            if iIterations >= oSolver.iMaxIterations:
+                oSolver.throw(
+                    'solve', 'The multi-branch solver did not converge within %i iterations (residual %g).',
+                    oSolver.iMaxIterations, fResidual
+                )
+
+            bFreshJacobian = False
+            if self._is_jacobian_outdated(afState[:self.iBranches], abClosed):
+                iCallbackEvaluations += self._factorize_jacobian(afState, afDrops, abClosed)
+                iFactorizations += 1
+                bFreshJacobian = True
+
+            afStep = self.oFactorization.solve(-afResidual)
+            iLinearSolves += 1
+            iIterations += 1
+
+            # Backtracking: the step is halved until the residual decreases
+            # sufficiently, non-finite residuals count as an increase
+            rStep = 1.0
+            for _ in range(oSolver.iMaxStepHalvings + 1):
+                afNewState = afState + rStep * afStep
+                afNewResidual, afNewDrops, abNewClosed = self._calculate_residual(
+                    afNewState, afFixedPressures, afExternalFlows
+                )
+                iCallbackEvaluations += 1
+                fNewResidual = np.max(np.abs(afNewResidual) / afTolerance, initial=0)
+
+                if fNewResidual <= (1 - oSolver.rSufficientDecrease * rStep) * fResidual:
+                    break
+
+                # A reused Jacobian is not damped, it is discarded if it
+                # does not contract anymore and the step is repeated with a
+                # new one
+                if not bFreshJacobian:
+                    break
+
+                rStep *= 0.5
+            else:
+                oSolver.throw(
+                    'solve', 'The multi-branch solver found no step that reduces the residual %g%s.', fResidual,
+                    '' if np.isfinite(fNewResidual) else ' (the residual of all steps was not finite)'
+                )
+
+            if not bFreshJacobian and not fNewResidual <= oSolver.rMinContraction * fResidual:
+                self.oFactorization = None
+                continue
+
+            afState, afResidual, afDrops, abClosed, fResidual = (
+                afNewState, afNewResidual, afNewDrops, abNewClosed, fNewResidual
+            )
+
+        self.afFlowRates = afState[:self.iBranches]
+        self.afPressures = afState[self.iBranches:]
+        self.afPressureDrops = afDrops
+
+        return {
+            'iIterations': iIterations,
+            'iFactorizations': iFactorizations,
+            'iLinearSolves': iLinearSolves,
+            'iCallbackEvaluations': iCallbackEvaluations,
+        }
+
+    def apply_solution(self):
+        """
+        Sets the flow rates of the branches and the pressures of the flow
+        phases calculated in the last solve.
+        """
+        for iPhase, oPhase in enumerate(self.aoVariablePhases):
+            oPhase.set_pressure(self.afPressures[iPhase])
+
+        for iBranch, oBranch in enumerate(self.aoBranches):
+            oBranch.setFlowRate(self.afFlowRates[iBranch], list(self.afPressureDrops[iBranch]))
+
+        # The partial masses of the flow phases are updated from upstream to
+        # downstream, so each phase uses the updated partial masses of the
+        # phases before it
+        for iPhase in np.argsort(-self.afPressures, kind='stable'):
+            self.aoVariablePhases[iPhase].update_partials()
+
+    def _get_initial_pressure(self, oPhase, afFixedPressures):
+        """
+        Returns the start value of the pressure of a flow phase, the last
+        solution or the mean pressure of the fixed phases.
+        """
+        fPressure = oPhase.fVirtualPressure
+        if fPressure is None or not np.isfinite(fPressure):
+            return float(np.mean(afFixedPressures[~self.abVariablePhase])) if not self.abVariablePhase.all() else 0.0
+        return fPressure
+
+    def _calculate_pressure_drops(self, afFlowRates):
+        """
+        Calculates the pressure drops of all F2F processors for the given
+        flow rates of the branches.
+
+        Returns:
+            tuple: Total pressure drop of each branch in the direction of
+                its positive flow rate, the pressure drops of the processors
+                of each branch and the branches that are closed (infinite
+                pressure drop, e.g. a closed valve).
+        """
+        afBranchDrops = np.zeros(self.iBranches)
+        afDrops = []
+        for iBranch, chCalculateDeltas in enumerate(self.cchCalculateDeltas):
+            fFlowRate = afFlowRates[iBranch]
+            afProcDrops = np.array([calculateDeltas(fFlowRate) for calculateDeltas in chCalculateDeltas], dtype=float)
+            afDrops.append(afProcDrops)
+
+            # The drops are positive in the direction of the flow
+            afBranchDrops[iBranch] = afProcDrops.sum() * (-1.0 if fFlowRate < 0 else 1.0)
+
+        abClosed = ~np.isfinite(afBranchDrops)
+        return afBranchDrops, afDrops, abClosed
+
+    def _calculate_residual(self, afState, afFixedPressures, afExternalFlows):
+        """
+        Calculates the residual of the pressure balance of each branch and
+        the mass balance of each flow phase. Closed branches must have a
+        flow rate of zero.
+        """
+        afFlowRates = afState[:self.iBranches]
+        afPressures = afFixedPressures.copy()
+        afPressures[self.abVariablePhase] = afState[self.iBranches:]
+
+        afBranchDrops, afDrops, abClosed = self._calculate_pressure_drops(afFlowRates)
+
+        afBranchResidual = afPressures[self.aiLeftPhase] - afPressures[self.aiRightPhase] - afBranchDrops
+        afBranchResidual[abClosed] = -afFlowRates[abClosed]
+
+        afPhaseResidual = self.mfIncidence @ afFlowRates + afExternalFlows
+
+        return np.concatenate((afBranchResidual, afPhaseResidual)), afDrops, abClosed
+
+    def _is_jacobian_outdated(self, afFlowRates, abClosed):
+        """
+        Checks if the Jacobian must be calculated again before the next
+        iteration.
+        """
+        if self.oFactorization is None:
+            return True
+
+        if not np.array_equal(abClosed, self.abClosedAtFactorization):
+            return True
+
+        afReference = self.afFlowRatesAtFactorization
+        fScale = max(float(np.max(np.abs(afReference), initial=0)), self.oSolver.fMinFiniteDifference)
+        return (float(np.max(np.abs(afFlowRates - afReference), initial=0))
+                > self.oSolver.rMaxOperatingPointChange * fScale)
+
+    def _factorize_jacobian(self, afState, afDrops, abClosed):
+        """
+        Calculates the Jacobian of the residual at the given state and
+        factorizes it. The derivatives of the pressure drops are calculated
+        with finite differences, all other entries are constant.
+
+        Returns:
+            int: Number of pressure drop evaluations for the derivatives.
+        """
+        afFlowRates = afState[:self.iBranches]
+        afBranchDrops = np.array([
+            afProcDrops.sum() * (-1.0 if fFlowRate < 0 else 1.0) for afProcDrops, fFlowRate in zip(afDrops, afFlowRates)
+        ])
+
+        afPerturbation = np.maximum(np.abs(afFlowRates) * self.oSolver.rFiniteDifference,
+                                    self.oSolver.fMinFiniteDifference)
+        afPerturbation[afFlowRates < 0] *= -1
+        afPerturbedDrops, _, _ = self._calculate_pressure_drops(afFlowRates + afPerturbation)
+
+        with np.errstate(invalid='ignore'):
+            afDerivatives = (afPerturbedDrops - afBranchDrops) / afPerturbation
+        afDerivatives[~np.isfinite(afDerivatives)] = 0
+
+        # Rows of closed branches only contain the flow rate of the branch
+        afDiagonal = np.where(abClosed, -1.0, -afDerivatives)
+        mfOpen = sp.diags((~abClosed).astype(float))
+
+        if self.iVariablePhases:
+            mfJacobian = sp.bmat([
+                [sp.diags(afDiagonal), -(mfOpen @ self.mfIncidence.T)],
+                [self.mfIncidence, None],
+            ], format='csc')
+        else:
+            mfJacobian = sp.diags(afDiagonal, format='csc')
+
+        try:
+            self.oFactorization = spla.splu(mfJacobian)
+        except RuntimeError:
+            self.oSolver.throw('factorize', 'The Jacobian of the multi-branch network is singular. Check for '
+                               'branches without pressure drop between phases with fixed pressures.')
+
+        self.afFlowRatesAtFactorization = afFlowRates.copy()
+        self.abClosedAtFactorization = abClosed.copy()
+        return 1
@@ -34,9 +34,6 @@ class Fluidic(Conductor):
         # Initialize properties
         self.fResistance = 0  # Thermal resistance in [K/W]
         self.fSpecificHeatCapacity = 0
-        self.fPressureLastHeatCapacityUpdate = None
-        self.fTemperatureLastHeatCapacityUpdate = None
-        self.arPartialMassLastHeatCapacityUpdate = None
         self.iFailedHeatCapacityUpdates = 0
 
     def update(self, *args):
@@ -66,39 +63,22 @@ class Fluidic(Conductor):
                 iFlowIndex = 1 if self.oMatterObject.fFlowRate > 0 else 2
                 oFlow = self.oMatterProcessor.aoFlows[iFlowIndex - 1]
 
-            # Update specific heat capacity if conditions changed
-            if (
-                self.fPressureLastHeatCapacityUpdate is None
-                or abs(self.fPressureLastHeatCapacityUpdate - oFlow.fPressure) > 100
-                or abs(self.fTemperatureLastHeatCapacityUpdate - oFlow.fTemperature) > 1
-                or max(
-                    abs(
-                        self.arPartialMassLastHeatCapacityUpdate - oFlow.arPartialMass
+            # Update specific heat capacity, the matter table only
+            # recalculates it if the flow state has left its tolerance band
+            try:
+                self.fSpecificHeatCapacity = self.oMT.get_memoized_property(oFlow, 'Heat Capacity')
+                self.iFailedHeatCapacityUpdates = 0
+            except Exception as e:
+                self.iFailedHeatCapacityUpdates += 1
+                if self.iFailedHeatCapacityUpdates > 2:
+                    branch_name = getattr(
+                        self.oMatterObject, "sCustomName", self.oMatterObject.sName
                     )
-                )
-                > 0.01
-            ):
-                try:
-                    self.fSpecificHeatCapacity = self.oMT.calculate_specific_heat_capacity(
-                        oFlow
-                    )
-                    self.iFailedHeatCapacityUpdates = 0
-                except Exception as e:
-                    self.iFailedHeatCapacityUpdates += 1
-                    if self.iFailedHeatCapacityUpdates > 2:
-                        branch_name = getattr(
-                            self.oMatterObject, "sCustomName", self.oMatterObject.sName
-                        )
-                        raise RuntimeError(
-                            f"Heat capacity update failed for branch: {branch_name}. "
-                            f"Flow Rate: {self.oMatterObject.fFlowRate} [kg/s], "
-                            f"Heat Capacity: {self.fSpecificHeatCapacity} [J/(kgK)]"
-                        ) from e
-
-                # Store the state for the next update
-                self.fPressureLastHeatCapacityUpdate = oFlow.fPressure
-                self.fTemperatureLastHeatCapacityUpdate = oFlow.fTemperature
-                self.arPartialMassLastHeatCapacityUpdate = oFlow.arPartialMass
+                    raise RuntimeError(
+                        f"Heat capacity update failed for branch: {branch_name}. "
+                        f"Flow Rate: {self.oMatterObject.fFlowRate} [kg/s], "
+                        f"Heat Capacity: {self.fSpecificHeatCapacity} [J/(kgK)]"
+                    ) from e
 
         # Calculate thermal resistance
         self.fResistance = 1 / abs(
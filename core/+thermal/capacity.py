@@ -58,11 +58,6 @@ class Capacity(Base, EventSource):
         self.fLastRegisteredTemperatureUpdated = -1
         self.fLastTotalHeatCapacityUpdate = 0
 
-        # Heat capacity update-related properties
-        self.fPressureLastHeatCapacityUpdate = None
-        self.fTemperatureLastHeatCapacityUpdate = None
-        self.arPartialMassLastHeatCapacityUpdate = None
-
         # Callback bindings
         self.bTriggerSetCalculateHeatsourcePreCallbackBound = False
         self.bTriggerSetUpdateTemperaturePostCallbackBound = False
@@ -89,15 +84,10 @@ class Capacity(Base, EventSource):
     def update_specific_heat_capacity(self):
         """
         Update the specific heat capacity based on the current phase properties.
+        The value is only recalculated by the matter table if the phase state
+        has left the tolerance band of its property cache.
         """
-        if (self.fPressureLastHeatCapacityUpdate is None or
-                abs(self.fPressureLastHeatCapacityUpdate - self.oPhase.fPressure) > 100 or
-                abs(self.fTemperatureLastHeatCapacityUpdate - self.fTemperature) > 1 or
-                max(abs(self.arPartialMassLastHeatCapacityUpdate - self.oPhase.arPartialMass)) > 0.01):
-            self.fSpecificHeatCapacity = self.oMT.calculate_specific_heat_capacity(self.oPhase)
-            self.fPressureLastHeatCapacityUpdate = self.oPhase.fPressure
-            self.fTemperatureLastHeatCapacityUpdate = self.fTemperature
-            self.arPartialMassLastHeatCapacityUpdate = self.oPhase.arPartialMass
+        self.fSpecificHeatCapacity = self.oMT.get_memoized_property(self.oPhase, 'Heat Capacity')
 
     def set_total_heat_capacity(self, fTotalHeatCapacity):
         """
@@ -78,4 +78,68 @@ class FileChecker:
             folder_path (str): Path to the folder to scan.
 
         Returns:
-            bool: Always True sin
+            bool: Always True since there is no saved status to compare to.
+        """
+        self.saved_info.setdefault("tFileStatus", {})[folder_path] = self._scan(folder_path)
+        return True
+
+    def _detect_changes(self, folder_path):
+        """
+        Compare the current status of a folder or file with the saved status
+        and store the current status if it changed.
+
+        Args:
+            folder_path (str): Path to the folder or file to check.
+
+        Returns:
+            bool: True if a file was added, removed or modified.
+        """
+        t_status = self._scan(folder_path)
+        t_file_status = self.saved_info.setdefault("tFileStatus", {})
+
+        b_changed = t_file_status.get(folder_path) != t_status
+        if b_changed:
+            t_file_status[folder_path] = t_status
+            self._save_info()
+
+        return b_changed
+
+    @staticmethod
+    def _scan(folder_path):
+        """
+        Collect the modification time and size of all files in a folder or
+        of a single file. Hidden files, temporary files and Python caches are
+        ignored.
+
+        Args:
+            folder_path (str): Path to the folder or file to scan.
+
+        Returns:
+            dict: Modification time and size for each relative file path.
+        """
+        def is_illegal(s_name):
+            return s_name.startswith('.') or '~' in s_name or s_name == '__pycache__'
+
+        if os.path.isfile(folder_path):
+            o_stat = os.stat(folder_path)
+            return {os.path.basename(folder_path): (o_stat.st_mtime_ns, o_stat.st_size)}
+
+        t_status = {}
+        for s_root, cs_folders, cs_files in os.walk(folder_path):
+            cs_folders[:] = sorted(s_folder for s_folder in cs_folders if not is_illegal(s_folder))
+            for s_file in cs_files:
+                if is_illegal(s_file):
+                    continue
+                s_file_path = os.path.join(s_root, s_file)
+                o_stat = os.stat(s_file_path)
+                t_status[os.path.relpath(s_file_path, folder_path)] = (o_stat.st_mtime_ns, o_stat.st_size)
+
+        return t_status
+
+    def _save_info(self):
+        """
+        Save the file status to the persistent file.
+        """
+        self.save_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.save_path, "wb") as f:
+            pickle.dump(self.saved_info, f)
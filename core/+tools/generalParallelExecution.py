@@ -2,13 +2,16 @@ import os
 import datetime
 import multiprocessing as mp
 from multiprocessing import Manager
+import pickle
 import time
 import threading
 
+from matter.table.table import Table
+
 
 def general_parallel_execution(
     sSimulationPath, cmInputs, csSimulationNames=None, iTicksBetweenUpdateWaitBar=1, 
-    sContinueFromFolder=None, fAdvanceTo=None
+    sContinueFromFolder=None, fAdvanceTo=None, oMT=None, csSubstances=None
 ):
     """
     Executes simulations in parallel with different parameters.
@@ -20,9 +23,18 @@ def general_parallel_execution(
         iTicksBetweenUpdateWaitBar (int, optional): Number of ticks between wait bar updates.
         sContinueFromFolder (str, optional): Folder to continue simulations from.
         fAdvanceTo (float, optional): Time to advance to when continuing simulations.
+        oMT (Table, optional): Matter table shared by all simulations. Its
+            numeric data is published once into shared memory and attached
+            by every worker without copying it.
+        csSubstances (list of str, optional): Substances used by the
+            simulations, only their data is placed in the shared memory.
+            By default all substances of the matter table are shared.
     """
     iSimulations = len(cmInputs)
 
+    # Publish the matter table once, the workers only receive the descriptor
+    tSharedMatterTable = oMT.publish_shared_memory(csSubstances) if oMT is not None else None
+
     if csSimulationNames is None:
         csSimulationNames = [str(i + 1) for i in range(iSimulations)]
 
@@ -51,6 +63,11 @@ def general_parallel_execution(
         try:
             sim_input = cmInputs[sim_idx]
             sim_name = csSimulationNames[sim_idx]
+
+            if tSharedMatterTable is not None:
+                sim_input = dict(sim_input)
+                sim_input["ParallelExecution"] = (Table.attach_shared_memory(tSharedMatterTable),)
+
             print(f"Starting Simulation: {sim_name}")
 
             if sContinueFromFolder:
@@ -102,6 +119,9 @@ def general_parallel_execution(
         # Wait for monitor thread to finish
         monitor_thread.join()
 
+    if oMT is not None:
+        oMT.release_shared_memory()
+
     print("All simulations completed.")
 
 # Supporting function for running simulations
@@ -0,0 +1,34 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+# Loader for the unit tests in this folder. The +package and @class folders
+# of the core are not importable by their path, so the tested files are
+# loaded by their file name and registered under their package name.
+sCorePath = str(Path(__file__).resolve().parents[1])
+if sCorePath not in sys.path:
+    sys.path.insert(0, sCorePath)
+
+
+def load_module(sName, sPath, tGlobals=None):
+    """
+    Loads a module from a file of the core folder under its package name.
+
+    Args:
+        sName (str): Name of the module, e.g. 'event.timer'.
+        sPath (str): Path of the file relative to the core folder.
+        tGlobals (dict): Optional names that are defined in the module
+            before it is executed, for files that use classes of other
+            packages without importing them (e.g. the base class of the
+            matter branch).
+    """
+    if sName in sys.modules:
+        return sys.modules[sName]
+
+    oSpec = importlib.util.spec_from_file_location(sName, Path(sCorePath) / sPath)
+    oModule = importlib.util.module_from_spec(oSpec)
+    if tGlobals:
+        vars(oModule).update(tGlobals)
+    sys.modules[sName] = oModule
+    oSpec.loader.exec_module(oModule)
+    return oModule
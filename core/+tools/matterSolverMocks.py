@@ -0,0 +1,94 @@
+from loadCoreModule import load_module
+
+# Mock branches, phases and F2F processors for the unit tests of the matter
+# solvers, so they run without a simulation. They only provide what the
+# solvers use from the matter objects.
+
+Callback = load_module('solver.matter.base.type.callback', '+solver/+matter/+base/+type/callback.py').Callback
+
+
+class MockPhase:
+    """
+    Phase with a fixed pressure, or a flow phase whose pressure is set by
+    the solver.
+    """
+
+    def __init__(self, fPressure=None, bFlow=False):
+        self.fPressure = fPressure
+        self.bFlow = bFlow
+        self.fVirtualPressure = None
+        self.oMultiBranchSolver = None
+        self.coProcsEXME = []
+
+    def set_pressure(self, fPressure):
+        self.fVirtualPressure = fPressure
+
+    def set_handler(self, oSolver):
+        self.oMultiBranchSolver = oSolver
+
+    def update_partials(self):
+        pass
+
+
+class MockFlow:
+    def __init__(self, oBranch):
+        self.oBranch = oBranch
+        self.fFlowRate = 0.0
+
+
+class MockExMe:
+    def __init__(self, oPhase, iSign, oFlow, bFlowIsAProcP2P=False):
+        self.oPhase = oPhase
+        self.iSign = iSign
+        self.oFlow = oFlow
+        self.bFlowIsAProcP2P = bFlowIsAProcP2P
+        oPhase.coProcsEXME.append(self)
+
+    def getFlowData(self):
+        return self.oFlow.fFlowRate * self.iSign, None, None, None
+
+
+class MockProc:
+    """
+    F2F processor with the given pressure drop function, which counts its
+    evaluations.
+    """
+
+    def __init__(self, calculateDeltas, sName='proc'):
+        self.sName = sName
+        self.hCalculateDeltas = calculateDeltas
+        self.iEvaluations = 0
+        self.toSolve = {'callback': Callback(self.calculateDeltas)}
+
+    def calculateDeltas(self, fFlowRate):
+        self.iEvaluations += 1
+        return self.hCalculateDeltas(fFlowRate)
+
+
+class MockBranch:
+    """
+    Branch from the left to the right phase, a positive flow rate flows out
+    of the left phase.
+    """
+
+    def __init__(self, oTimer, oLeft, oRight, aoFlowProcs=(), sName='branch'):
+        self.oTimer = oTimer
+        self.oMT = None
+        self.sName = sName
+        self.fFlowRate = 0.0
+        self.aoFlowProcs = list(aoFlowProcs)
+        self.oHandler = None
+        self.tcCallbacks = {}
+
+        self.oFlow = MockFlow(self)
+        self.coExmes = [MockExMe(oLeft, -1, self.oFlow), MockExMe(oRight, 1, self.oFlow)]
+
+    def bind(self, sName, hCallBack):
+        self.tcCallbacks.setdefault(sName, []).append(hCallBack)
+        return lambda: self.tcCallbacks[sName].remove(hCallBack)
+
+    def setFlowRate(self, fFlowRate, afPressureDrops=None):
+        self.fFlowRate = fFlowRate
+        self.oFlow.fFlowRate = fFlowRate
+        for hCallBack in list(self.tcCallbacks.get('setFlowRate', [])):
+            hCallBack(None)
@@ -0,0 +1,83 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from loadCoreModule import load_module
+
+# Unit tests of the sparse compound mass storage. Run them with
+# python -m unittest discover -s core/+tools -p "testCompoundMass.py"
+
+CompoundMass = load_module('matter.compoundMass', '+matter/compoundMass.py').CompoundMass
+resolve_compound_mass = load_module(
+    'matter.table.resolveCompoundMass', '+matter/@table/resolveCompoundMass.py'
+).resolve_compound_mass
+
+
+class TestCompoundMass(unittest.TestCase):
+    def setUp(self):
+        # Substances 0 to 2 are base substances, 3 and 4 are compounds
+        self.abCompound = np.array([False, False, False, True, True])
+        self.mrCompoundMass = np.zeros((5, 5))
+        self.mrCompoundMass[3] = [0.5, 0.25, 0.25, 0, 0]
+        self.mrCompoundMass[4] = [0, 0.1, 0.9, 0, 0]
+
+    def test_dense_round_trip(self):
+        oCompoundMass = CompoundMass.from_dense(self.mrCompoundMass)
+
+        self.assertEqual(sorted(oCompoundMass.tarComposition), [3, 4])
+        np.testing.assert_array_equal(oCompoundMass.to_dense(), self.mrCompoundMass)
+        self.assertIs(CompoundMass.from_dense(oCompoundMass), oCompoundMass)
+
+    def test_compositions_without_entries_are_not_stored(self):
+        oCompoundMass = CompoundMass.from_dense(self.mrCompoundMass)
+
+        oCompoundMass.set_composition(4, np.zeros(5))
+
+        self.assertNotIn(4, oCompoundMass)
+        np.testing.assert_array_equal(oCompoundMass.get_composition(4), np.zeros(5))
+
+    def test_set_component(self):
+        oCompoundMass = CompoundMass(5)
+
+        oCompoundMass.set_component(3, 1, 0)
+        self.assertNotIn(3, oCompoundMass)
+
+        oCompoundMass.set_component(3, 0, 0.5)
+        oCompoundMass.set_component(3, 1, 0.25)
+        oCompoundMass.set_component(3, 2, 0.25)
+        np.testing.assert_array_equal(oCompoundMass.to_dense()[3], self.mrCompoundMass[3])
+
+    def test_compositions_must_contain_all_substances(self):
+        with self.assertRaises(ValueError):
+            CompoundMass(5).set_composition(3, [0.5, 0.5])
+
+    def test_copy_is_independent(self):
+        oCompoundMass = CompoundMass.from_dense(self.mrCompoundMass)
+        oCopy = oCompoundMass.copy()
+
+        oCopy.set_component(3, 0, 1)
+
+        self.assertEqual(oCompoundMass.get_composition(3)[0], 0.5)
+
+    def test_sparse_and_dense_resolution_are_identical(self):
+        oMT = SimpleNamespace(abCompound=self.abCompound)
+        afMass = np.array([1, 0, 2, 4, 10])
+
+        afDense = resolve_compound_mass(oMT, afMass, self.mrCompoundMass)
+        afSparse = resolve_compound_mass(oMT, afMass, CompoundMass.from_dense(self.mrCompoundMass))
+
+        np.testing.assert_allclose(afSparse, [3, 2, 12, 0, 0])
+        np.testing.assert_allclose(afSparse, afDense)
+
+    def test_mass_without_compounds_is_not_changed(self):
+        oMT = SimpleNamespace(abCompound=self.abCompound)
+        afMass = np.array([1, 0, 2, 0, 0], dtype=float)
+
+        afResolved = resolve_compound_mass(oMT, afMass, CompoundMass.from_dense(self.mrCompoundMass))
+
+        np.testing.assert_array_equal(afResolved, afMass)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from loadCoreModule import load_module
+
+# Unit tests of the event dispatch of the event sources. Run them with
+# python -m unittest discover -s core/+tools -p "testEventSource.py"
+
+Source = load_module('event.source', '+event/source.py').Source
+
+
+class TestEventDispatch(unittest.TestCase):
+    def setUp(self):
+        self.oSource = Source()
+        self.csExecuted = []
+
+    def bind(self, sEvent, sName):
+        return self.oSource.bind(sEvent, lambda tEvent: self.csExecuted.append((sName, tEvent.sType, tEvent.tData)))
+
+    def test_parent_events_are_executed_after_the_event(self):
+        self.bind('schedule', 'schedule')
+        self.bind('schedule.exercise.bicycle', 'bicycle')
+        self.bind('schedule.exercise', 'exercise')
+        self.bind('schedule.sleep', 'sleep')
+
+        self.oSource.trigger('schedule.exercise.bicycle', 1)
+
+        self.assertEqual(self.csExecuted, [
+            ('bicycle', 'schedule.exercise.bicycle', 1),
+            ('exercise', 'schedule.exercise.bicycle', 1),
+            ('schedule', 'schedule.exercise.bicycle', 1),
+        ])
+
+    def test_callbacks_of_an_event_are_executed_in_the_order_of_binding(self):
+        for sName in ('first', 'second', 'third'):
+            self.bind('update', sName)
+
+        self.oSource.trigger('update')
+
+        self.assertEqual([tCall[0] for tCall in self.csExecuted], ['first', 'second', 'third'])
+
+    def test_dispatch_list_is_recompiled_after_binding(self):
+        self.bind('update', 'first')
+        self.oSource.trigger('update')
+
+        self.bind('update', 'second')
+        self.oSource.trigger('update')
+
+        self.assertEqual([tCall[0] for tCall in self.csExecuted], ['first', 'first', 'second'])
+
+    def test_unbinding_only_removes_its_callback(self):
+        hUnbindFirst = self.bind('update', 'first')
+        self.bind('update', 'second')
+        self.oSource.trigger('update')
+
+        hUnbindFirst()
+        hUnbindFirst()
+        self.oSource.trigger('update')
+
+        self.assertEqual([tCall[0] for tCall in self.csExecuted], ['first', 'second', 'second'])
+
+    def test_unbinding_the_last_callback_removes_the_event(self):
+        hUnbind = self.bind('update', 'first')
+
+        hUnbind()
+        self.oSource.trigger('update')
+
+        self.assertEqual(self.csExecuted, [])
+        self.assertFalse(self.oSource.bHasCallbacks)
+        self.assertEqual(self.oSource.tcEventCallbacks, {})
+
+    def test_nested_triggers_restore_the_payload(self):
+        self.oSource.bind('outer', lambda tEvent: self.oSource.trigger('inner', 'inner data'))
+        self.oSource.bind('outer', lambda tEvent: self.csExecuted.append((tEvent['sType'], tEvent['tData'])))
+
+        self.oSource.trigger('outer', 'outer data')
+
+        self.assertEqual(self.csExecuted, [('outer', 'outer data')])
+        self.assertIsNone(self.oSource.tDefaultEvent.sType)
+
+    def test_unbind_all_events(self):
+        self.bind('update', 'first')
+        self.bind('outdated', 'second')
+
+        self.oSource.unbindAllEvents()
+        self.oSource.trigger('update')
+        self.oSource.trigger('outdated')
+
+        self.assertEqual(self.csExecuted, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
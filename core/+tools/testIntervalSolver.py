@@ -0,0 +1,133 @@
+import math
+import unittest
+from types import SimpleNamespace
+
+from loadCoreModule import load_module
+from matterSolverMocks import MockBranch, MockPhase, MockProc
+
+# Unit tests of the bracketing root finder of the interval solver. Run them
+# with python -m unittest discover -s core/+tools -p "testIntervalSolver.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+load_module('solver.matter.base.branch', '+solver/+matter/+base/branch.py')
+IntervalBranch = load_module('solver.matter.interval.branch', '+solver/+matter/+interval/branch.py').IntervalBranch
+
+
+def create_pipe(fResistance, fLinear=0.0):
+    """
+    Returns a pipe. Like all processors of the solver, its pressure drop is
+    positive in the direction of the flow.
+    """
+    return MockProc(lambda fFlowRate: fResistance * fFlowRate ** 2 + fLinear * abs(fFlowRate), 'pipe')
+
+
+def create_fan(fMaxPressureRise, fMaxFlowRate):
+    """
+    Returns a fan with a pressure rise that decreases linearly from the
+    given maximum at zero flow to zero at the maximum flow rate. A reverse
+    flow is slowed down by the fan.
+    """
+    def calculateDeltas(fFlowRate):
+        fPressureRise = fMaxPressureRise * (1 - fFlowRate / fMaxFlowRate)
+        return fPressureRise if fFlowRate < 0 else -fPressureRise
+
+    return MockProc(calculateDeltas, 'fan')
+
+
+def create_valve(bOpen=True):
+    """
+    Returns a valve, a closed valve blocks any flow.
+    """
+    return MockProc(lambda fFlowRate: 0.0 if bOpen or fFlowRate == 0 else math.inf, 'valve')
+
+
+def create_check_valve(fResistance):
+    """
+    Returns a check valve, which only allows a positive flow rate.
+    """
+    return MockProc(lambda fFlowRate: math.inf if fFlowRate < 0 else fResistance * fFlowRate ** 2, 'checkvalve')
+
+
+class TestIntervalBranch(unittest.TestCase):
+    def create_solver(self, aoFlowProcs, fLeftPressure=2e5, fRightPressure=1e5):
+        self.oLeft = MockPhase(fLeftPressure)
+        self.oBranch = MockBranch(Timer(), self.oLeft, MockPhase(fRightPressure), aoFlowProcs)
+        return IntervalBranch(self.oBranch)
+
+    def test_flow_rate(self):
+        oSolver = self.create_solver([create_pipe(1e7, 1e3), create_valve()])
+        oSolver.update()
+
+        # 1e5 Pa = 1e7 * F^2 + 1e3 * F
+        fExpected = (-1e3 + math.sqrt(1e6 + 4 * 1e7 * 1e5)) / (2 * 1e7)
+        self.assertAlmostEqual(self.oBranch.fFlowRate, fExpected, delta=1e-6 * fExpected)
+
+    def test_fan_against_pressure_difference(self):
+        # Without a fan, the flow goes from the right to the left phase
+        oSolver = self.create_solver([create_fan(3e5, 1.0), create_pipe(1e6)], 1e5, 2e5)
+        oSolver.update()
+
+        # 3e5 * (1 - F) = 1e5 + 1e6 * F^2
+        fExpected = (-3e5 + math.sqrt(9e10 + 4 * 1e6 * 2e5)) / (2 * 1e6)
+        self.assertAlmostEqual(self.oBranch.fFlowRate, fExpected, delta=1e-6)
+
+    def test_illinois_converges_on_convex_drop(self):
+        # Without the Illinois modification, regula falsi keeps one end of
+        # the bracket and converges very slowly for strongly convex drops
+        oSolver = self.create_solver([MockProc(lambda fFlowRate: 1e12 * fFlowRate ** 4)])
+        oSolver.update()
+
+        self.assertAlmostEqual(self.oBranch.fFlowRate, (1e5 / 1e12) ** 0.25, delta=1e-6)
+        self.assertLessEqual(oSolver.tLastSolve['iEvaluations'], 40)
+
+    def test_cached_bracket(self):
+        oPipe = create_pipe(1e7, 1e3)
+        oSolver = self.create_solver([oPipe])
+        oSolver.update()
+
+        # The bracket of the next solve is sized by the last change of the
+        # flow rate, which is large after the start from zero
+        for _ in range(2):
+            self.oLeft.fPressure *= 0.999
+            oSolver.update()
+
+        self.assertEqual(oSolver.tLastSolve['iExpansions'], 0)
+        self.assertLessEqual(oSolver.tLastSolve['iEvaluations'], 6)
+
+        tStatistics = oSolver.get_statistics()
+        self.assertEqual(tStatistics['iSolves'], 3)
+        self.assertEqual(tStatistics['iEvaluations'], oPipe.iEvaluations)
+
+    def test_reverse_flow(self):
+        oSolver = self.create_solver([create_pipe(1e7)], 1e5, 2e5)
+        oSolver.update()
+
+        self.assertAlmostEqual(self.oBranch.fFlowRate, -math.sqrt(1e5 / 1e7), delta=1e-6)
+
+    def test_closed_valve(self):
+        oSolver = self.create_solver([create_pipe(1e7), create_valve(False)])
+        oSolver.update()
+
+        self.assertEqual(self.oBranch.fFlowRate, 0)
+        self.assertLessEqual(oSolver.tLastSolve['iEvaluations'], 3)
+
+    def test_check_valve(self):
+        oSolver = self.create_solver([create_check_valve(1e6)], 1e5, 2e5)
+        oSolver.update()
+        self.assertEqual(self.oBranch.fFlowRate, 0)
+
+        oSolver = self.create_solver([create_check_valve(1e6)])
+        oSolver.update()
+        self.assertAlmostEqual(self.oBranch.fFlowRate, math.sqrt(1e5 / 1e6), delta=1e-6)
+
+    def test_procs_without_callback_raise(self):
+        oProc = SimpleNamespace(sName='heater', toSolve={})
+
+        with self.assertRaises(ValueError):
+            self.create_solver([oProc])
+        with self.assertRaises(ValueError):
+            self.create_solver([])
+
+
+if __name__ == '__main__':
+    unittest.main()
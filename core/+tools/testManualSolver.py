@@ -0,0 +1,92 @@
+import math
+import unittest
+
+from loadCoreModule import load_module
+from matterSolverMocks import MockBranch, MockPhase
+
+# Unit tests of the flow rate schedules of the manual solver. Run them with
+# python -m unittest discover -s core/+tools -p "testManualSolver.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+load_module('solver.matter.base.branch', '+solver/+matter/+base/branch.py')
+ManualBranch = load_module('solver.matter.manual.branch', '+solver/+matter/+manual/branch.py').ManualBranch
+
+
+class TestManualBranch(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.oBranch = MockBranch(self.oTimer, MockPhase(1e5), MockPhase(1e5))
+        self.oSolver = ManualBranch(self.oBranch)
+
+        # Another system of the simulation, executed every 10 s
+        self.oTimer.bind(lambda _: None, 10)
+
+        # Flow rates set on the branch with the time they were set at
+        self.atFlowRates = []
+        self.oBranch.bind('setFlowRate', lambda _: self.atFlowRates.append(
+            (round(self.oTimer.fTime, 9), self.oBranch.fFlowRate)
+        ))
+
+    def run_until(self, fTime):
+        while self.oTimer.fTime < fTime:
+            self.oTimer.tick()
+
+    def test_profile(self):
+        self.oSolver.set_flow_rate_profile([0, 3.3, 7.1], [0.1, 0.2, 0.0])
+        self.run_until(20)
+
+        self.assertEqual(self.atFlowRates, [(0, 0.1), (3.3, 0.2), (7.1, 0.0)])
+        self.assertEqual(self.oSolver.iChanges, 3)
+
+        # The timer only stops at the changes and the other system
+        self.assertLessEqual(self.oTimer.iTick, 8)
+
+    def test_function(self):
+        def calculate_flow_rate(fTime):
+            iPeriod = math.floor(fTime / 5 + 1e-9)
+            return (0.01 if iPeriod % 2 == 0 else 0.0), (iPeriod + 1) * 5 if fTime < 20 else None
+
+        self.oSolver.set_flow_rate_function(calculate_flow_rate)
+        self.run_until(40)
+
+        self.assertEqual([fTime for fTime, _ in self.atFlowRates], [0, 5, 10, 15, 20])
+        self.assertTrue(math.isinf(self.oSolver.fNextChange))
+
+    def test_unchanged_flow_rates_are_not_set_again(self):
+        self.oSolver.set_flow_rate_profile([0, 5, 10], [0.1, 0.1, 0.2])
+        self.run_until(20)
+
+        self.assertEqual(self.atFlowRates, [(0, 0.1), (10, 0.2)])
+        self.assertEqual(self.oSolver.iChanges, 2)
+
+    def test_volumetric_flow_rate(self):
+        self.oBranch.coExmes[0].oPhase.fDensity = 1.2
+        self.oBranch.coExmes[1].oPhase.fDensity = 1000
+
+        self.oSolver.set_volumetric_flow_rate(0.5)
+        self.oTimer.tick()
+        self.assertAlmostEqual(self.oBranch.fFlowRate, 0.6)
+
+        # A negative flow has the density of the right phase
+        self.oSolver.set_volumetric_flow_rate(-0.001)
+        self.oTimer.tick()
+        self.assertAlmostEqual(self.oBranch.fFlowRate, -1)
+
+    def test_constant_flow_rate_removes_schedule(self):
+        self.oSolver.set_flow_rate_profile([0, 10], [0.1, 0.2])
+        self.run_until(1)
+        self.oSolver.set_flow_rate(0.3)
+        self.run_until(20)
+
+        self.assertEqual(self.atFlowRates[-1][1], 0.3)
+        self.assertIsNone(self.oSolver.hFlowRateFunction)
+
+    def test_invalid_profile(self):
+        with self.assertRaises(ValueError):
+            self.oSolver.set_flow_rate_profile([0, 1], [0.1])
+        with self.assertRaises(ValueError):
+            self.oSolver.set_flow_rate_profile([0, 2, 1], [0.1, 0.2, 0.3])
+
+
+if __name__ == '__main__':
+    unittest.main()
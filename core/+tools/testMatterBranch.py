@@ -0,0 +1,207 @@
+import unittest
+from types import SimpleNamespace
+
+from loadCoreModule import load_module
+
+# Unit tests of the matter branch. The branch is created without a
+# simulation container, only the objects it calls directly are mocked. Run
+# them with python -m unittest discover -s core/+tools -p "testMatterBranch.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+Source = load_module('event.source', '+event/source.py').Source
+Branch = load_module('base.branch', '+base/branch.py').Branch
+
+
+class BaseBranch(Branch, Source):
+    """
+    Base class of the matter branch, a branch that is also an event source.
+    """
+
+    __slots__ = ()
+
+
+MatterBranch = load_module('matter.branch', '+matter/branch.py', {'BaseBranch': BaseBranch}).MatterBranch
+
+load_module('matter.compoundMass', '+matter/compoundMass.py')
+MatterFlow = load_module('matter.flow', '+matter/flow.py').Flow
+load_module('matter.timeStepEvaluator', '+matter/timeStepEvaluator.py')
+load_module('matter.phase.calculateTimeStep', '+matter/@phase/calculateTimeStep.py')
+Phase = load_module('matter.phase.phase', '+matter/@phase/phase.py').Phase
+
+
+class MockPhase:
+    def __init__(self, fPressure):
+        self.fPressure = fPressure
+        self.iMassUpdateRequests = 0
+
+    def registerMassupdate(self):
+        self.iMassUpdateRequests += 1
+
+
+class MockExMe:
+    def __init__(self, fPressure):
+        self.oPhase = MockPhase(fPressure)
+
+
+class MockHandler:
+    def __init__(self):
+        self.fLastUpdate = -1
+
+
+def create_branch(oTimer):
+    """
+    Creates a sealed matter branch between two phases without F2F
+    processors.
+    """
+    oBranch = MatterBranch.__new__(MatterBranch)
+    Source.__init__(oBranch)
+
+    oBranch.oTimer = oTimer
+    oBranch.oHandler = MockHandler()
+    oBranch.abIf = [False, False]
+    oBranch.coExmes = [MockExMe(2e5), MockExMe(1e5)]
+    oBranch.bOutdated = False
+    oBranch.aoFlows = []
+    oBranch.aoFlowProcs = []
+    oBranch.iFlowProcs = 0
+    oBranch.fFlowRate = 0
+    oBranch.afFlowRates = [1.0] * oBranch.iFlowRateHistoryLength
+    oBranch.iFlowRateHistoryIndex = 0
+    oBranch.fFlowRateHistorySum = float(oBranch.iFlowRateHistoryLength)
+    oBranch.bTriggerSetFlowRateCallbackBound = False
+    oBranch.iLastOutdatedTick = None
+    oBranch.iSuppressedOutdatedTriggers = 0
+
+    oBranch.ctFlowData = []
+    oBranch.hSetFlowData = lambda aoFlows, oExMe, fFlowRate, afPressureDrops: oBranch.ctFlowData.append(fFlowRate)
+    return oBranch
+
+
+class TestFlowRateHistory(unittest.TestCase):
+    def setUp(self):
+        self.oBranch = create_branch(Timer())
+
+    def test_history_keeps_the_last_flow_rates(self):
+        for fFlowRate in range(1, 13):
+            self.oBranch.setFlowRate(float(fFlowRate))
+
+        self.assertEqual(self.oBranch.getFlowRateHistory(), [float(i) for i in range(3, 13)])
+        self.assertEqual(self.oBranch.fFlowRateHistorySum, sum(range(3, 13)))
+        self.assertEqual(self.oBranch.ctFlowData, [float(i) for i in range(1, 13)])
+
+    def test_flow_rate_is_only_zero_after_a_full_history_of_small_flow_rates(self):
+        self.oBranch.setFlowRateHistoryLength(3)
+
+        for _ in range(2):
+            self.oBranch.setFlowRate(1e-12)
+            self.assertEqual(self.oBranch.fFlowRate, 1e-12)
+
+        self.oBranch.setFlowRate(1e-12)
+        self.assertEqual(self.oBranch.fFlowRate, 0)
+
+        self.oBranch.setFlowRate(1)
+        self.assertEqual(self.oBranch.fFlowRate, 1)
+
+    def test_running_sum_matches_the_history(self):
+        self.oBranch.setFlowRateHistoryLength(7)
+
+        for i in range(100):
+            self.oBranch.setFlowRate(0.1 * (i % 13) - 0.3)
+            self.assertAlmostEqual(self.oBranch.fFlowRateHistorySum, sum(self.oBranch.getFlowRateHistory()), places=12)
+
+    def test_history_length_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.oBranch.setFlowRateHistoryLength(0)
+
+    def test_phases_register_their_mass_update(self):
+        self.oBranch.setFlowRate(0.5)
+
+        self.assertEqual([oExMe.oPhase.iMassUpdateRequests for oExMe in self.oBranch.coExmes], [1, 1])
+
+
+class TestOutdated(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.oTimer.tick()
+        self.oBranch = create_branch(self.oTimer)
+
+        self.iOutdatedEvents = 0
+
+        def hOutdated(_):
+            self.iOutdatedEvents += 1
+
+        self.oBranch.bind('outdated', hOutdated)
+
+    def test_outdated_event_is_triggered_once_per_tick(self):
+        for _ in range(3):
+            self.oBranch.setOutdated()
+
+        self.assertTrue(self.oBranch.bOutdated)
+        self.assertEqual(self.iOutdatedEvents, 1)
+        self.assertEqual(self.oBranch.iSuppressedOutdatedTriggers, 2)
+
+    def test_branch_is_outdated_again_after_a_new_flow_rate(self):
+        self.oBranch.setOutdated()
+        self.oBranch.setFlowRate(0.1)
+        self.oBranch.setOutdated()
+
+        self.assertEqual(self.iOutdatedEvents, 2)
+        self.assertEqual(self.oBranch.iSuppressedOutdatedTriggers, 0)
+
+    def test_branch_that_is_still_outdated_is_triggered_in_the_next_tick(self):
+        self.oBranch.setOutdated()
+        self.oTimer.tick()
+        self.oBranch.setOutdated()
+
+        self.assertEqual(self.iOutdatedEvents, 2)
+
+    def test_phases_outdate_their_branches_once(self):
+        oFlow = SimpleNamespace(oBranch=self.oBranch)
+        oP2PBranch = create_branch(self.oTimer)
+        coProcsEXME = [
+            SimpleNamespace(oFlow=oFlow, bFlowIsAProcP2P=False),
+            SimpleNamespace(oFlow=SimpleNamespace(oBranch=oP2PBranch), bFlowIsAProcP2P=True),
+            SimpleNamespace(oFlow=None, bFlowIsAProcP2P=False),
+        ]
+
+        # Mass updates of the phases on both sides of the branch
+        for _ in range(2):
+            Phase.set_branches_outdated(SimpleNamespace(coProcsEXME=coProcsEXME))
+
+        self.assertEqual(self.iOutdatedEvents, 1)
+        self.assertEqual(self.oBranch.iSuppressedOutdatedTriggers, 1)
+        self.assertFalse(oP2PBranch.bOutdated)
+
+
+class TestFlowData(unittest.TestCase):
+    def setUp(self):
+        self.aoFlows = [MatterFlow() for _ in range(3)]
+
+    def create_exme(self, fPressure):
+        oPhase = SimpleNamespace(fPressure=fPressure, fTemperature=300, arPartialMass=[1, 0], fMolarMass=0.018,
+                                 arCompoundMass=None)
+        return SimpleNamespace(oPhase=oPhase)
+
+    def test_pressure_decreases_in_the_direction_of_the_flow(self):
+        oExMe = self.create_exme(2e5)
+        MatterFlow.setData(self.aoFlows, oExMe, 0.1, [3e4, 2e4])
+
+        self.assertEqual([oFlow.fPressure for oFlow in self.aoFlows], [2e5, 1.7e5, 1.5e5])
+        for oFlow in self.aoFlows:
+            self.assertEqual(oFlow.fFlowRate, 0.1)
+            self.assertEqual(oFlow.fTemperature, 300)
+            self.assertIs(oFlow.arPartialMass, oExMe.oPhase.arPartialMass)
+
+    def test_reverse_flow_starts_at_the_right_phase(self):
+        MatterFlow.setData(self.aoFlows, self.create_exme(1e5), -0.1, [3e4, 2e4])
+
+        self.assertEqual([oFlow.fPressure for oFlow in self.aoFlows], [5e4, 8e4, 1e5])
+
+    def test_pressure_is_not_negative(self):
+        MatterFlow.setData(self.aoFlows, self.create_exme(1e5), 0.1, [8e4, 5e4])
+
+        self.assertEqual([oFlow.fPressure for oFlow in self.aoFlows], [1e5, 2e4, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
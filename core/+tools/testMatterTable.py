@@ -0,0 +1,191 @@
+import unittest
+
+import numpy as np
+
+from loadCoreModule import load_module
+
+# Unit tests of the matter table with the data of a few substances, which
+# is imported directly from the matter source data without compiling the
+# whole matter table. Run them from the repository root with
+# python -m unittest discover -s core/+tools -p "testMatterTable.py"
+
+load_module('matter.compoundMass', '+matter/compoundMass.py')
+for sFunctionFile in ('calculateDensity', 'calculateDynamicViscosity', 'calculatePartialPressures',
+                      'calculateSpecificHeatCapacity', 'calculateThermalConductivity', 'resolveCompoundMass'):
+    load_module(f'matter.table.{sFunctionFile}', f'+matter/@table/{sFunctionFile}.py')
+load_module('matter.table.determinePhase', '+matter/@table/determinePhase.py')
+load_module('matter.table.findClosestValidMatterEntry', '+matter/@table/findClosestValidMatterEntry.py')
+load_module('matter.table.findProperty', '+matter/@table/findProperty.py')
+load_module('matter.table.getMemoizedProperty', '+matter/@table/getMemoizedProperty.py')
+load_module('matter.table.private.calculateProperty', '+matter/@table/private/calculateProperty.py')
+load_module('matter.table.private.getNecessaryParameters', '+matter/@table/private/getNecessaryParameters.py')
+import_matter_data = load_module(
+    'matter.table.private.importMatterData', '+matter/@table/private/importMatterData.py'
+).import_matter_data
+Table = load_module('matter.table.table', '+matter/@table/table.py').Table
+
+csPhases = ['solid', 'liquid', 'gas', 'supercritical']
+
+
+def create_matter_table(csSubstances):
+    """
+    Creates a matter table that only contains the given substances with
+    individual NIST data files.
+    """
+    oMT = Table.__new__(Table)
+    oMT.ttxMatter = {sSubstance: import_matter_data(sSubstance) for sSubstance in csSubstances}
+    oMT.csSubstances = list(csSubstances)
+    oMT.iSubstances = len(csSubstances)
+    oMT.tiN2I = {sSubstance: i for i, sSubstance in enumerate(csSubstances)}
+    oMT.csI2N = list(csSubstances)
+    oMT.abCompound = np.zeros(oMT.iSubstances, dtype=bool)
+    oMT.thPropertyInterpolations = {}
+    oMT.thPackedPropertyInterpolations = {}
+    oMT.initialize_property_cache()
+    oMT.build_phase_boundary_index()
+    return oMT
+
+
+class TestCalculateProperty(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.oMT = create_matter_table(['CO2', 'H2O', 'O2'])
+
+    def find_mixture_property(self, sProperty, fTemperature, arPartialMass, sPhase, afPartialPressures):
+        aiIndices = np.flatnonzero(arPartialMass)
+        afProperty = [
+            self.oMT.find_property({
+                'sSubstance': self.oMT.csSubstances[i], 'sProperty': sProperty, 'sPhaseType': sPhase,
+                'sFirstDepName': 'Temperature', 'fFirstDepValue': fTemperature,
+                'sSecondDepName': 'Pressure', 'fSecondDepValue': afPartialPressures[i],
+            })
+            for i in aiIndices
+        ]
+        return np.dot(arPartialMass[aiIndices], afProperty)
+
+    def test_batch_evaluation_matches_the_single_lookups(self):
+        arPartialMass = np.array([0.2, 0.1, 0.7])
+        afPartialPressures = np.array([1e3, 2e3, 2.1e4])
+        aiPhase = np.full(3, 3)
+
+        for sProperty in ('Heat Capacity', 'Density', 'Thermal Conductivity', 'Dynamic Viscosity'):
+            fProperty = self.oMT.calculate_property(
+                sProperty, 301.3, arPartialMass, csPhases, aiPhase, np.arange(3), afPartialPressures, True
+            )
+            # The grids are interpolated bilinearly, the scattered data of
+            # find_property linearly on triangles
+            fExpected = self.find_mixture_property(sProperty, 301.3, arPartialMass, 'gas', afPartialPressures)
+            self.assertLess(abs(fProperty / fExpected - 1), 1e-3)
+
+    def test_states_outside_the_grid_use_the_scattered_data(self):
+        # Close to the boiling point the grid of liquid water has no value,
+        # the interpolation of the scattered data still has one
+        afPartialPressures = np.full(3, 1e5)
+        aiPhase = np.array([3, 2, 3])
+        arPartialMass = np.array([0, 1, 0])
+
+        fProperty = self.oMT.calculate_property(
+            'Density', 372.5, arPartialMass, csPhases, aiPhase, np.array([1]), afPartialPressures, True
+        )
+
+        self.assertEqual(fProperty, self.find_mixture_property('Density', 372.5, arPartialMass, 'liquid', afPartialPressures))
+
+
+class TestDeterminePhase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The data files of N2 in this repository contain no isobaric data
+        cls.oMT = create_matter_table(['H2O', 'N2', 'O2'])
+
+    def test_phases_of_single_substances(self):
+        self.assertEqual(self.oMT.determine_phase('H2O', 300, 1e5), (2, ['Liquid']))
+        self.assertEqual(self.oMT.determine_phase('H2O', 400, 1e5), (3, ['Gas']))
+        self.assertEqual(self.oMT.determine_phase('O2', 300, 1e5), (3, ['Gas']))
+
+    def test_phases_of_a_mass_vector(self):
+        aiPhase, csPhases = self.oMT.determine_phase(np.array([1, 0, 1]), 300, np.array([1e5, 0, 1e5]))
+
+        np.testing.assert_array_equal(aiPhase, [2, 0, 3])
+        self.assertEqual(csPhases, ['Liquid', 'Gas'])
+
+    def test_substance_without_phase_data_raises(self):
+        with self.assertRaises(ValueError):
+            self.oMT.determine_phase('N2', 300, 1e5)
+
+        # The substance is not stored in the index with a wrong phase
+        with self.assertRaises(ValueError):
+            self.oMT.determine_phase('N2', 300, 1e5)
+
+
+class MockLiquidPhase:
+    """
+    Liquid phase that only contains the state read by the matter table.
+    """
+
+    sObjectType = 'phase'
+    sType = 'liquid'
+    arCompoundMass = None
+
+    def __init__(self, afMass, fTemperature, fPressure):
+        self.afMass = np.asarray(afMass, dtype=float)
+        self.fMass = self.afMass.sum()
+        self.arPartialMass = self.afMass / self.fMass
+        self.fTemperature = fTemperature
+        self.fPressure = fPressure
+
+
+class TestMemoizedProperty(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.oMT = create_matter_table(['CO2', 'H2O', 'O2'])
+
+    def setUp(self):
+        self.oMT.reset_property_cache()
+        self.oPhase = MockLiquidPhase([0, 1, 0], 300, 1e5)
+
+    def test_miss_calculates_the_property(self):
+        for sProperty in ('Heat Capacity', 'Density', 'Thermal Conductivity', 'Dynamic Viscosity'):
+            fValue = self.oMT.get_memoized_property(self.oPhase, sProperty)
+            fExpected = getattr(self.oMT, self.oMT.tsPropertyCalculationMethods[sProperty])(self.oPhase)
+
+            self.assertEqual(fValue, fExpected)
+            self.assertEqual(self.oMT.tiPropertyCacheStatistics[sProperty]['iMisses'], 1)
+
+        self.assertAlmostEqual(self.oMT.get_memoized_property(self.oPhase, 'Density'), 996.5, delta=1)
+
+    def test_hit_within_the_tolerances(self):
+        fValue = self.oMT.get_memoized_property(self.oPhase, 'Heat Capacity')
+
+        self.oPhase.fTemperature += 0.5
+        self.oPhase.fPressure += 50
+
+        self.assertEqual(self.oMT.get_memoized_property(self.oPhase, 'Heat Capacity'), fValue)
+        self.assertEqual(self.oMT.tiPropertyCacheStatistics['Heat Capacity'], {'iHits': 1, 'iMisses': 1, 'iIdealGas': 0})
+
+    def test_recalculation_outside_the_tolerances(self):
+        fValue = self.oMT.get_memoized_property(self.oPhase, 'Density')
+
+        self.oPhase.fTemperature += 0.5
+        self.oMT.get_memoized_property(self.oPhase, 'Density')
+        self.oPhase.fTemperature += 20
+        fRecalculated = self.oMT.get_memoized_property(self.oPhase, 'Density')
+
+        self.assertLess(fRecalculated, fValue)
+        self.assertEqual(fRecalculated, self.oMT.calculateDensity(self.oPhase))
+        self.assertEqual(self.oMT.tiPropertyCacheStatistics['Density'], {'iHits': 1, 'iMisses': 2, 'iIdealGas': 0})
+
+    def test_changed_tolerance_triggers_recalculation(self):
+        self.oMT.get_memoized_property(self.oPhase, 'Heat Capacity')
+        self.oPhase.fTemperature += 0.5
+
+        self.oMT.set_property_cache_tolerances(fTemperature=0.1)
+        try:
+            self.oMT.get_memoized_property(self.oPhase, 'Heat Capacity')
+        finally:
+            self.oMT.set_property_cache_tolerances(fTemperature=1)
+
+        self.assertEqual(self.oMT.tiPropertyCacheStatistics['Heat Capacity']['iMisses'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
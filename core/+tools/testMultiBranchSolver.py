@@ -0,0 +1,137 @@
+import math
+import unittest
+
+import numpy as np
+
+from loadCoreModule import load_module
+from matterSolverMocks import MockBranch, MockPhase, MockProc
+
+# Unit tests of the Newton iteration of the multi-branch solver. Run them with
+# python -m unittest discover -s core/+tools -p "testMultiBranchSolver.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+load_module('solver.matter.base.branch', '+solver/+matter/+base/branch.py')
+load_module('solver.matter_multibranch.iterative.component', '+solver/+matter_multibranch/+iterative/component.py')
+IterativeBranch = load_module(
+    'solver.matter_multibranch.iterative.branch', '+solver/+matter_multibranch/+iterative/branch.py'
+).IterativeBranch
+
+
+def create_resistance(fResistance, fLinear=0.0):
+    """
+    Returns an F2F with a pressure drop that increases with the square of
+    the flow rate, e.g. a pipe.
+    """
+    return MockProc(lambda fFlowRate: fResistance * fFlowRate ** 2 + fLinear * abs(fFlowRate))
+
+
+class TestIterativeBranch(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.oInlet = MockPhase(2e5)
+        self.oOutlet = MockPhase(1e5)
+
+    def create_series(self, afResistances, fLinear=0.0):
+        """
+        Creates branches in series between the inlet and the outlet, which
+        are connected by flow phases.
+        """
+        aoPhases = [self.oInlet] + [MockPhase(bFlow=True) for _ in afResistances[1:]] + [self.oOutlet]
+        self.aoFlowPhases = aoPhases[1:-1]
+        return [MockBranch(self.oTimer, aoPhases[i], aoPhases[i + 1], [create_resistance(fResistance, fLinear)])
+                for i, fResistance in enumerate(afResistances)]
+
+    def test_series_flow_rate(self):
+        aoBranches = self.create_series([1e7, 2e7, 3e7], fLinear=1e3)
+        IterativeBranch(aoBranches, 'complex').update()
+
+        # 1e5 Pa = 6e7 * F^2 + 3e3 * F
+        fExpected = (-3e3 + math.sqrt(9e6 + 4 * 6e7 * 1e5)) / (2 * 6e7)
+        for oBranch in aoBranches:
+            self.assertAlmostEqual(oBranch.fFlowRate, fExpected, delta=1e-5 * fExpected)
+
+        # Pressure of the flow phase between the first two branches
+        self.assertAlmostEqual(self.aoFlowPhases[0].fVirtualPressure, 2e5 - 1e7 * fExpected ** 2 - 1e3 * fExpected,
+                               delta=1)
+
+    def test_parallel_flow_rates(self):
+        oFlowPhase = MockPhase(bFlow=True)
+        oSupply = MockBranch(self.oTimer, self.oInlet, oFlowPhase, [create_resistance(1e7)])
+        oFirst = MockBranch(self.oTimer, oFlowPhase, self.oOutlet, [create_resistance(1e7)])
+        oSecond = MockBranch(self.oTimer, oFlowPhase, self.oOutlet, [create_resistance(4e7)])
+        IterativeBranch([oSupply, oFirst, oSecond]).update()
+
+        # The flow splits with the square root of the resistances, so the
+        # supply has 2.25 times the pressure drop of the parallel branches
+        fParallelDrop = 1e5 / 3.25
+        self.assertAlmostEqual(oFirst.fFlowRate, math.sqrt(fParallelDrop / 1e7), delta=1e-6)
+        self.assertAlmostEqual(oSecond.fFlowRate, math.sqrt(fParallelDrop / 4e7), delta=1e-6)
+        self.assertAlmostEqual(oSupply.fFlowRate, oFirst.fFlowRate + oSecond.fFlowRate, delta=1e-9)
+
+    def test_jacobian_matches_finite_differences(self):
+        oSolver = IterativeBranch(self.create_series([1e7, 1e7, 1e7], fLinear=1e3))
+        oComponent = oSolver.aoComponents[0]
+
+        afFixedPressures = np.array([0.0 if oPhase.bFlow else oPhase.fPressure for oPhase in oComponent.aoPhases])
+        afExternalFlows = np.zeros(oComponent.iVariablePhases)
+        afState = np.array([0.05, 0.06, 0.07, 1.7e5, 1.3e5])
+
+        def calculate_residual(afState):
+            return oComponent._calculate_residual(afState, afFixedPressures, afExternalFlows)
+
+        afResidual, afDrops, abClosed = calculate_residual(afState)
+        oComponent._factorize_jacobian(afState, afDrops, abClosed)
+        mfJacobian = np.linalg.inv(oComponent.oFactorization.solve(np.eye(len(afState))))
+
+        mfExpected = np.empty((len(afState), len(afState)))
+        for iColumn in range(len(afState)):
+            afStep = np.zeros(len(afState))
+            afStep[iColumn] = 1e-6 * max(abs(afState[iColumn]), 1)
+            mfExpected[:, iColumn] = (calculate_residual(afState + afStep)[0]
+                                      - calculate_residual(afState - afStep)[0]) / (2 * afStep[iColumn])
+
+        np.testing.assert_allclose(mfJacobian, mfExpected, rtol=1e-4, atol=1e-6)
+
+    def test_cold_start_is_damped(self):
+        aoBranches = self.create_series([1e7, 1e7])
+        oSolver = IterativeBranch(aoBranches)
+        oSolver.update()
+
+        self.assertAlmostEqual(aoBranches[0].fFlowRate, math.sqrt(1e5 / 2e7), delta=1e-6)
+        self.assertLessEqual(oSolver.tLastSolve['iIterations'], 8)
+        self.assertLessEqual(oSolver.tLastSolve['iFactorizations'], 4)
+
+    def test_factorization_is_reused_for_small_changes(self):
+        oSolver = IterativeBranch(self.create_series([1e7, 1e7, 1e7], fLinear=1e3))
+        oSolver.update()
+
+        for _ in range(3):
+            self.oInlet.fPressure *= 1.001
+            oSolver.register_update()
+            oSolver.update()
+
+            self.assertGreater(oSolver.tLastSolve['iIterations'], 0)
+            self.assertEqual(oSolver.tLastSolve['iFactorizations'], 0)
+
+        tStatistics = oSolver.get_statistics()
+        self.assertEqual(tStatistics['iSolves'], 4)
+        self.assertGreater(tStatistics['rFactorizationReuse'], 0.5)
+        self.assertGreater(tStatistics['fWallTime'], 0)
+
+    def test_non_finite_residual_raises(self):
+        self.oInlet.fPressure = math.nan
+        oSolver = IterativeBranch(self.create_series([1e7, 1e7]))
+
+        with self.assertRaises(ValueError):
+            oSolver.update()
+
+    def test_mode(self):
+        aoBranches = self.create_series([1e7])
+        self.assertEqual(IterativeBranch(aoBranches, 'simple').sMode, 'simple')
+
+        with self.assertRaises(ValueError):
+            IterativeBranch(self.create_series([1e7]), 'fast')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import math
+import unittest
+
+from loadCoreModule import load_module
+from matterSolverMocks import MockBranch, MockExMe, MockFlow, MockPhase, MockProc
+
+# Unit tests of the partitioning of the multi-branch network into independent
+# components. Run them with
+# python -m unittest discover -s core/+tools -p "testNetworkPartitioning.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+load_module('solver.matter.base.branch', '+solver/+matter/+base/branch.py')
+load_module('solver.matter_multibranch.iterative.component', '+solver/+matter_multibranch/+iterative/component.py')
+IterativeBranch = load_module(
+    'solver.matter_multibranch.iterative.branch', '+solver/+matter_multibranch/+iterative/branch.py'
+).IterativeBranch
+
+
+def create_network(oTimer, tfPressures, csBranches):
+    """
+    Creates a network from a list of branches written as 'Left->Right'
+    between named phases. Phases with a pressure in tfPressures are fixed,
+    all others are flow phases. Each branch has a pipe with a resistance of
+    1e7 Pa s^2/kg^2.
+
+    Returns:
+        tuple: Branches by their name and phases by their name.
+    """
+    toPhases = {}
+    toBranches = {}
+    for sBranch in csBranches:
+        aoPhases = []
+        for sPhase in sBranch.split('->'):
+            if sPhase not in toPhases:
+                bFlow = sPhase not in tfPressures
+                toPhases[sPhase] = MockPhase(tfPressures.get(sPhase), bFlow)
+            aoPhases.append(toPhases[sPhase])
+
+        oPipe = MockProc(lambda fFlowRate: 1e7 * fFlowRate * abs(fFlowRate), 'pipe')
+        toBranches[sBranch] = MockBranch(oTimer, aoPhases[0], aoPhases[1], [oPipe], sBranch)
+    return toBranches, toPhases
+
+
+class TestNetworkPartitioning(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+
+    def get_components(self, oSolver, toBranches):
+        """
+        Returns the names of the branches of each component.
+        """
+        return [[sBranch for sBranch, oBranch in toBranches.items()
+                 if oSolver.aiBranchComponent[oSolver.aoBranches.index(oBranch)] == iComponent]
+                for iComponent in range(oSolver.iComponents)]
+
+    def test_independent_loops_are_separate_components(self):
+        # Cabin air loop and a coolant loop with a parallel heat exchanger
+        toBranches, _ = create_network(self.oTimer, {'Cabin': 1e5, 'Tank': 3e5, 'Sink': 1e5}, [
+            'Cabin->Fan', 'Fan->Filter', 'Filter->Cabin',
+            'Tank->Pump', 'Pump->HX', 'Pump->Bypass', 'Bypass->HX', 'HX->Sink',
+        ])
+        oSolver = IterativeBranch(list(toBranches.values()))
+
+        self.assertEqual(self.get_components(oSolver, toBranches), [
+            ['Cabin->Fan', 'Fan->Filter', 'Filter->Cabin'],
+            ['Tank->Pump', 'Pump->HX', 'Pump->Bypass', 'Bypass->HX', 'HX->Sink'],
+        ])
+
+    def test_fixed_pressure_phase_decouples(self):
+        # Both chains share the fixed pressure cabin
+        toBranches, _ = create_network(self.oTimer, {'Inlet': 2e5, 'Cabin': 1.5e5, 'Outlet': 1e5}, [
+            'Inlet->Duct', 'Duct->Cabin', 'Cabin->Vent', 'Vent->Outlet',
+        ])
+        oSolver = IterativeBranch(list(toBranches.values()))
+
+        self.assertEqual(self.get_components(oSolver, toBranches), [
+            ['Inlet->Duct', 'Duct->Cabin'],
+            ['Cabin->Vent', 'Vent->Outlet'],
+        ])
+
+    def test_only_outdated_component_is_solved(self):
+        toBranches, toPhases = create_network(self.oTimer, {'Inlet': 2e5, 'Cabin': 1e5, 'Tank': 3e5}, [
+            'Inlet->Duct', 'Duct->Cabin', 'Tank->Line', 'Line->Cabin',
+        ])
+        oSolver = IterativeBranch(list(toBranches.values()))
+        oSolver.update()
+        self.assertEqual(oSolver.tLastSolve['iComponents'], 2)
+
+        fTankFlowRate = toBranches['Tank->Line'].fFlowRate
+        toPhases['Inlet'].fPressure = 3e5
+        oSolver.register_update(int(oSolver.aiBranchComponent[0]))
+        oSolver.update()
+
+        self.assertEqual(oSolver.tLastSolve['iComponents'], 1)
+        self.assertEqual(toBranches['Tank->Line'].fFlowRate, fTankFlowRate)
+        self.assertAlmostEqual(toBranches['Inlet->Duct'].fFlowRate, math.sqrt(2e5 / 2e7), delta=1e-6)
+
+    def test_external_flows_outdate_their_component(self):
+        toBranches, toPhases = create_network(self.oTimer, {'Inlet': 2e5, 'Outlet': 1e5}, [
+            'Inlet->Duct', 'Duct->Outlet', 'Inlet->Line', 'Line->Outlet',
+        ])
+
+        # A P2P extracts matter from the duct
+        oP2PFlow = MockFlow(None)
+        MockExMe(toPhases['Duct'], -1, oP2PFlow, True)
+
+        oSolver = IterativeBranch(list(toBranches.values()))
+        oSolver.hBindPostTickUpdate = lambda: None
+        oSolver.update()
+
+        oSolver.register_phase_update(toPhases['Line'])
+        self.assertFalse(oSolver.abOutdatedComponents.any())
+
+        oSolver.register_phase_update(toPhases['Duct'])
+        self.assertEqual(oSolver.abOutdatedComponents.tolist(), [True, False])
+
+    def test_worker_threads(self):
+        csBranches = []
+        for iLoop in range(4):
+            csBranches += ['Inlet->Duct%i' % iLoop, 'Duct%i->Outlet' % iLoop]
+        toBranches, _ = create_network(self.oTimer, {'Inlet': 2e5, 'Outlet': 1e5}, csBranches)
+        aoBranches = list(toBranches.values())
+
+        # The number of worker threads can only be passed by name
+        with self.assertRaises(TypeError):
+            IterativeBranch(aoBranches, 'complex', 2)
+
+        oSolver = IterativeBranch(aoBranches, 'complex', iWorkerThreads=2)
+        oSolver.update()
+
+        self.assertEqual(oSolver.iComponents, 4)
+        self.assertIsNotNone(oSolver.oThreadPool)
+        for oBranch in aoBranches:
+            self.assertAlmostEqual(oBranch.fFlowRate, math.sqrt(1e5 / 2e7), delta=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
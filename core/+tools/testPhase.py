@@ -0,0 +1,223 @@
+import unittest
+
+import numpy as np
+
+from loadCoreModule import load_module
+
+# Unit tests of the mass update and the post ticks of the phases and of the
+# mass state arena. Run them with python -m unittest discover -s core/+tools -p "testPhase.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+load_module('matter.compoundMass', '+matter/compoundMass.py')
+load_module('matter.timeStepEvaluator', '+matter/timeStepEvaluator.py')
+load_module('matter.phase.calculateTimeStep', '+matter/@phase/calculateTimeStep.py')
+Phase = load_module('matter.phase.phase', '+matter/@phase/phase.py').Phase
+Flow = load_module('matter.phases.flow.flow', '+matter/+phases/+flow/flow.py').Flow
+BoundaryPhase = load_module(
+    'matter.phases.boundary.boundary', '+matter/+phases/+boundary/boundary.py'
+).BoundaryPhase
+MassStateArena = load_module('simulation.massStateArena', '+simulation/massStateArena.py').MassStateArena
+
+
+class MockMatterTable:
+    i_substances = 2
+
+
+class MockStore:
+    def __init__(self, oTimer):
+        self.oMT = MockMatterTable()
+        self.timer = oTimer
+
+
+class MockPhase(Phase):
+    """
+    Phase that only has a timer and its masses, the post ticks are
+    registered directly.
+    """
+
+    def __init__(self, oTimer, afMass=(0, 0)):
+        self.oTimer = oTimer
+        self.afMass = np.array(afMass, dtype=float)
+        self.afMassGenerated = np.zeros(len(afMass))
+        self.afCurrentTotalInOuts = np.zeros(len(afMass))
+        self.fMass = float(np.sum(self.afMass))
+        self.fLastMassUpdate = 0
+        self.coProcsEXME = []
+        self.iSubstanceManipulators = 0
+        self.iVolumeManipulators = 0
+
+    def calculate_time_step(self):
+        # The phase has no inflows or outflows to calculate its time step
+        pass
+
+
+def get_registered_post_ticks(oTimer):
+    """
+    Returns the number of registered post ticks of each level.
+    """
+    return {
+        sLevel: len(chPostTicks)
+        for tchPostTicks in oTimer.chPostTicks.values()
+        for sLevel, chPostTicks in tchPostTicks.items()
+        if chPostTicks
+    }
+
+
+class TestPostTickRegistration(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+
+    def test_phase_registers_all_post_ticks(self):
+        MockPhase(self.oTimer)._register_post_ticks()
+
+        self.assertEqual(get_registered_post_ticks(self.oTimer),
+                         {'phase_massupdate': 1, 'phase_update': 1, 'timestep': 1})
+
+    def test_flow_phase_registers_fewer_post_ticks(self):
+        oFlow = Flow.__new__(Flow)
+        oFlow.oTimer = self.oTimer
+        oFlow._register_post_ticks()
+
+        self.assertEqual(get_registered_post_ticks(self.oTimer), {'phase_massupdate': 1, 'phase_update': 1})
+
+    def test_flow_phase_with_fixed_time_step_registers_time_step(self):
+        oFlow = Flow.__new__(Flow)
+        oFlow.oTimer = self.oTimer
+        oFlow.fFixedTimeStep = 1
+        oFlow._register_post_ticks()
+
+        oFlow.set_outdated_ts()
+        oFlow.set_outdated_ts()
+
+        self.assertEqual(get_registered_post_ticks(self.oTimer),
+                         {'phase_massupdate': 1, 'phase_update': 1, 'timestep': 1})
+
+    def test_boundary_phase_only_registers_mass_update(self):
+        BoundaryPhase(MockStore(self.oTimer), 'Boundary', {}, 293)
+
+        self.assertEqual(get_registered_post_ticks(self.oTimer), {'phase_massupdate': 1})
+
+
+class TestMassUpdate(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.oPhase = MockPhase(self.oTimer, [2, 1])
+        self.oPhase._register_post_ticks()
+
+    def test_masses_are_integrated_in_place(self):
+        afMass = self.oPhase.afMass
+        self.oPhase.afCurrentTotalInOuts[:] = [0.1, 0.2]
+        self.oTimer.fTime = 5
+
+        self.oPhase.massupdate()
+
+        self.assertIs(self.oPhase.afMass, afMass)
+        np.testing.assert_allclose(self.oPhase.afMass, [2.5, 2])
+        self.assertAlmostEqual(self.oPhase.fMass, 4.5)
+        np.testing.assert_allclose(self.oPhase.arPartialMass, [2.5 / 4.5, 2 / 4.5])
+        self.assertEqual(self.oPhase.arPartialMass.dtype, np.float64)
+
+    def test_negative_masses_are_stored_as_generated_mass(self):
+        self.oPhase.afCurrentTotalInOuts[:] = [-1, 0.5]
+        self.oTimer.fTime = 3
+
+        self.oPhase.massupdate()
+
+        np.testing.assert_allclose(self.oPhase.afMass, [0, 2.5])
+        np.testing.assert_allclose(self.oPhase.afMassGenerated, [1, 0])
+        np.testing.assert_allclose(self.oPhase.arPartialMass, [0, 1])
+
+    def test_masses_are_not_integrated_twice_in_one_tick(self):
+        self.oPhase.afCurrentTotalInOuts[:] = [0.1, 0]
+        self.oTimer.fTime = 1
+
+        self.oPhase.massupdate()
+        self.oPhase.massupdate()
+
+        np.testing.assert_allclose(self.oPhase.afMass, [2.1, 1])
+
+    def test_empty_phase_has_zero_partial_masses(self):
+        self.oPhase.afMass[:] = 0
+        self.oPhase.afCurrentTotalInOuts[:] = [0, 0]
+        self.oTimer.fTime = 1
+
+        self.oPhase.massupdate()
+
+        np.testing.assert_array_equal(self.oPhase.arPartialMass, [0, 0])
+
+
+class TestMassStateArena(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.aoPhases = [MockPhase(self.oTimer, [2, 1]), MockPhase(self.oTimer, [0, 4])]
+        for oPhase in self.aoPhases:
+            oPhase._register_post_ticks()
+
+        oFlow = Flow.__new__(Flow)
+        self.oArena = MassStateArena(self.aoPhases + [oFlow], 2, self.oTimer)
+
+    def test_phase_vectors_are_views_into_the_arena(self):
+        self.assertEqual(self.oArena.iPhases, 2)
+        np.testing.assert_array_equal(self.oArena.mfMass, [[2, 1], [0, 4]])
+
+        self.aoPhases[1].afMass[0] = 3
+        self.assertEqual(self.oArena.mfMass[1, 0], 3)
+        self.assertEqual(self.oArena.get_total_mass(), 10)
+        np.testing.assert_array_equal(self.oArena.get_total_masses(), [3, 7])
+
+    def test_mass_update_matches_the_mass_update_of_the_phase(self):
+        oReference = MockPhase(self.oTimer, [0, 4])
+        oReference._register_post_ticks()
+        for oPhase in (self.aoPhases[1], oReference):
+            oPhase.afCurrentTotalInOuts[:] = [0.5, -1]
+
+        self.oTimer.fTime = 5
+        self.aoPhases[1].hBindPostTickMassUpdate()
+        self.oArena.massupdate()
+        oReference.massupdate()
+
+        np.testing.assert_array_equal(self.aoPhases[1].afMass, oReference.afMass)
+        np.testing.assert_array_equal(self.aoPhases[1].afMassGenerated, oReference.afMassGenerated)
+        np.testing.assert_array_equal(self.aoPhases[1].arPartialMass, oReference.arPartialMass)
+        self.assertEqual(self.aoPhases[1].fMass, oReference.fMass)
+        self.assertEqual(self.aoPhases[1].fLastMassUpdate, 5)
+        self.assertEqual(self.oArena.get_generated_mass(), 1)
+
+        # Only the phase that registered its mass update is integrated
+        np.testing.assert_array_equal(self.aoPhases[0].afMass, [2, 1])
+        self.assertEqual(self.aoPhases[0].fLastMassUpdate, 0)
+
+    def test_mass_update_is_executed_in_the_post_tick(self):
+        self.aoPhases[0].afCurrentTotalInOuts[:] = [1, 0]
+        self.aoPhases[0].fLastMassUpdate = self.oArena.afLastMassUpdate[0] = -1
+        self.oTimer.bind(lambda _: self.aoPhases[0].hBindPostTickMassUpdate(), 0)
+
+        self.oTimer.tick()
+
+        np.testing.assert_allclose(self.aoPhases[0].afMass, [3, 1])
+        self.assertEqual(self.oTimer.ttiPostTickExecutions['matter']['phase_massupdate'], 1)
+
+    def test_snapshot_is_restored(self):
+        tSnapshot = self.oArena.create_snapshot()
+        self.aoPhases[0].afMass[:] = [5, 5]
+
+        self.oArena.restore_snapshot(tSnapshot)
+
+        np.testing.assert_array_equal(self.aoPhases[0].afMass, [2, 1])
+        self.assertEqual(self.aoPhases[0].fMass, 3)
+        np.testing.assert_allclose(self.aoPhases[0].arPartialMass, [2 / 3, 1 / 3])
+
+    def test_snapshot_of_other_phases_raises(self):
+        with self.assertRaises(ValueError):
+            self.oArena.restore_snapshot({'mfMass': np.zeros((3, 2)), 'mfMassGenerated': np.zeros((3, 2))})
+
+    def test_mass_state_is_read_only(self):
+        mfMass = self.oArena.get_mass_state()
+
+        with self.assertRaises(ValueError):
+            mfMass[0, 0] = 1
+        self.assertTrue(np.shares_memory(mfMass, self.oArena.mfMass))
+
+
+if __name__ == '__main__':
+    unittest.main()
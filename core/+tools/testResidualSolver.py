@@ -0,0 +1,269 @@
+import unittest
+
+import numpy as np
+
+from loadCoreModule import load_module
+from matterSolverMocks import MockBranch, MockExMe, MockFlow, MockPhase
+
+# Unit tests of the residual solver and its network. Run them with
+# python -m unittest discover -s core/+tools -p "testResidualSolver.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+load_module('solver.matter.base.branch', '+solver/+matter/+base/branch.py')
+load_module('solver.matter.residual.network', '+solver/+matter/+residual/network.py')
+ResidualBranch = load_module('solver.matter.residual.branch', '+solver/+matter/+residual/branch.py').ResidualBranch
+
+Source = load_module('event.source', '+event/source.py').Source
+Branch = load_module('base.branch', '+base/branch.py').Branch
+
+
+class BaseBranch(Branch, Source):
+    """
+    Base class of the matter branch, a branch that is also an event source.
+    """
+
+    __slots__ = ()
+
+
+MatterBranch = load_module('matter.branch', '+matter/branch.py', {'BaseBranch': BaseBranch}).MatterBranch
+load_module('matter.compoundMass', '+matter/compoundMass.py')
+MatterFlow = load_module('matter.flow', '+matter/flow.py').Flow
+ExMe = load_module('matter.procs.exme', '+matter/+procs/@exme/exme.py').ExMe
+
+load_module('matter.timeStepEvaluator', '+matter/timeStepEvaluator.py')
+load_module('matter.phase.calculateTimeStep', '+matter/@phase/calculateTimeStep.py')
+Phase = load_module('matter.phase.phase', '+matter/@phase/phase.py').Phase
+FlowPhase = load_module('matter.phases.flow.flow', '+matter/+phases/+flow/flow.py').Flow
+
+
+class TestResidualNetwork(unittest.TestCase):
+    """
+    Tests of the residual branches, which are updated together by one
+    residual network.
+    """
+
+    def setUp(self):
+        self.oTimer = Timer()
+        self.oStore = MockPhase(1e5)
+        self.oVacuum = MockPhase(0)
+
+    def test_chain_with_p2p(self):
+        oFirst, oSecond = MockPhase(bFlow=True), MockPhase(bFlow=True)
+        oInlet = MockBranch(self.oTimer, self.oStore, oFirst)
+        oMiddle = MockBranch(self.oTimer, oFirst, oSecond)
+        oOutlet = MockBranch(self.oTimer, oSecond, self.oVacuum)
+
+        # A P2P extracts matter from the second flow phase
+        oP2PFlow = MockFlow(None)
+        oP2PFlow.fFlowRate = 0.01
+        MockExMe(oSecond, -1, oP2PFlow, True)
+
+        # The solvers are created against the flow direction on purpose
+        oOutletSolver = ResidualBranch(oOutlet)
+        ResidualBranch(oMiddle)
+        oNetwork = oOutletSolver.oNetwork
+
+        oInlet.setFlowRate(0.1)
+        oNetwork.update()
+        self.assertAlmostEqual(oMiddle.fFlowRate, 0.1)
+        self.assertAlmostEqual(oOutlet.fFlowRate, 0.09)
+
+        oInlet.setFlowRate(-0.1)
+        oNetwork.update()
+        self.assertAlmostEqual(oMiddle.fFlowRate, -0.1)
+        self.assertAlmostEqual(oOutlet.fFlowRate, -0.11)
+
+    def test_right_balanced_side(self):
+        oFlowPhase = MockPhase(bFlow=True)
+        oResidual = MockBranch(self.oTimer, self.oStore, oFlowPhase)
+        oOutlet = MockBranch(self.oTimer, oFlowPhase, self.oVacuum)
+        oOutlet.setFlowRate(0.05)
+
+        oSolver = ResidualBranch(oResidual)
+        oSolver.oNetwork.update()
+
+        self.assertEqual(oSolver.iBalancedSide, 1)
+        self.assertAlmostEqual(oResidual.fFlowRate, 0.05)
+
+    def test_reseal_does_not_bind_again(self):
+        oFlowPhase = MockPhase(bFlow=True)
+        oInlet = MockBranch(self.oTimer, self.oStore, oFlowPhase)
+        oResidual = MockBranch(self.oTimer, oFlowPhase, self.oVacuum)
+        oNetwork = ResidualBranch(oResidual).oNetwork
+
+        for _ in range(3):
+            oNetwork.reconnect()
+            oNetwork.update()
+
+        self.assertEqual(len(oInlet.tcCallbacks['setFlowRate']), 1)
+
+    def test_loop(self):
+        oFirst, oSecond = MockPhase(bFlow=True), MockPhase(bFlow=True)
+        oForward = MockBranch(self.oTimer, oFirst, oSecond)
+        oBackward = MockBranch(self.oTimer, oSecond, oFirst)
+        oNetwork = ResidualBranch(oForward).oNetwork
+        ResidualBranch(oBackward)
+
+        with self.assertRaises(ValueError):
+            oNetwork.update()
+
+
+class StorePhase(Phase):
+    """
+    Phase of a store with a constant pressure, it only has the properties
+    the branches and flows use.
+    """
+
+    def __init__(self, oTimer, fPressure, arPartialMass):
+        self.oTimer = oTimer
+        self.oMT = None
+        self.coProcsEXME = []
+        self.fMass = 1.0
+        self.fMassToPressure = fPressure
+        self.fCurrentTotalMassInOut = 0
+        self.fLastMassUpdate = 0
+        self.fTemperature = 293.0
+        self.fMolarMass = 0.029
+        self.arPartialMass = np.array(arPartialMass, dtype=float)
+        self.arCompoundMass = None
+        self._register_post_ticks()
+
+
+def create_flow_phase(oTimer, fPressure):
+    """
+    Creates a flow phase without a store, with the properties the branches,
+    flows and solvers use.
+    """
+    oPhase = FlowPhase.__new__(FlowPhase)
+    oPhase.oTimer = oTimer
+    oPhase.oMT = None
+    oPhase.coProcsEXME = []
+    oPhase.fMass = 1e-3
+    oPhase.fMassToPressure = fPressure / oPhase.fMass
+    oPhase.fVirtualPressure = None
+    oPhase.oMultiBranchSolver = None
+    oPhase.fTemperature = 293.0
+    oPhase.fMolarMass = 0.029
+    oPhase.arPartialMass = np.array([0.5, 0.5])
+    oPhase.arCompoundMass = None
+    oPhase._register_post_ticks()
+    return oPhase
+
+
+def create_exme(oPhase, oFlow, iSign):
+    """
+    Connects a flow to a phase through a new ExMe. The connection is set
+    directly, ExMe.addFlow requires a store.
+    """
+    oExMe = ExMe.__new__(ExMe)
+    oExMe.sName = 'Port_%i' % len(oPhase.coProcsEXME)
+    oExMe.oMT = oPhase.oMT
+    oExMe.oTimer = oPhase.oTimer
+    oExMe.oPhase = oPhase
+    oExMe.oFlow = oFlow
+    oExMe.bHasFlow = True
+    oExMe.bFlowIsAProcP2P = False
+    oExMe.iSign = iSign
+    oPhase.coProcsEXME.append(oExMe)
+
+    if iSign < 0:
+        oFlow.oIn = oExMe
+    else:
+        oFlow.oOut = oExMe
+    return oExMe
+
+
+def create_matter_branch(oTimer, oLeft, oRight, sName):
+    """
+    Creates and seals a matter branch without F2F processors between two
+    phases. The branch is created without a container, its attributes are
+    set like in the constructor.
+    """
+    oBranch = MatterBranch.__new__(MatterBranch)
+    Source.__init__(oBranch)
+
+    oBranch.sName = sName
+    oBranch.oTimer = oTimer
+    oBranch.oMT = None
+    oBranch.oHandler = None
+    oBranch.abIf = [False, False]
+    oBranch.bSealed = False
+    oBranch.bOutdated = False
+    oBranch.iIfFlow = None
+    oBranch.aoFlowProcs = []
+    oBranch.iFlowProcs = 0
+    oBranch.fFlowRate = 0
+    oBranch.afFlowRates = [1.0] * oBranch.iFlowRateHistoryLength
+    oBranch.iFlowRateHistoryIndex = 0
+    oBranch.fFlowRateHistorySum = float(oBranch.iFlowRateHistoryLength)
+    oBranch.bTriggerSetFlowRateCallbackBound = False
+    oBranch.iLastOutdatedTick = None
+    oBranch.iSuppressedOutdatedTriggers = 0
+
+    oFlow = MatterFlow()
+    oBranch.aoFlows = [oFlow]
+    oBranch.iFlows = 1
+    oBranch.coExmes = [create_exme(oLeft, oFlow, -1), create_exme(oRight, oFlow, 1)]
+
+    oBranch.seal()
+    return oBranch
+
+
+class TestResidualMatterBranches(unittest.TestCase):
+    """
+    Tests of the residual solver on matter branches with their flows and
+    ExMes, between a store phase, a flow phase and the cabin.
+    """
+
+    def setUp(self):
+        self.oTimer = Timer()
+        self.oTank = StorePhase(self.oTimer, 2e5, [1, 0])
+        self.oCabin = StorePhase(self.oTimer, 1e5, [0.2, 0.8])
+        self.oFlowPhase = create_flow_phase(self.oTimer, 1.5e5)
+
+        self.oSupply = create_matter_branch(self.oTimer, self.oTank, self.oFlowPhase, 'Supply')
+        self.oOutlet = create_matter_branch(self.oTimer, self.oFlowPhase, self.oCabin, 'Outlet')
+        self.oSolver = ResidualBranch(self.oOutlet)
+
+    def test_outlet_balances_the_flow_phase(self):
+        self.oSupply.setFlowRate(0.1)
+        self.oSolver.oNetwork.update()
+
+        self.assertIs(self.oFlowPhase.oMultiBranchSolver, self.oSolver.oNetwork)
+        self.assertEqual(self.oSolver.iBalancedSide, 0)
+        self.assertAlmostEqual(self.oOutlet.fFlowRate, 0.1)
+        self.assertAlmostEqual(self.oOutlet.aoFlows[0].fFlowRate, 0.1)
+
+    def test_flows_have_the_matter_of_their_inlet_phase(self):
+        self.oSupply.setFlowRate(0.1)
+        self.oSolver.oNetwork.update()
+
+        oSupplyFlow = self.oSupply.aoFlows[0]
+        self.assertEqual(oSupplyFlow.fPressure, 2e5)
+        self.assertIs(oSupplyFlow.arPartialMass, self.oTank.arPartialMass)
+
+        oOutletFlow = self.oOutlet.aoFlows[0]
+        self.assertAlmostEqual(oOutletFlow.fPressure, 1.5e5)
+        self.assertIs(oOutletFlow.arPartialMass, self.oFlowPhase.arPartialMass)
+
+    def test_network_is_only_updated_for_changed_flow_rates(self):
+        self.oSupply.setFlowRate(0.1)
+        self.oSolver.oNetwork.update()
+
+        self.iSetFlowRates = 0
+
+        def hSetFlowRate(_):
+            self.iSetFlowRates += 1
+
+        self.oOutlet.bind('setFlowRate', hSetFlowRate)
+        self.oSolver.oNetwork.update()
+        self.assertEqual(self.iSetFlowRates, 0)
+
+        self.oSupply.setFlowRate(0.2)
+        self.oSolver.oNetwork.update()
+        self.assertEqual(self.iSetFlowRates, 1)
+        self.assertAlmostEqual(self.oOutlet.fFlowRate, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+import unittest
+
+from loadCoreModule import load_module
+
+# Unit tests of the timer callbacks and post ticks. Run them with
+# python -m unittest discover -s core/+tools -p "testTimer.py"
+
+Timer = load_module('event.timer', '+event/timer.py').Timer
+
+
+class TestPostTicks(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.csExecuted = []
+
+    def register(self, sName, sGroup, sLevel):
+        return self.oTimer.register_post_tick(lambda: self.csExecuted.append(sName), sGroup, sLevel)
+
+    def test_time_step_post_ticks_are_executed(self):
+        hTimeStep = self.register('timestep', 'post_physics', 'timestep')
+        self.oTimer.bind(lambda _: hTimeStep(), 0)
+
+        self.oTimer.tick()
+        self.oTimer.tick()
+
+        self.assertEqual(self.csExecuted, ['timestep', 'timestep'])
+        self.assertEqual(self.oTimer.ttiPostTickExecutions['post_physics']['timestep'], 2)
+
+    def test_time_step_post_ticks_are_executed_after_the_physics(self):
+        hTimeStep = self.register('timestep', 'post_physics', 'timestep')
+        hMassUpdate = self.register('massupdate', 'matter', 'phase_massupdate')
+        hTemperature = self.register('temperature', 'thermal', 'capacity_temperatureupdate')
+
+        def hCallBack(_):
+            hTimeStep()
+            hTemperature()
+            hMassUpdate()
+
+        self.oTimer.bind(hCallBack, 0)
+        self.oTimer.tick()
+
+        self.assertEqual(self.csExecuted, ['massupdate', 'temperature', 'timestep'])
+
+
+class TestPostTickDispatch(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+        self.csExecuted = []
+
+    def register(self, sName, sGroup, sLevel, hFunction=None):
+        def hPostTick():
+            self.csExecuted.append(sName)
+            if hFunction is not None:
+                hFunction()
+
+        return self.oTimer.register_post_tick(hPostTick, sGroup, sLevel)
+
+    def execute(self, chPostTicks):
+        self.oTimer.bind(lambda _: [hPostTick() for hPostTick in chPostTicks], 0)
+        self.oTimer.tick()
+
+    def test_groups_and_levels_are_executed_in_order(self):
+        chPostTicks = [
+            self.register('thermal', 'thermal', 'capacity_temperatureupdate'),
+            self.register('post_update', 'matter', 'post_phase_update'),
+            self.register('update', 'matter', 'phase_update'),
+            self.register('pre_massupdate', 'matter', 'pre_phase_massupdate'),
+            self.register('massupdate', 'matter', 'phase_massupdate'),
+        ]
+
+        self.execute(chPostTicks)
+
+        self.assertEqual(self.csExecuted, ['pre_massupdate', 'massupdate', 'update', 'post_update', 'thermal'])
+
+    def test_post_ticks_of_a_level_are_executed_in_the_order_of_registration(self):
+        chPostTicks = [self.register(i, 'matter', 'phase_update') for i in range(4)]
+
+        self.execute(chPostTicks[::-1])
+
+        self.assertEqual(self.csExecuted, [0, 1, 2, 3])
+
+    def test_post_ticks_requested_twice_are_executed_once(self):
+        hPostTick = self.register('update', 'matter', 'phase_update')
+
+        self.execute([hPostTick, hPostTick])
+
+        self.assertEqual(self.csExecuted, ['update'])
+        self.assertEqual(self.oTimer.ttiPostTickExecutions['matter']['phase_update'], 1)
+        self.assertEqual(self.oTimer.ttiPostTickExecutions['matter']['phase_massupdate'], 0)
+
+    def test_post_ticks_requested_during_their_level_are_executed_in_the_same_tick(self):
+        chPostTicks = []
+        chPostTicks.append(self.register('first', 'matter', 'phase_update'))
+        # Requests the post tick before it, which is executed in a second
+        # pass over the level, and the one after it, which is executed in
+        # the current pass
+        chPostTicks.append(self.register('second', 'matter', 'phase_update',
+                                         lambda: (chPostTicks[0](), chPostTicks[2]())))
+        chPostTicks.append(self.register('third', 'matter', 'phase_update'))
+
+        self.execute([chPostTicks[1]])
+
+        self.assertEqual(self.csExecuted, ['second', 'third', 'first'])
+        self.assertEqual(self.oTimer.ttiPostTickExecutions['matter']['phase_update'], 3)
+
+    def test_post_ticks_are_executed_again_in_the_next_tick(self):
+        hPostTick = self.register('update', 'matter', 'phase_update')
+        self.oTimer.bind(lambda _: hPostTick(), 0)
+
+        for _ in range(3):
+            self.oTimer.tick()
+
+        self.assertEqual(self.csExecuted, ['update'] * 3)
+
+    def test_unknown_levels_raise(self):
+        with self.assertRaises(ValueError):
+            self.oTimer.register_post_tick(lambda: None, 'matter', 'timestep')
+        with self.assertRaises(ValueError):
+            self.oTimer.register_post_tick(lambda: None, 'fluid', 'phase_update')
+
+
+class TestScheduler(unittest.TestCase):
+    def run_simulation(self, bUseHeapScheduler):
+        """
+        Runs a few ticks with callbacks that change their time steps and
+        unbind each other and returns the executed callbacks and times.
+        """
+        oTimer = Timer(bUseHeapScheduler=bUseHeapScheduler)
+        ctExecuted = []
+
+        def create_callback(sName):
+            return lambda oTimer: ctExecuted.append((round(oTimer.fTime, 9), sName))
+
+        oTimer.bind(create_callback('fast'), 0.1)
+        oTimer.bind(create_callback('dependent'), -1)
+        hSetSlowStep, _ = oTimer.bind(create_callback('slow'), 0.35)
+        _, hUnbindTemporary = oTimer.bind(create_callback('temporary'), 0.2)
+
+        def hChangeSteps(oTimer):
+            ctExecuted.append((round(oTimer.fTime, 9), 'change'))
+            if oTimer.iTick == 3:
+                hSetSlowStep(0.05, True)
+                hUnbindTemporary()
+
+        oTimer.bind(hChangeSteps, 0.25)
+
+        for _ in range(25):
+            oTimer.tick()
+
+        return ctExecuted
+
+    def test_heap_scheduler_executes_the_same_callbacks_as_the_linear_scan(self):
+        ctLinear = self.run_simulation(False)
+
+        self.assertEqual(self.run_simulation(True), ctLinear)
+        self.assertIn('temporary', {sName for _, sName in ctLinear})
+
+    def test_heap_scheduler_uses_the_same_time_steps(self):
+        afTimes = []
+        for bUseHeapScheduler in (False, True):
+            oTimer = Timer(bUseHeapScheduler=bUseHeapScheduler)
+            oTimer.bind(lambda _: None, 0.3)
+            oTimer.bind(lambda _: None, 0.7)
+
+            afTimes.append([])
+            for _ in range(10):
+                oTimer.tick()
+                afTimes[-1].append(oTimer.fTime)
+
+        self.assertEqual(afTimes[1], afTimes[0])
+
+
+class TestCallBackSlots(unittest.TestCase):
+    def setUp(self):
+        self.oTimer = Timer()
+
+    def test_unbound_slots_are_reused(self):
+        _, hUnbindFirst = self.oTimer.bind(lambda _: None, 1)
+        self.oTimer.bind(lambda _: None, 1)
+
+        hUnbindFirst()
+        self.assertEqual(self.oTimer.aiFreeCallBackSlots, [0])
+
+        self.oTimer.bind(lambda _: None, 1)
+        self.assertEqual(self.oTimer.aiFreeCallBackSlots, [])
+        self.assertEqual(self.oTimer.iCallBackSlots, 2)
+        self.assertEqual(self.oTimer.aiSlotGeneration[0], 2)
+
+    def test_handles_of_unbound_callbacks_do_not_affect_the_new_callback(self):
+        csExecuted = []
+        hSetOldTimeStep, hUnbindOld = self.oTimer.bind(lambda _: csExecuted.append('old'), 1)
+        hUnbindOld()
+        self.oTimer.bind(lambda _: csExecuted.append('new'), 0.5)
+
+        hSetOldTimeStep(10)
+        hUnbindOld()
+
+        self.assertEqual(self.oTimer.afTimeSteps[0], 0.5)
+        self.assertTrue(self.oTimer.abActive[0])
+
+        self.oTimer.tick()
+        self.assertEqual(csExecuted, ['new'])
+
+    def test_unbinding_keeps_the_slots_of_the_other_callbacks(self):
+        csExecuted = []
+        chUnbind = [self.oTimer.bind(lambda _, i=i: csExecuted.append(i), 1)[1] for i in range(3)]
+
+        chUnbind[1]()
+        self.oTimer.tick()
+
+        self.assertEqual(csExecuted, [0, 2])
+        self.assertIsNone(self.oTimer.cCallBacks[1])
+        self.assertEqual(self.oTimer.afTimeSteps[2], 1)
+
+    def test_arrays_grow_beyond_the_initial_capacity(self):
+        iCallBacks = self.oTimer.iCallBackCapacity + 1
+        aiExecuted = []
+        for i in range(iCallBacks):
+            self.oTimer.bind(lambda _, i=i: aiExecuted.append(i), 1)
+
+        self.oTimer.tick()
+
+        self.assertEqual(aiExecuted, list(range(iCallBacks)))
+        self.assertGreaterEqual(self.oTimer.iCallBackCapacity, iCallBacks)
+        self.assertEqual(len(self.oTimer.afTimeSteps), self.oTimer.iCallBackCapacity)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,7 +25,7 @@ def verbose_post_ticks(oTimer):
             cxPostTicks = oTimer.txPostTicks[group_name][level_name]
 
             if cxPostTicks:
-                mbControl = oTimer.cabPostTickControl[iGroup][iLevel]
+                mbControl = oTimer.cabPostTickControl[oTimer.tiPostTickGroup[group_name]][level_name]
             else:
                 mbControl = []
 
@@ -3,12 +3,16 @@ import matplotlib.pyplot as plt
 from multiprocessing import Pool, Event
 import os
 
+from matter.table.table import Table
+
 def convergence():
     miCells = [2, 5] + list(range(10, 100, 10))
     results = []
 
-    # Creating a matter table object
-    oMT = matter_table()
+    # Creating a matter table object, its data is published once into
+    # shared memory and attached by all simulations
+    oMT = Table()
+    tSharedMatterTable = oMT.publish_shared_memory()
 
     # Create a control figure with a STOP button
     stop_event = Event()
@@ -21,12 +25,14 @@ def convergence():
     with Pool() as pool:
         for iCells in miCells:
             print(f"Starting simulation with {iCells} cells")
-            result = pool.apply_async(run_sim, args=(iCells, oMT, stop_event))
+            result = pool.apply_async(run_sim, args=(iCells, tSharedMatterTable, stop_event))
             results.append((iCells, result))
 
         pool.close()
         pool.join()
 
+    oMT.release_shared_memory()
+
     # Process results
     tData = {
         "cfTimeStep": [],
@@ -66,10 +72,12 @@ def convergence():
     plt.savefig("Convergence.png")
     plt.show()
 
-def run_sim(iCells, oMT, stop_event):
+def run_sim(iCells, tSharedMatterTable, stop_event):
     if stop_event.is_set():
         return None
 
+    oMT = Table.attach_shared_memory(tSharedMatterTable)
+
     # Simulate the run
     print(f"Running simulation with {iCells} cells")
     oLastSimObj = vhab_sim(
@@ -132,9 +140,6 @@ def interpolate_test_data():
     return np.interp(time_series, test_data[:, 0], test_data[:, 1]), time_series
 
 # Placeholder implementations for dependencies
-class matter_table:
-    pass
-
 class vhab_sim:
     def __init__(self, setup_name, params):
         self.setup_name = setup_name